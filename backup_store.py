@@ -0,0 +1,229 @@
+"""
+Backup file input berbasis isi (content-addressed) di folder backup/.
+
+Setiap isi file disimpan sekali sebagai objek backup/objects/<hash[:2]>/<sha256><ext>[.gz]; backup
+berikutnya dengan isi yang sama tidak disalin lagi. Nama yang mudah dicari (<nama>_<waktu><ext>)
+dibuat sebagai hardlink ke objek, jadi tidak memakan ruang tambahan. Salinan baru memakai reflink
+(copy-on-write) jika filesystem mendukung, dan berjalan di thread background agar tumpang tindih
+dengan pembacaan file. Retensi: BACKUP_KEEP snapshot terbaru per nama file dan BACKUP_MAX_DAYS.
+"""
+import gzip
+import itertools
+import logging
+import os
+import queue
+import shutil
+import sqlite3
+import stat
+import threading
+import time
+from datetime import datetime
+
+from input_cache import file_sha256
+
+# Format yang sudah terkompresi (zip/parquet): disimpan apa adanya walau BACKUP_COMPRESS=true
+COMPRESSED_FORMATS = ('.xlsx', '.parquet')
+COPY_BLOCK_SIZE = 1024 * 1024
+FICLONE = 0x40049409  # ioctl reflink Linux (btrfs, XFS, ...)
+
+
+def _reflink(src, dst):
+    """Salinan copy-on-write (tanpa menyalin data) jika filesystem mendukung. False jika tidak."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, 'rb') as source, open(dst, 'wb') as target:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        return False
+
+
+def _remove(path):
+    """Hapus file objek/alias (dibuat read-only, perlu chmod dulu di Windows)."""
+    try:
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class BackupStore:
+    """
+    Antrian backup dengan satu thread penyalin. submit() langsung kembali; wait(path) menunggu
+    backup file tersebut selesai dan wajib dipanggil sebelum file ditulis ulang atau dipindahkan.
+    """
+
+    def __init__(self, root, keep=10, max_days=0, compress=False):
+        self.root = root
+        self.keep = keep
+        self.max_days = max_days
+        self.compress = compress
+        self._queue = queue.Queue()
+        self._pending = {}  # path -> threading.Event (selesai)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._conn = None
+
+    def submit(self, path, file_hash=None):
+        """Jadwalkan backup path (file_hash opsional, dihitung di background jika None)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="backup", daemon=True)
+                self._thread.start()
+            done = self._pending.get(path)
+            if done is None or done.is_set():
+                done = self._pending[path] = threading.Event()
+        self._queue.put((path, file_hash, done))
+
+    def wait(self, path=None):
+        """Tunggu backup path (atau semua backup yang masih antri jika path None)."""
+        with self._lock:
+            events = list(self._pending.values()) if path is None else [self._pending.get(path)]
+        for done in events:
+            if done is not None:
+                done.wait()
+
+    def close(self):
+        """Selesaikan antrian lalu hentikan thread penyalin."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            path, file_hash, done = item
+            try:
+                self._backup(path, file_hash)
+            except Exception as e:
+                logging.error(f"Gagal membuat backup untuk {path}: {e}")
+            finally:
+                done.set()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(self.root, 'index.sqlite'))
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                " file_hash TEXT PRIMARY KEY, path TEXT NOT NULL, size INTEGER NOT NULL,"
+                " stored_size INTEGER NOT NULL, created_at REAL NOT NULL);"
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, file_hash TEXT NOT NULL,"
+                " alias TEXT, created_at REAL NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS idx_snapshots_name ON snapshots (name, created_at);"
+            )
+        return self._conn
+
+    def _backup(self, path, file_hash):
+        conn = self._db()
+        name = os.path.basename(path)
+        file_hash = file_hash or file_sha256(path)
+        latest = conn.execute("SELECT file_hash FROM snapshots WHERE name = ? ORDER BY created_at DESC LIMIT 1",
+                              (name,)).fetchone()
+        row = conn.execute("SELECT path FROM objects WHERE file_hash = ?", (file_hash,)).fetchone()
+        if row is not None and not os.path.exists(row[0]):
+            conn.execute("DELETE FROM objects WHERE file_hash = ?", (file_hash,))
+            row = None
+        if row is not None and latest is not None and latest[0] == file_hash:
+            logging.info(f"Backup '{name}' dengan isi yang sama sudah ada, tidak disalin ulang.")
+            return
+
+        started = time.perf_counter()
+        if row is None:
+            object_path = self._store_object(path, file_hash)
+            size, stored_size = os.path.getsize(path), os.path.getsize(object_path)
+            conn.execute("INSERT INTO objects (file_hash, path, size, stored_size, created_at) VALUES (?, ?, ?, ?, ?)",
+                         (file_hash, object_path, size, stored_size, time.time()))
+        else:
+            object_path = row[0]
+
+        alias = self._link_alias(object_path, name)
+        conn.execute("INSERT INTO snapshots (name, file_hash, alias, created_at) VALUES (?, ?, ?, ?)",
+                     (name, file_hash, alias, time.time()))
+        conn.commit()
+        if row is None:
+            logging.info(f"Backup file dibuat: {alias or object_path} ({time.perf_counter() - started:.1f} dtk)")
+        else:
+            logging.info(f"Backup file dibuat: {alias or object_path} (isi sama dengan backup lain, tanpa salin)")
+        self._prune(conn)
+
+    def _link_alias(self, object_path, name):
+        """
+        Nama yang mudah dicari seperti backup lama (<nama>_<waktu><ext>), hardlink ke objek. Jika nama itu
+        sudah ada (backup kedua di detik yang sama): dipakai ulang bila menunjuk objek yang sama, selain itu
+        diberi akhiran _1, _2, ... Mengembalikan None jika filesystem tidak mendukung hardlink.
+        """
+        stem, ext = os.path.splitext(name)
+        base = os.path.join(self.root, f"{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        if object_path.endswith('.gz'):
+            ext += '.gz'
+        for counter in itertools.count():
+            alias = f"{base}_{counter}{ext}" if counter else f"{base}{ext}"
+            try:
+                os.link(object_path, alias)
+                return alias
+            except FileExistsError:
+                if os.path.samefile(alias, object_path):
+                    return alias
+            except OSError as e:
+                logging.debug(f"Hardlink backup tidak didukung ({e}), hanya disimpan di {object_path}.")
+                return None
+
+    def _store_object(self, path, file_hash):
+        ext = os.path.splitext(path)[1].lower()
+        compress = self.compress and ext not in COMPRESSED_FORMATS
+        directory = os.path.join(self.root, 'objects', file_hash[:2])
+        os.makedirs(directory, exist_ok=True)
+        object_path = os.path.join(directory, file_hash + ext + ('.gz' if compress else ''))
+        tmp_path = object_path + '.tmp'
+        try:
+            if compress:
+                with open(path, 'rb') as source, gzip.open(tmp_path, 'wb', compresslevel=1) as target:
+                    shutil.copyfileobj(source, target, COPY_BLOCK_SIZE)
+            elif not _reflink(path, tmp_path):
+                shutil.copyfile(path, tmp_path)
+        except Exception:
+            _remove(tmp_path)
+            raise
+        os.replace(tmp_path, object_path)
+        # Objek dipakai bersama beberapa alias (hardlink): read-only agar tidak ikut berubah jika alias dibuka & disimpan
+        os.chmod(object_path, stat.S_IREAD)
+        return object_path
+
+    def _prune(self, conn):
+        """Hapus snapshot di luar retensi (snapshot terbaru per nama selalu disimpan) dan objek yang tidak dipakai."""
+        expired = []
+        cutoff = time.time() - self.max_days * 86400 if self.max_days > 0 else None
+        for (name,) in conn.execute("SELECT DISTINCT name FROM snapshots").fetchall():
+            rows = conn.execute("SELECT id, alias, created_at FROM snapshots WHERE name = ? ORDER BY created_at DESC",
+                                (name,)).fetchall()
+            for i, (snapshot_id, alias, created_at) in enumerate(rows[1:], start=1):
+                if (self.keep > 0 and i >= self.keep) or (cutoff is not None and created_at < cutoff):
+                    expired.append((snapshot_id, alias))
+        for snapshot_id, alias in expired:
+            conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+            # Alias bisa dipakai bersama beberapa snapshot (isi sama di detik yang sama)
+            if alias and conn.execute("SELECT 1 FROM snapshots WHERE alias = ?", (alias,)).fetchone() is None:
+                _remove(alias)
+        unused = conn.execute("SELECT file_hash, path FROM objects WHERE file_hash NOT IN"
+                              " (SELECT file_hash FROM snapshots)").fetchall()
+        for file_hash, object_path in unused:
+            _remove(object_path)
+            conn.execute("DELETE FROM objects WHERE file_hash = ?", (file_hash,))
+        conn.commit()
+        if expired:
+            logging.info(f"Retensi backup: {len(expired)} snapshot lama dihapus ({len(unused)} file objek).")
@@ -0,0 +1 @@
+"""Benchmark offline: mock server matchapro, generator beban Excel sintetis dan harness pengukur run."""
@@ -0,0 +1,217 @@
+"""
+Server tiruan matchapro (dirgc & dirgc/konfirmasi-user) untuk benchmark offline.
+
+Perilaku yang ditiru:
+- GET /dirgc: halaman dengan <meta name="csrf-token"> dan gcSubmitToken baru (token lama hangus),
+- POST /dirgc/konfirmasi-user: gc_token sekali pakai yang dirantai lewat new_gc_token,
+  400 "Token invalid atau sudah terpakai", 429 + Retry-After saat melewati batas laju,
+  200 "sudah diground check oleh user lain" (token tidak terpakai), dan error 500 acak,
+- latensi tiap request (dasar + jitter) bisa diatur.
+
+Jalankan sendiri: python -m bench.mock_matchapro --port 8765 --latency-ms 80
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+DIRGC_PATH = '/dirgc'
+SUBMIT_PATH = '/dirgc/konfirmasi-user'
+TOKEN_INVALID = 'Token invalid atau sudah terpakai'
+ALREADY_GC = 'Usaha ini sudah diground check oleh user lain'
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta name="csrf-token" content="{csrf}"><title>DIRGC</title></head>
+<body><div id="app"></div>
+<script>var gcSubmitToken = "{token}";</script>
+</body></html>"""
+
+
+class MockConfig:
+    def __init__(self, latency_ms=50.0, jitter_ms=20.0, error_rate=0.0, max_rps=0.0, retry_after=2,
+                 already_gc_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.max_rps = max_rps          # 0 = tanpa batas laju (tidak pernah 429)
+        self.retry_after = retry_after
+        self.already_gc_rate = already_gc_rate
+        self.seed = seed
+
+
+class MockMatchapro:
+    """Server di thread background. url = alamat dasar (tanpa path)."""
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        self.config = config or MockConfig()
+        self.random = random.Random(self.config.seed)
+        self.sessions = {}        # sid -> {'csrf': ..., 'token': ...}
+        self.confirmed = set()    # perusahaan_id yang sudah terkirim
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._bucket = 1.0
+        self._bucket_at = time.monotonic()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._server.server_address[0]
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-matchapro", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def new_session(self):
+        """Membuat sesi login siap pakai. Mengembalikan (sid, csrf_token, gc_token)."""
+        sid = uuid.uuid4().hex
+        session = {'csrf': uuid.uuid4().hex, 'token': uuid.uuid4().hex}
+        with self._lock:
+            self.sessions[sid] = session
+        return sid, session['csrf'], session['token']
+
+    def _count(self, outcome):
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+
+    def _sleep(self):
+        delay = self.config.latency_ms + self.random.uniform(-1, 1) * self.config.jitter_ms
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _rate_limited(self):
+        if self.config.max_rps <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._bucket = min(1.0, self._bucket + (now - self._bucket_at) * self.config.max_rps)
+            self._bucket_at = now
+            if self._bucket < 1.0:
+                return True
+            self._bucket -= 1.0
+            return False
+
+    def _submit(self, sid, form):
+        """Mengembalikan (kode HTTP, body JSON, header tambahan)."""
+        if self._rate_limited():
+            self._count('429')
+            return 429, {'message': 'Too Many Attempts.'}, {'Retry-After': str(self.config.retry_after)}
+        with self._lock:
+            session = self.sessions.get(sid)
+            if session is None or form.get('_token') != session['csrf']:
+                outcome, result = '419', (419, {'message': 'CSRF token mismatch.'}, {})
+            elif self.random.random() < self.config.error_rate:
+                outcome, result = '500', (500, {'message': 'Server Error'}, {})
+            elif form.get('gc_token') != session['token']:
+                outcome, result = 'token_invalid', (400, {'status': 'error', 'message': TOKEN_INVALID}, {})
+            elif (form.get('perusahaan_id') in self.confirmed
+                  or self.random.random() < self.config.already_gc_rate):
+                outcome, result = 'sudah_gc', (200, {'status': 'error', 'message': ALREADY_GC}, {})
+            else:
+                session['token'] = uuid.uuid4().hex
+                self.confirmed.add(form.get('perusahaan_id'))
+                outcome, result = 'berhasil', (200, {'status': 'success', 'message': 'Data berhasil disimpan',
+                                                     'new_gc_token': session['token']}, {})
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        return result
+
+    def _page(self, sid):
+        with self._lock:
+            session = self.sessions.get(sid)
+            if session is None:
+                # Tanpa SSO: sesi baru langsung dianggap login
+                sid = uuid.uuid4().hex
+                session = self.sessions[sid] = {'csrf': uuid.uuid4().hex}
+            session['token'] = uuid.uuid4().hex
+            self.counts['page'] = self.counts.get('page', 0) + 1
+            return sid, PAGE_TEMPLATE.format(csrf=session['csrf'], token=session['token'])
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Header & body dikirim terpisah; tanpa TCP_NODELAY delayed ACK menambah ~40 ms per respons
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _sid(self):
+                for part in self.headers.get('Cookie', '').split(';'):
+                    name, _, value = part.strip().partition('=')
+                    if name == 'sid':
+                        return value
+                return None
+
+            def _send(self, code, body, content_type, headers=None):
+                data = body.encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.split('?')[0].rstrip('/') != DIRGC_PATH:
+                    self._send(404, 'Not Found', 'text/plain')
+                    return
+                mock._sleep()
+                sid, page = mock._page(self._sid())
+                self._send(200, page, 'text/html; charset=utf-8', {'Set-Cookie': f'sid={sid}; Path=/; HttpOnly'})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length).decode('utf-8')
+                if self.path.split('?')[0] != SUBMIT_PATH:
+                    self._send(404, 'Not Found', 'text/plain')
+                    return
+                form = {k: v[0] for k, v in parse_qs(raw, keep_blank_values=True).items()}
+                mock._sleep()
+                code, body, headers = mock._submit(self._sid(), form)
+                self._send(code, json.dumps(body), 'application/json', headers)
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server tiruan matchapro untuk benchmark offline.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=20.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="peluang respons 500 per POST")
+    parser.add_argument('--max-rps', type=float, default=0.0, help="batas laju server (0 = tanpa 429)")
+    parser.add_argument('--retry-after', type=int, default=2)
+    parser.add_argument('--already-gc-rate', type=float, default=0.0,
+                        help="peluang respons 'sudah diground check oleh user lain'")
+    args = parser.parse_args(argv)
+    config = MockConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.max_rps, args.retry_after,
+                        args.already_gc_rate)
+    server = MockMatchapro(config, port=args.port).start()
+    print(f"Mock matchapro berjalan di {server.url}{DIRGC_PATH} (Ctrl+C untuk berhenti)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Benchmark end-to-end perintah run terhadap server tiruan matchapro (tanpa jaringan, tanpa login SSO).
+
+Langkah: buat folder kerja sementara berisi bounding_boxes.json & file Excel sintetis, jalankan
+mock server, isi file sesi (warm start) untuk tiap rantai submit, lalu jalankan runner.main() dan
+laporkan baris/dtk, latensi POST, hasil di sisi server, dan puncak memori.
+
+Contoh:
+    python -m bench.run --rows 2000 --workers 4 --latency-ms 80
+    python -m bench.run --rows 5000 --max-rps 30 --error-rate 0.01 --output bench_output.json
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from bench.mock_matchapro import DIRGC_PATH, SUBMIT_PATH, MockConfig, MockMatchapro
+from bench.workload import write_workload
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def peak_rss_mb():
+    """Puncak resident memory proses ini (MB), termasuk mock server yang berjalan di proses yang sama."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux melaporkan KB, macOS byte
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return getattr(info, 'peak_wset', info.rss) / 1024 / 1024
+        except ImportError:
+            return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline MatchaIn GC terhadap mock matchapro.")
+    workload = parser.add_argument_group("beban")
+    workload.add_argument('--rows', type=int, default=1000, help="jumlah baris total (default: 1000)")
+    workload.add_argument('--files', type=int, default=1, help="jumlah file Excel input (default: 1)")
+    workload.add_argument('--invalid-rate', type=float, default=0.02, help="porsi baris tidak valid")
+    workload.add_argument('--duplicate-rate', type=float, default=0.01, help="porsi perusahaan_id kembar")
+    workload.add_argument('--seed', type=int, default=0)
+    workload.add_argument('--format', default='xlsx', choices=('xlsx', 'csv', 'parquet', 'jsonl'),
+                          help="format file input (default: xlsx)")
+    server = parser.add_argument_group("mock server")
+    server.add_argument('--latency-ms', type=float, default=50.0)
+    server.add_argument('--jitter-ms', type=float, default=20.0)
+    server.add_argument('--error-rate', type=float, default=0.0, help="peluang respons 500 per POST")
+    server.add_argument('--max-rps', type=float, default=0.0, help="batas laju server, 0 = tanpa 429")
+    server.add_argument('--retry-after', type=int, default=1)
+    server.add_argument('--already-gc-rate', type=float, default=0.0)
+    client = parser.add_argument_group("klien (menimpa .env)")
+    client.add_argument('--workers', type=int, default=2, help="SUBMIT_WORKERS")
+    client.add_argument('--rate-initial', type=float, default=20.0, help="RATE_INITIAL (req/dtk)")
+    client.add_argument('--rate-max', type=float, default=200.0, help="RATE_MAX (req/dtk)")
+    client.add_argument('--backend', default='requests', help="HTTP_BACKEND: requests / httpx")
+    client.add_argument('--env', action='append', default=[], metavar='NAMA=NILAI',
+                        help="variabel lingkungan tambahan untuk run (boleh berulang)")
+    parser.add_argument('--keep', action='store_true', help="jangan hapus folder kerja sementara")
+    parser.add_argument('--verbose', action='store_true', help="tampilkan log INFO di konsol")
+    parser.add_argument('--output', help="simpan hasil sebagai JSON ke file ini")
+    parser.add_argument('main_args', nargs=argparse.REMAINDER,
+                        help="argumen untuk perintah run setelah '--', misal: -- --profile")
+    return parser.parse_args(argv)
+
+
+def configure_env(args):
+    env = {
+        'BPS_USERNAME': 'bench', 'BPS_PASSWORD': 'bench', 'USE_SESSION_CACHE': 'true',
+        'SUBMIT_WORKERS': str(args.workers), 'RATE_INITIAL': str(args.rate_initial),
+        'RATE_MIN': '0.5', 'RATE_MAX': str(args.rate_max), 'HTTP_BACKEND': args.backend,
+        'SESSION_KEEPALIVE': '0', 'METRICS_FILE': '', 'DESA_GEOJSON_DIR': '',
+    }
+    for item in args.env:
+        name, _, value = item.partition('=')
+        env[name] = value
+    os.environ.update(env)
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='matchain_bench_')
+    shutil.copy(os.path.join(REPO_DIR, 'bounding_boxes.json'), workdir)
+    started = time.perf_counter()
+    write_workload(os.path.join(workdir, 'input'), args.rows, args.files,
+                   os.path.join(workdir, 'bounding_boxes.json'), args.invalid_rate, args.duplicate_rate, args.seed,
+                   args.format)
+    generate_seconds = time.perf_counter() - started
+
+    mock = MockMatchapro(MockConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.max_rps,
+                                    args.retry_after, args.already_gc_rate, seed=args.seed)).start()
+    configure_env(args)
+    previous_dir = os.getcwd()
+    os.chdir(workdir)
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+    try:
+        import main as cli
+        cli.setup_logging(logging.INFO if args.verbose else logging.WARNING)
+        run_args = cli.parse_args(['run'] + [a for a in args.main_args if a != '--'])
+        started = time.perf_counter()
+        import runner
+        import_seconds = time.perf_counter() - started
+        runner.DIR_URL = mock.url + DIRGC_PATH
+        runner.POST_URL = mock.url + SUBMIT_PATH
+        runner.print_validation_rules = lambda: None
+
+        # Warm start: tiap rantai submit sudah punya sesi, CSRF & gc_token yang valid di mock
+        for worker_id in range(1, runner.SUBMIT_WORKERS + 1):
+            sid, csrf_token, gc_token = mock.new_session()
+            cookies = [{'name': 'sid', 'value': sid, 'domain': mock.host, 'path': '/'}]
+            runner.store_session_data(cookies, csrf_token, runner.get_session_file(worker_id), gc_token, quiet=True)
+
+        started = time.perf_counter()
+        runner.main(run_args.profile, run_args.profile_cpu, run_args.profile_memory)
+        run_seconds = time.perf_counter() - started
+    finally:
+        os.chdir(previous_dir)
+        mock.stop()
+
+    submitted = runner.ROWS_SUBMITTED.total()
+    latency = runner.POST_LATENCY.percentiles()
+    result = {
+        'rows': args.rows,
+        'format': args.format,
+        'workers': args.workers,
+        'backend': args.backend,
+        'latency_ms': args.latency_ms,
+        'import_seconds': import_seconds,
+        'generate_seconds': generate_seconds,
+        'run_seconds': run_seconds,
+        'rows_submitted': submitted,
+        'rows_skipped': runner.ROWS_SKIPPED.total(),
+        'rows_per_second': submitted / run_seconds if run_seconds > 0 else None,
+        'post_latency_ms': {f"p{q}": (v * 1000 if v is not None else None) for q, v in latency.items()},
+        'post_responses': {item['labels'].get('code', '?'): item['value']
+                           for item in runner.POST_RESPONSES.snapshot()['values']},
+        'server': dict(sorted(mock.counts.items())),
+        'peak_rss_mb': peak_rss_mb(),
+        'workdir': workdir if args.keep else None,
+    }
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+
+def format_result(result):
+    def ms(value):
+        return f"{value:.1f} ms" if value is not None else "-"
+
+    lat = result['post_latency_ms']
+    lines = [
+        "",
+        "=" * 50,
+        "   HASIL BENCHMARK",
+        "=" * 50,
+        f"Baris            : {result['rows']} {result['format']} ({result['workers']} worker, backend {result['backend']}, "
+        f"latensi mock {result['latency_ms']:.0f} ms)",
+        f"Import runner    : {result['import_seconds']:.3f} dtk",
+        f"Durasi run       : {result['run_seconds']:.2f} dtk",
+        f"Terkirim/dilewati: {result['rows_submitted']} / {result['rows_skipped']}",
+        f"Throughput       : {result['rows_per_second']:.1f} baris/dtk" if result['rows_per_second'] else
+        "Throughput       : -",
+        f"Latensi POST     : p50 {ms(lat['p50'])}, p95 {ms(lat['p95'])}, p99 {ms(lat['p99'])}",
+        f"Respons klien    : {result['post_responses']}",
+        f"Hasil di server  : {result['server']}",
+        f"Puncak RSS       : {result['peak_rss_mb']:.1f} MB" if result['peak_rss_mb'] else "Puncak RSS       : -",
+    ]
+    if result['workdir']:
+        lines.append(f"Folder kerja     : {result['workdir']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = run(args)
+    print(format_result(result))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
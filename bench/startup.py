@@ -0,0 +1,109 @@
+"""
+Benchmark waktu start CLI: tiap perintah dijalankan sebagai proses baru beberapa kali dan
+waktu wall-clock-nya dicatat (termasuk start interpreter, yang diukur terpisah sebagai baseline).
+
+Contoh:
+    python -m bench.startup
+    python -m bench.startup --repeat 10 --importtime --output bench_startup.json
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIGHT_BUDGET_MS = 200
+
+# (nama, argumen python, perintah ringan yang harus selesai < LIGHT_BUDGET_MS termasuk start interpreter)
+CASES = [
+    ('python (baseline)', ['-c', 'pass'], False),
+    ('main.py --help', ['{main}', '--help'], True),
+    ('main.py status', ['{main}', 'status'], True),
+    ('main.py report --list', ['{main}', 'report', '--list'], True),
+    ('import runner', ['-c', 'import sys; sys.path.insert(0, {repo!r}); import runner'], False),
+]
+
+
+def time_command(argv, cwd, env, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable] + argv, cwd=cwd, env=env, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {'min_ms': min(samples), 'median_ms': statistics.median(samples)}
+
+
+def top_imports(code, cwd, env, limit=10):
+    """Modul dengan waktu import kumulatif terbesar (python -X importtime)."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=cwd, env=env,
+                          capture_output=True, text=True, check=False)
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)', line)
+        if match:
+            rows.append((int(match.group(2)) / 1000, match.group(4)))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def run(args):
+    # Folder kosong agar status/report tidak bergantung pada isi folder repo
+    workdir = tempfile.mkdtemp(prefix='matchain_startup_')
+    env = dict(os.environ)
+    main_path = os.path.join(REPO_DIR, 'main.py')
+    results = {}
+    try:
+        # Pemanasan: isi cache bytecode & page cache file sistem
+        subprocess.run([sys.executable, main_path, 'status'], cwd=workdir, env=env, capture_output=True, check=False)
+        subprocess.run([sys.executable, '-c', f'import sys; sys.path.insert(0, {REPO_DIR!r}); import runner'],
+                       cwd=workdir, env=env, capture_output=True, check=False)
+        for name, argv, light in CASES:
+            argv = [a.format(main=main_path, repo=REPO_DIR) for a in argv]
+            results[name] = dict(time_command(argv, workdir, env, args.repeat), light=light)
+        imports = top_imports(f'import sys; sys.path.insert(0, {REPO_DIR!r}); import runner', workdir, env) \
+            if args.importtime else []
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    baseline = results['python (baseline)']['min_ms']
+    for result in results.values():
+        result['over_baseline_ms'] = result['min_ms'] - baseline
+    return {'repeat': args.repeat, 'python': sys.version.split()[0], 'commands': results,
+            'runner_imports': [{'module': module, 'cumulative_ms': ms} for ms, module in imports]}
+
+
+def format_result(result):
+    lines = ["", "=" * 60, "   WAKTU START CLI", "=" * 60,
+             f"{'Perintah':<26}{'Min (ms)':>10}{'Median (ms)':>13}{'+Baseline':>11}"]
+    for name, r in result['commands'].items():
+        flag = ''
+        if r['light']:
+            flag = '  OK' if r['min_ms'] < LIGHT_BUDGET_MS else f'  > {LIGHT_BUDGET_MS} ms!'
+        lines.append(f"{name:<26}{r['min_ms']:>10.0f}{r['median_ms']:>13.0f}{r['over_baseline_ms']:>11.0f}{flag}")
+    if result['runner_imports']:
+        lines.extend(["", "Import kumulatif terbesar saat 'import runner':"])
+        for item in result['runner_imports']:
+            lines.append(f"  {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark waktu start perintah CLI MatchaIn GC.")
+    parser.add_argument('--repeat', type=int, default=5, help="jumlah pengulangan per perintah (default: 5)")
+    parser.add_argument('--importtime', action='store_true', help="tampilkan modul termahal saat import runner")
+    parser.add_argument('--output', help="simpan hasil sebagai JSON ke file ini")
+    args = parser.parse_args(argv)
+    result = run(args)
+    print(format_result(result))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
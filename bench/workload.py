@@ -0,0 +1,102 @@
+"""
+Generator file input sintetis (Excel/CSV/Parquet/JSONL) untuk benchmark: koordinat diambil di dalam bounding box
+kabupaten dari bounding_boxes.json, sebagian kecil baris bisa dibuat tidak valid atau kembar.
+
+Jalankan sendiri: python -m bench.workload --rows 10000 --files 2 --out input
+"""
+import argparse
+import json
+import os
+import random
+
+import pandas as pd
+
+from region_index import extract_region_code
+
+HASILGC = ['1', '3', '4', '99']
+
+
+def load_boxes(bbox_file):
+    """List (kode wilayah, [min_lon, min_lat, max_lon, max_lat]) dari bounding_boxes.json."""
+    with open(bbox_file, 'r', encoding='utf-8') as f:
+        mapping = json.load(f)
+    boxes = []
+    for key, bounds in mapping.items():
+        code = extract_region_code(key)
+        if code and len(bounds) == 4:
+            boxes.append((code, bounds))
+    return boxes
+
+
+def generate_rows(n_rows, boxes, invalid_rate=0.0, duplicate_rate=0.0, seed=0, id_prefix='BENCH'):
+    """DataFrame dengan kolom input wajib (semua string)."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        code, (min_lon, min_lat, max_lon, max_lat) = rng.choice(boxes)
+        # Ambil titik di tengah bbox (10% tepi dibuang) agar pasti lolos cek bbox
+        lon = min_lon + (max_lon - min_lon) * rng.uniform(0.1, 0.9)
+        lat = min_lat + (max_lat - min_lat) * rng.uniform(0.1, 0.9)
+        edit_nama = rng.random() < 0.3
+        edit_alamat = rng.random() < 0.3
+        row = {
+            'perusahaan_id': f"{id_prefix}{seed:03d}{i:08d}",
+            'kdkab': code[-2:],
+            'latitude': f"{lat:.6f}",
+            'longitude': f"{lon:.6f}",
+            'hasilgc': rng.choice(HASILGC),
+            'edit_nama': '1' if edit_nama else '0',
+            'edit_alamat': '1' if edit_alamat else '0',
+            'nama_usaha': f"Usaha Sintetis {i}" if edit_nama else '',
+            'alamat_usaha': f"Jl. Benchmark No. {i}" if edit_alamat else '',
+        }
+        if rows and rng.random() < duplicate_rate:
+            row['perusahaan_id'] = rng.choice(rows)['perusahaan_id']
+        if rng.random() < invalid_rate:
+            row[rng.choice(['hasilgc', 'longitude', 'kdkab'])] = rng.choice(['7', '', '123'])
+        rows.append(row)
+    return pd.DataFrame(rows, dtype=str)
+
+
+def write_workload(out_dir, n_rows, n_files, bbox_file, invalid_rate=0.0, duplicate_rate=0.0, seed=0, fmt='xlsx'):
+    """Menulis n_files file input berformat fmt (xlsx/csv/parquet/jsonl, n_rows baris total). Mengembalikan list path."""
+    os.makedirs(out_dir, exist_ok=True)
+    boxes = load_boxes(bbox_file)
+    if not boxes:
+        raise ValueError(f"Tidak ada bounding box yang bisa dipakai di {bbox_file}")
+    paths = []
+    per_file = max(1, n_rows // n_files)
+    for i in range(n_files):
+        count = per_file if i < n_files - 1 else n_rows - per_file * (n_files - 1)
+        df = generate_rows(count, boxes, invalid_rate, duplicate_rate, seed=seed + i)
+        path = os.path.join(out_dir, f"bench_{i + 1:02d}.{fmt}")
+        if fmt == 'csv':
+            df.to_csv(path, index=False)
+        elif fmt == 'parquet':
+            df.to_parquet(path, index=False)
+        elif fmt == 'jsonl':
+            df.to_json(path, orient='records', lines=True, force_ascii=False)
+        else:
+            df.to_excel(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generator file input sintetis untuk benchmark.")
+    parser.add_argument('--rows', type=int, default=1000, help="jumlah baris total")
+    parser.add_argument('--files', type=int, default=1)
+    parser.add_argument('--out', default='input')
+    parser.add_argument('--bbox-file', default='bounding_boxes.json')
+    parser.add_argument('--invalid-rate', type=float, default=0.0)
+    parser.add_argument('--duplicate-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', default='xlsx', choices=('xlsx', 'csv', 'parquet', 'jsonl'))
+    args = parser.parse_args(argv)
+    for path in write_workload(args.out, args.rows, args.files, args.bbox_file, args.invalid_rate,
+                               args.duplicate_rate, args.seed, args.format):
+        print(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,446 @@
+"""
+Mode daemon (python main.py daemon): proses berjalan terus, memantau folder input/ dan memproses
+file yang masuk tanpa interaksi. Sesi login, browser, indeks wilayah, jurnal, cache input dan
+ledger disiapkan sekali lalu dipakai untuk semua job. Job juga bisa dikirim lewat API lokal.
+"""
+import json
+import logging
+import os
+import shutil
+import signal
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from watchdog.observers import Observer  # Opsional, event folder (inotify/ReadDirectoryChangesW/FSEvents)
+except ImportError:
+    Observer = None
+
+import runner
+from geo_validation import load_desa_polygon_index
+from http_transport import AdaptiveTimeout
+from input_cache import InputCache
+from metrics import METRICS, MetricsExporter
+from rate_control import RateController
+from status_journal import StatusJournal
+from submission_ledger import SubmissionLedger
+from settings import (
+    DAEMON_API_PORT, DAEMON_POLL_INTERVAL, DAEMON_RETRY_INTERVAL, DAEMON_SETTLE_SECONDS, DESA_CACHE_SIZE,
+    DESA_GEOJSON_DIR, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, INPUT_CACHE_FILE, INPUT_DIR, INPUT_EXTENSIONS, LEDGER_FILE,
+    LEDGER_IMPORT_DIR, METRICS_FILE, METRICS_INTERVAL, METRICS_PORT, RATE_INITIAL, RATE_MAX, RATE_MIN,
+    STATUS_JOURNAL_FILE,
+)
+
+# Scan cadangan saat watchdog aktif (mis. folder jaringan yang tidak selalu mengirim event)
+RESCAN_INTERVAL = 60
+# Jeda awal & maksimum (detik) sebelum mencoba login lagi saat jaringan/VPN putus
+LOGIN_BACKOFF = (30, 900)
+# Jeda kirim ulang file dengan baris gagal kirim berlipat dua tiap percobaan, maksimal kelipatan ini
+RETRY_BACKOFF_LIMIT = 8
+HISTORY_SIZE = 100
+
+DAEMON_JOBS = METRICS.counter('matchain_daemon_jobs_total', 'File yang selesai diproses daemon per hasil')
+
+
+def file_signature(path):
+    """(ukuran, waktu ubah) file, atau None jika file tidak ada."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def is_locked(path):
+    """File sedang dibuka Excel (ada file kunci ~$nama di sebelahnya)."""
+    return os.path.exists(os.path.join(os.path.dirname(path), "~$" + os.path.basename(path)))
+
+
+def _public(job):
+    info = {key: value for key, value in job.items() if key != 'signature'}
+    for key in ('queued_at', 'finished_at', 'retry_at'):
+        if info.get(key):
+            info[key] = datetime.fromtimestamp(info[key]).isoformat(timespec='seconds')
+    return info
+
+
+class JobQueue:
+    """
+    Antrian file input, satu entri per path. File yang sudah diproses baru diantrikan lagi jika
+    isinya berubah, atau jika masih ada baris gagal kirim setelah jeda yang makin panjang.
+    State: antri, diproses, selesai (pindah ke processed/), sebagian (sisa baris tidak valid),
+    tertunda (menunggu kirim ulang), gagal (file tidak bisa dibaca/kolom tidak lengkap).
+    """
+
+    def __init__(self, retry_interval):
+        self.retry_interval = retry_interval
+        self._ready = threading.Condition()
+        self._order = deque()
+        self._jobs = {}
+        self._history = deque(maxlen=HISTORY_SIZE)
+
+    def wants(self, path, signature):
+        """Apakah file ini perlu diantrikan (baru, berubah, atau waktunya kirim ulang)."""
+        with self._ready:
+            job = self._jobs.get(path)
+            if job is None:
+                return True
+            if job['state'] in ('antri', 'diproses'):
+                return False
+            if job['signature'] != signature:
+                return True
+            return job['retry_at'] is not None and time.time() >= job['retry_at']
+
+    def offer(self, path, signature, source='folder'):
+        """Antrikan file. False jika file sudah antri atau sedang diproses."""
+        with self._ready:
+            job = self._jobs.get(path)
+            if job is not None and job['state'] in ('antri', 'diproses'):
+                return False
+            attempts = job['attempts'] if job is not None and job['signature'] == signature else 0
+            self._jobs[path] = {'file': os.path.basename(path), 'path': path, 'source': source, 'state': 'antri',
+                                'signature': signature, 'attempts': attempts, 'queued_at': time.time(),
+                                'finished_at': None, 'retry_at': None, 'result': None}
+            self._order.append(path)
+            self._ready.notify_all()
+        retry = f", percobaan ke-{attempts + 1}" if attempts else ""
+        logging.info(f"Job baru: '{os.path.basename(path)}' masuk antrian (dari {source}{retry}).")
+        return True
+
+    def job(self, path):
+        with self._ready:
+            job = self._jobs.get(path)
+            return _public(job) if job is not None else None
+
+    def wait(self, timeout):
+        """Tunggu sampai ada file di antrian (True) atau timeout (False)."""
+        with self._ready:
+            if not self._order:
+                self._ready.wait(timeout)
+            return bool(self._order)
+
+    def drain(self, taken):
+        """
+        Sumber file untuk tahap ingest pipeline: mengambil file antri satu per satu sampai antrian
+        kosong, jadi file yang masuk saat file sebelumnya masih dibaca ikut diproses di batch yang sama.
+        Path yang diambil dicatat di `taken`.
+        """
+        while True:
+            with self._ready:
+                if not self._order:
+                    return
+                path = self._order.popleft()
+                if is_locked(path) or not os.path.exists(path):
+                    # Dilepas dari antrian; watcher mengantrikannya lagi setelah file ditutup
+                    del self._jobs[path]
+                    logging.warning(f"'{os.path.basename(path)}' sedang dibuka atau hilang, ditunda.")
+                    continue
+                job = self._jobs[path]
+                job['state'] = 'diproses'
+                job['attempts'] += 1
+            taken.append(path)
+            yield path
+
+    def finish(self, paths, all_stats):
+        """Catat hasil batch per file dan jadwalkan kirim ulang file yang masih punya baris gagal kirim."""
+        stats_by_name = {stats['filename']: stats for stats in all_stats}
+        now = time.time()
+        with self._ready:
+            for path in paths:
+                job = self._jobs.get(path)
+                if job is None:
+                    continue
+                stats = stats_by_name.get(job['file'])
+                job['finished_at'] = now
+                job['signature'] = file_signature(path)
+                job['result'] = {key: stats.get(key, 0) for key in ('total', 'success', 'failed', 'skipped', 'transient_failed')} \
+                    if stats else None
+                if job['signature'] is None:
+                    job['state'] = 'selesai'
+                    del self._jobs[path]
+                elif stats is None:
+                    job['state'] = 'gagal'
+                elif stats.get('transient_failed'):
+                    delay = self.retry_interval * min(2 ** (job['attempts'] - 1), RETRY_BACKOFF_LIMIT)
+                    job['state'] = 'tertunda'
+                    job['retry_at'] = now + delay
+                    logging.info(f"[{job['file']}] {stats['transient_failed']} baris masih gagal sementara, "
+                                 f"dicoba lagi dalam {delay / 60:.0f} menit.")
+                else:
+                    job['state'] = 'sebagian'
+                DAEMON_JOBS.inc(hasil=job['state'])
+                self._history.append(dict(job))
+
+    def prune(self, present):
+        """Lupakan file yang sudah tidak ada di folder input (dipindah/dihapus user)."""
+        with self._ready:
+            for path in [p for p, job in self._jobs.items() if p not in present and job['state'] not in ('antri', 'diproses')]:
+                del self._jobs[path]
+
+    def snapshot(self):
+        with self._ready:
+            return {'jobs': [_public(job) for job in self._jobs.values()],
+                    'history': [_public(job) for job in self._history]}
+
+
+class InputWatcher:
+    """
+    Memantau folder input. File baru/berubah diantrikan setelah ukuran & waktu ubahnya tidak berubah
+    selama settle_seconds (file selesai disalin) dan tidak sedang dibuka Excel. Memakai watchdog
+    jika terpasang (pip install watchdog), selain itu scan berkala tiap poll_interval detik.
+    """
+
+    def __init__(self, directory, job_queue, poll_interval=5.0, settle_seconds=3.0):
+        self.directory = directory
+        self.job_queue = job_queue
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self._pending = {}  # path -> (signature, waktu signature ini pertama terlihat)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if Observer is not None:
+            try:
+                observer = Observer()
+                observer.schedule(self, self.directory, recursive=False)
+                observer.start()
+                self._observer = observer
+            except Exception as e:
+                logging.warning(f"Watchdog gagal dipasang di '{self.directory}', memakai scan berkala: {e}")
+        mode = "watchdog" if self._observer is not None else f"scan tiap {self.poll_interval:g} dtk"
+        logging.info(f"Memantau folder '{self.directory}' ({mode}).")
+        self._thread = threading.Thread(target=self._loop, name="input-watcher", daemon=True)
+        self._thread.start()
+
+    def dispatch(self, event):
+        """Dipanggil watchdog untuk setiap event di folder input."""
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.scan()
+            except Exception as e:
+                logging.warning(f"Scan folder '{self.directory}' gagal: {e}")
+            if self._pending:
+                timeout = max(0.5, self.settle_seconds / 2)
+            else:
+                timeout = RESCAN_INTERVAL if self._observer is not None else self.poll_interval
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def scan(self):
+        now = time.monotonic()
+        present = set()
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith("~$") or not name.lower().endswith(INPUT_EXTENSIONS):
+                continue
+            path = os.path.join(self.directory, name)
+            present.add(path)
+            signature = file_signature(path)
+            if signature is None or is_locked(path) or not self.job_queue.wants(path, signature):
+                self._pending.pop(path, None)
+                continue
+            seen = self._pending.get(path)
+            if seen is None or seen[0] != signature:
+                self._pending[path] = (signature, now)
+            elif now - seen[1] >= self.settle_seconds:
+                del self._pending[path]
+                self.job_queue.offer(path, signature)
+        for path in [p for p in self._pending if p not in present]:
+            del self._pending[path]
+        self.job_queue.prune(present)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def _api_handler(daemon):
+    class JobHandler(BaseHTTPRequestHandler):
+        def _reply(self, code, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.rstrip('/')
+            if path in ('', '/health'):
+                self._reply(200, daemon.health())
+            elif path == '/jobs':
+                self._reply(200, daemon.queue.snapshot())
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/jobs':
+                self.send_error(404)
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if not isinstance(request, dict):
+                    raise ValueError("Body harus objek JSON, mis. {\"path\": \"C:/data/file.xlsx\"}")
+                job = daemon.submit(str(request.get('path') or ''))
+            except (ValueError, OSError) as e:
+                self._reply(400, {'error': str(e)})
+                return
+            self._reply(202, job)
+
+        def log_message(self, *args):
+            pass
+
+    return JobHandler
+
+
+class Daemon:
+    """Loop daemon: satu set rantai submit & sumber daya yang tetap hidup, batch per isi antrian."""
+
+    def __init__(self, api_port=0):
+        self.api_port = api_port
+        self.stop_event = threading.Event()
+        self.queue = JobQueue(DAEMON_RETRY_INTERVAL)
+        self.watcher = InputWatcher(INPUT_DIR, self.queue, DAEMON_POLL_INTERVAL, DAEMON_SETTLE_SECONDS)
+        self.workers = []
+        self.batches = 0
+        self.started_at = time.time()
+        self._server = None
+
+    def health(self):
+        return {'status': 'siap' if self.workers else 'menunggu login', 'workers': len(self.workers),
+                'batches': self.batches, 'uptime_seconds': round(time.time() - self.started_at)}
+
+    def submit(self, source_path):
+        """Job dari API: file disalin ke folder input (jika belum di sana) lalu langsung diantrikan."""
+        name = os.path.basename(source_path)
+        if not source_path or not os.path.isfile(source_path):
+            raise ValueError(f"File tidak ditemukan: {source_path}")
+        if name.startswith("~$") or not name.lower().endswith(INPUT_EXTENSIONS):
+            raise ValueError(f"Format file tidak didukung (didukung: {', '.join(INPUT_EXTENSIONS)}).")
+        target = os.path.join(INPUT_DIR, name)
+        if os.path.abspath(source_path) != os.path.abspath(target):
+            if os.path.exists(target):
+                raise ValueError(f"File '{name}' sudah ada di folder '{INPUT_DIR}'.")
+            # Salin dengan nama sementara agar watcher tidak melihat file setengah jadi
+            shutil.copy2(source_path, target + '.part')
+            os.replace(target + '.part', target)
+        self.queue.offer(target, file_signature(target), source='api')
+        return self.queue.job(target)
+
+    def _start_api(self):
+        if not self.api_port:
+            return
+        try:
+            self._server = ThreadingHTTPServer(('127.0.0.1', self.api_port), _api_handler(self))
+        except OSError as e:
+            logging.warning(f"API job di port {self.api_port} gagal dibuka: {e}")
+            return
+        threading.Thread(target=self._server.serve_forever, name="daemon-api", daemon=True).start()
+        logging.info(f"API job tersedia di http://127.0.0.1:{self.api_port}/jobs")
+
+    def connect(self, rate_controller, timeouts):
+        """Siapkan rantai submit. Jika login gagal (jaringan/VPN putus), coba lagi dengan jeda yang makin panjang."""
+        delay, max_delay = LOGIN_BACKOFF
+        while not self.stop_event.is_set():
+            try:
+                workers = runner.create_workers(rate_controller, timeouts)
+            except Exception as e:
+                logging.error(f"Otentikasi gagal: {e}")
+                workers = []
+            if workers:
+                return workers
+            logging.warning(f"Belum ada rantai submit yang siap. Login dicoba lagi dalam {delay:.0f} detik...")
+            self.stop_event.wait(delay)
+            delay = min(delay * 2, max_delay)
+        return []
+
+    def run(self):
+        runner.INTERACTIVE = False
+        logging.info("Daemon dimulai.")
+        bbox_map = runner.load_bounding_boxes()
+        polygon_index = load_desa_polygon_index(DESA_GEOJSON_DIR, DESA_CACHE_SIZE)
+        runner.remove_cached_sessions()
+
+        rate_controller = RateController(RATE_INITIAL, RATE_MIN, RATE_MAX)
+        timeouts = AdaptiveTimeout(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        metrics_exporter = MetricsExporter(METRICS, METRICS_FILE, METRICS_INTERVAL, METRICS_PORT)
+        metrics_exporter.start()
+        journal = StatusJournal(STATUS_JOURNAL_FILE)
+        input_cache = InputCache(INPUT_CACHE_FILE)
+        ledger = SubmissionLedger(LEDGER_FILE)
+        self.watcher.start()
+        self._start_api()
+        try:
+            # Sesi disiapkan sekali dan dijaga keepalive; semua batch memakai rantai submit yang sama
+            self.workers = self.connect(rate_controller, timeouts)
+            idle_logged = False
+            while not self.stop_event.is_set():
+                if not self.queue.wait(1.0):
+                    if not idle_logged:
+                        logging.info(f"Menunggu file baru di folder '{INPUT_DIR}'...")
+                        idle_logged = True
+                    continue
+                idle_logged = False
+                ledger.import_dir(LEDGER_IMPORT_DIR)
+                context = runner.validation_context(bbox_map, polygon_index)
+                taken = []
+                all_stats = runner.run_pipeline(self.queue.drain(taken), self.workers, bbox_map, polygon_index,
+                                                journal, input_cache, context, ledger, cancel_event=self.stop_event)
+                self.queue.finish(taken, all_stats)
+                self.batches += 1
+                for worker in self.workers:
+                    worker.save_state()
+                runner.generate_summary_report(all_stats, rate_controller.snapshot(), timeouts.snapshot())
+            logging.info("Permintaan berhenti diterima, menutup daemon...")
+        finally:
+            self.watcher.stop()
+            if self._server is not None:
+                self._server.shutdown()
+                self._server.server_close()
+            for worker in self.workers:
+                worker.save_state()
+                worker.stop()
+            journal.close()
+            input_cache.close()
+            ledger.close()
+            metrics_exporter.stop()
+            runner.BROWSER.close()
+            logging.info("Daemon berhenti.")
+
+
+def run_daemon(api_port=None):
+    """
+    Perintah daemon. Ctrl+C / SIGTERM menyelesaikan request yang berjalan, menyimpan status, lalu keluar.
+    Sinyal kedua menghentikan paksa (KeyboardInterrupt).
+    """
+    daemon = Daemon(DAEMON_API_PORT if api_port is None else api_port)
+
+    def handle_signal(signum, frame):
+        # Hanya set event: loop utama & pipeline berhenti di titik aman, bukan di tengah commit SQLite
+        # atau penulisan status ke file. Tanpa logging di sini (bisa deadlock pada lock antrian log).
+        if daemon.stop_event.is_set():
+            raise KeyboardInterrupt
+        daemon.stop_event.set()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, handle_signal)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,181 @@
+"""
+Mode validasi saja (python main.py validate): semua file input divalidasi paralel di beberapa proses,
+tanpa login dan tanpa request ke server. Hasil ditulis ke status_upload dan laporan CSV.
+"""
+import csv
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from excel_stream import STATUS_COLUMN
+from geo_validation import load_desa_polygon_index
+from region_index import load_region_index
+from status_journal import done_mask
+from table_io import iter_chunks, read_header, write_statuses
+from validation import INVALID_PREFIX, REQUIRED_COLUMNS, VALIDATION_FAILURES, format_errors, validate_dataframe
+
+# Diisi sekali per proses oleh _init_worker (indeks wilayah & poligon dipakai untuk semua file)
+_bbox_map = None
+_polygon_index = None
+
+
+def _init_worker(bbox_file, index_file, geojson_dir, desa_cache_size):
+    global _bbox_map, _polygon_index
+    _bbox_map = load_region_index(bbox_file, index_file) if bbox_file else None
+    _polygon_index = load_desa_polygon_index(geojson_dir, desa_cache_size)
+
+
+def _rule_counts():
+    return {item['labels'].get('rule'): item['value'] for item in VALIDATION_FAILURES.snapshot()['values']}
+
+
+def validate_file(file_path, chunk_size=5000, write_status=True):
+    """
+    Validasi satu file (dijalankan di proses pool). Baris yang sudah selesai (berhasil/ledger)
+    dilewati. Status 'Invalid: ...' ditulis untuk baris tidak valid dan dihapus dari baris yang
+    sudah diperbaiki. Mengembalikan dict hasil; kegagalan dicatat di 'error', bukan dilempar.
+    """
+    started = time.perf_counter()
+    result = {'file': file_path, 'total': 0, 'invalid': 0, 'skipped': 0, 'fixed': 0, 'rows': [],
+              'rules': {}, 'written': 0, 'error': None, 'seconds': 0.0}
+    try:
+        columns, _ = read_header(file_path)
+        missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+        if missing:
+            result['error'] = f"Kolom wajib tidak ada: {', '.join(missing)}"
+            return result
+
+        rules_before = _rule_counts()
+        statuses = {}
+        for chunk in iter_chunks(file_path, chunk_size):
+            status_values = chunk[STATUS_COLUMN].astype(str)
+            done = done_mask(status_values)
+            result['total'] += len(chunk)
+            result['skipped'] += int(done.sum())
+            todo = np.flatnonzero(~done)
+            if not len(todo):
+                continue
+            errors, _ = validate_dataframe(chunk.iloc[todo], _bbox_map, _polygon_index, build_payload=False)
+            perusahaan_ids = chunk['perusahaan_id'].astype(str).str.strip().to_numpy(dtype=object)
+            for j, i in enumerate(todo):
+                pos = int(chunk.index[i])
+                old_status = status_values.iat[i]
+                if errors[j]:
+                    message = format_errors(errors[j])
+                    result['invalid'] += 1
+                    result['rows'].append((pos, perusahaan_ids[i], "; ".join(errors[j])))
+                    if old_status != message:
+                        statuses[pos] = message
+                elif old_status.startswith(INVALID_PREFIX):
+                    statuses[pos] = ''
+                    result['fixed'] += 1
+
+        rules_after = _rule_counts()
+        result['rules'] = {rule: count - rules_before.get(rule, 0) for rule, count in rules_after.items()
+                           if count > rules_before.get(rule, 0)}
+        if write_status and statuses:
+            write_statuses(file_path, statuses)
+            result['written'] = len(statuses)
+    except PermissionError:
+        result['error'] = "File sedang dibuka/terkunci. Tutup file lalu jalankan ulang."
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def write_report(results, report_file):
+    """Laporan CSV semua baris tidak valid (baris = nomor baris di Excel, header = baris 1)."""
+    with open(report_file, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['file', 'baris', 'perusahaan_id', 'kesalahan'])
+        for result in results:
+            name = os.path.basename(result['file'])
+            for pos, perusahaan_id, message in result['rows']:
+                writer.writerow([name, pos + 2, perusahaan_id, message])
+
+
+def summarize(results, seconds):
+    lines = ["=" * 60, f"HASIL VALIDASI (TANPA KIRIM) - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", "=" * 60]
+    rules = {}
+    total = invalid = skipped = 0
+    for result in sorted(results, key=lambda r: r['file']):
+        name = os.path.basename(result['file'])
+        if result['error']:
+            lines.append(f"FILE: {name} - GAGAL: {result['error']}")
+            continue
+        checked = result['total'] - result['skipped']
+        lines.append(f"FILE: {name} - {checked} baris dicek, {result['invalid']} tidak valid"
+                     f" ({result['skipped']} sudah selesai, dilewati)")
+        total += result['total']
+        invalid += result['invalid']
+        skipped += result['skipped']
+        for rule, count in result['rules'].items():
+            rules[rule] = rules.get(rule, 0) + count
+    lines.append("-" * 40)
+    lines.append(f"  - Total Baris   : {total}")
+    lines.append(f"  - Valid         : {total - invalid - skipped}")
+    lines.append(f"  - Tidak Valid   : {invalid}")
+    lines.append(f"  - Dilewati      : {skipped}")
+    lines.append(f"  - Durasi        : {seconds:.1f} dtk ({total / seconds if seconds > 0 else 0:.0f} baris/dtk)")
+    if rules:
+        lines.append("  - Pelanggaran per aturan:")
+        for rule, count in sorted(rules.items(), key=lambda item: -item[1]):
+            lines.append(f"      {rule:<28}{count:>8}")
+    lines.append("=" * 60)
+    return '\n'.join(lines)
+
+
+def run_validate_only(file_paths, bbox_file, index_file, geojson_dir='', desa_cache_size=8, chunk_size=5000,
+                      jobs=None, write_status=True):
+    """
+    Validasi semua file di proses pool (satu file per proses). Indeks wilayah (.idx) harus sudah
+    dibangun oleh proses utama agar tiap proses cukup membukanya. Mengembalikan list hasil per file.
+    """
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(file_paths)))
+    init_args = (bbox_file, index_file, geojson_dir, desa_cache_size)
+    logging.info(f"Validasi {len(file_paths)} file tanpa login ({jobs} proses)...")
+    started = time.perf_counter()
+    results = []
+
+    def log_result(result):
+        name = os.path.basename(result['file'])
+        if result['error']:
+            logging.error(f"[{name}] Gagal divalidasi: {result['error']}")
+        else:
+            written = f", {result['written']} status ditulis" if result['written'] else ""
+            logging.info(f"[{name}] {result['total']} baris: {result['invalid']} tidak valid, "
+                         f"{result['fixed']} sudah diperbaiki{written} ({result['seconds']:.1f} dtk)")
+        results.append(result)
+
+    if jobs == 1:
+        _init_worker(*init_args)
+        for file_path in file_paths:
+            log_result(validate_file(file_path, chunk_size, write_status))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=init_args) as executor:
+            futures = [executor.submit(validate_file, file_path, chunk_size, write_status) for file_path in file_paths]
+            try:
+                for future in as_completed(futures):
+                    log_result(future.result())
+            except KeyboardInterrupt:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    seconds = time.perf_counter() - started
+    report = summarize(results, seconds)
+    print("\n" + report + "\n")
+    if any(result['rows'] for result in results):
+        report_file = f"validation_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        try:
+            write_report(results, report_file)
+            logging.info(f"Daftar baris tidak valid disimpan di: {report_file}")
+        except Exception as e:
+            logging.error(f"Gagal menyimpan laporan validasi: {e}")
+    return results
@@ -0,0 +1,183 @@
+"""Pembacaan & penulisan Excel secara streaming (per chunk) agar memori tetap kecil untuk file besar."""
+import os
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+try:
+    from python_calamine import CalamineWorkbook  # Opsional, jauh lebih cepat dari openpyxl
+except ImportError:
+    CalamineWorkbook = None
+
+STATUS_COLUMN = 'status_upload'
+
+
+def cell_to_str(value):
+    """Konversi nilai sel ke string, sama seperti pd.read_excel(dtype=str) + fillna('')."""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ''
+        if value.is_integer():
+            return str(int(value))
+    value = str(value)
+    return '' if value == 'nan' else value
+
+
+def header_names(raw_header):
+    """Nama kolom seperti pandas: di-strip, kosong -> 'Unnamed: i', duplikat -> 'nama.1'."""
+    names = []
+    counts = {}
+    for i, value in enumerate(raw_header):
+        name = cell_to_str(value).strip() or f"Unnamed: {i}"
+        if name in counts:
+            counts[name] += 1
+            name = f"{name}.{counts[name]}"
+        else:
+            counts[name] = 0
+        names.append(name)
+    return names
+
+
+def iter_raw_rows(path):
+    """
+    Generator baris mentah (tuple nilai sel) dari sheet pertama; baris pertama adalah header.
+    Memakai python-calamine jika terpasang, openpyxl read-only untuk .xlsx, dan pandas untuk .xls.
+    """
+    if os.path.splitext(path)[1].lower() == '.xls':
+        df = pd.read_excel(path, header=None, dtype=object)
+        yield from df.itertuples(index=False, name=None)
+        return
+    if CalamineWorkbook is not None:
+        workbook = CalamineWorkbook.from_path(path)
+        sheet = workbook.get_sheet_by_index(0)
+        yield from sheet.iter_rows()
+        return
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _iter_data_rows(rows, width):
+    """Menyamakan lebar baris dengan header dan membuang baris kosong di akhir sheet (seperti pandas)."""
+    blank_run = []
+    for row in rows:
+        values = [cell_to_str(value) for value in row[:width]]
+        values.extend([''] * (width - len(values)))
+        if not any(values):
+            blank_run.append(values)
+            continue
+        if blank_run:
+            yield from blank_run
+            blank_run = []
+        yield values
+
+
+def read_header(path):
+    """Membaca header saja. Mengembalikan (nama kolom, perkiraan jumlah baris data atau None)."""
+    if os.path.splitext(path)[1].lower() == '.xls':
+        df = pd.read_excel(path, header=None, dtype=object)
+        return (header_names(df.iloc[0]) if len(df) else []), max(0, len(df) - 1)
+
+    if CalamineWorkbook is not None:
+        sheet = CalamineWorkbook.from_path(path).get_sheet_by_index(0)
+        first = next(iter(sheet.iter_rows()), [])
+        return header_names(first), max(0, sheet.height - 1)
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        first = next(sheet.iter_rows(values_only=True), ())
+        total = sheet.max_row - 1 if sheet.max_row else None
+        return header_names(first), total
+    finally:
+        workbook.close()
+
+
+def iter_chunks(path, chunk_size=5000):
+    """
+    Generator DataFrame (semua kolom string, kosong = '') per chunk_size baris.
+    Index DataFrame adalah posisi baris data di file (0 = baris setelah header), kolom
+    status_upload ditambahkan jika belum ada.
+    """
+    rows = iter_raw_rows(path)
+    try:
+        header = header_names(next(rows, ()))
+        buffer = []
+        start = 0
+        for values in _iter_data_rows(rows, len(header)):
+            buffer.append(values)
+            if len(buffer) >= chunk_size:
+                yield make_chunk(buffer, header, start)
+                start += len(buffer)
+                buffer = []
+        if buffer:
+            yield make_chunk(buffer, header, start)
+    finally:
+        rows.close()
+
+
+def make_chunk(buffer, header, start):
+    chunk = pd.DataFrame(buffer, columns=header, dtype=object, index=pd.RangeIndex(start, start + len(buffer)))
+    if STATUS_COLUMN not in chunk.columns:
+        chunk[STATUS_COLUMN] = ''
+    return chunk
+
+
+def write_statuses(path, statuses):
+    """
+    Menulis ulang file Excel dengan status baru ({posisi baris: status}) secara streaming:
+    baris sumber dibaca satu per satu dan ditulis ke file sementara, lalu menggantikan file asli.
+    Kolom status_upload ditambahkan jika belum ada. File .xls ditulis lewat pandas.
+    """
+    if os.path.splitext(path)[1].lower() == '.xls':
+        df = pd.concat(iter_chunks(path), ignore_index=False)
+        for pos, status in statuses.items():
+            df.at[pos, STATUS_COLUMN] = status
+        df.to_excel(path, index=False)
+        return
+
+    rows = iter_raw_rows(path)
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    try:
+        raw_header = list(next(rows, ()))
+        header = header_names(raw_header)
+        if STATUS_COLUMN in header:
+            status_idx = header.index(STATUS_COLUMN)
+        else:
+            status_idx = len(header)
+            raw_header.append(STATUS_COLUMN)
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(raw_header)
+        blank_run = 0
+        pos = 0
+        for row in rows:
+            values = list(row[:len(header)])
+            if not any(cell_to_str(value) for value in values):
+                blank_run += 1
+                continue
+            for _ in range(blank_run):
+                pos = _append_row(sheet, [], status_idx, statuses, pos)
+            blank_run = 0
+            pos = _append_row(sheet, values, status_idx, statuses, pos)
+        workbook.save(tmp_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        rows.close()
+    os.replace(tmp_path, path)
+
+
+def _append_row(sheet, values, status_idx, statuses, pos):
+    values = values + [None] * (status_idx + 1 - len(values))
+    if pos in statuses:
+        values[status_idx] = statuses[pos]
+    sheet.append(values)
+    return pos + 1
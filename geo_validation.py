@@ -0,0 +1,193 @@
+"""Validasi lokasi tingkat desa (point-in-polygon) berbasis file final_desa_2024*.geojson."""
+import glob
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from region_index import extract_region_code
+
+GRID_SIZE = 64  # Jumlah sel grid per sumbu untuk indeks spasial tiap kabupaten
+EDGE_CHUNK = 2_000_000  # Batas elemen (titik x sisi) per blok perhitungan agar memori tetap kecil
+
+
+def _rings_from_geometry(geometry):
+    """Mengambil semua ring (outer & hole) dari Polygon/MultiPolygon."""
+    if not geometry:
+        return []
+    if geometry.get('type') == 'Polygon':
+        return geometry.get('coordinates', [])
+    if geometry.get('type') == 'MultiPolygon':
+        return [ring for polygon in geometry.get('coordinates', []) for ring in polygon]
+    return []
+
+
+def _points_in_edges(px, py, edges):
+    """Uji even-odd (ray casting) sekumpulan titik terhadap sisi-sisi satu poligon desa."""
+    x1, y1, x2, y2 = edges
+    inside = np.zeros(len(px), dtype=bool)
+    step = max(1, EDGE_CHUNK // max(1, len(x1)))
+    for start in range(0, len(px), step):
+        cx = px[start:start + step, None]
+        cy = py[start:start + step, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crosses = ((y1 > cy) != (y2 > cy)) & (cx < (x2 - x1) * (cy - y1) / (y2 - y1) + x1)
+        inside[start:start + step] = (np.count_nonzero(crosses, axis=1) % 2) == 1
+    return inside
+
+
+class KabPolygons:
+    """Poligon desa dalam satu kabupaten beserta indeks grid bounding box per desa."""
+
+    def __init__(self, features):
+        self.edges = []
+        bounds = []
+        for feature in features:
+            rings = _rings_from_geometry(feature.get('geometry'))
+            parts = []
+            for ring in rings:
+                coords = np.asarray(ring, dtype=float)
+                if coords.ndim != 2 or len(coords) < 3:
+                    continue
+                start = coords[:, :2]
+                end = np.roll(start, -1, axis=0)
+                parts.append(np.hstack([start, end]))
+            if not parts:
+                continue
+            edge_arr = np.vstack(parts)
+            self.edges.append((edge_arr[:, 0], edge_arr[:, 1], edge_arr[:, 2], edge_arr[:, 3]))
+            xs = np.concatenate([edge_arr[:, 0], edge_arr[:, 2]])
+            ys = np.concatenate([edge_arr[:, 1], edge_arr[:, 3]])
+            bounds.append((xs.min(), ys.min(), xs.max(), ys.max()))
+
+        self.bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        if len(self.bounds):
+            self.min_x, self.min_y = self.bounds[:, 0].min(), self.bounds[:, 1].min()
+            self.max_x, self.max_y = self.bounds[:, 2].max(), self.bounds[:, 3].max()
+        else:
+            self.min_x = self.min_y = self.max_x = self.max_y = 0.0
+        self.cell_w = max((self.max_x - self.min_x) / GRID_SIZE, 1e-12)
+        self.cell_h = max((self.max_y - self.min_y) / GRID_SIZE, 1e-12)
+
+        # Indeks grid: sel -> daftar desa yang bounding box-nya menyentuh sel tersebut
+        self.cell_features = {}
+        for fid, (bx0, by0, bx1, by1) in enumerate(self.bounds):
+            cx0, cy0 = self._cell(bx0, by0)
+            cx1, cy1 = self._cell(bx1, by1)
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self.cell_features.setdefault(cx * GRID_SIZE + cy, []).append(fid)
+
+    def _cell(self, x, y):
+        cx = int(np.clip((x - self.min_x) // self.cell_w, 0, GRID_SIZE - 1))
+        cy = int(np.clip((y - self.min_y) // self.cell_h, 0, GRID_SIZE - 1))
+        return cx, cy
+
+    def contains(self, lon, lat):
+        """Mengembalikan mask boolean titik yang berada di dalam salah satu desa."""
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        inside = np.zeros(len(lon), dtype=bool)
+        if not self.edges or not len(lon):
+            return inside
+
+        in_extent = (lon >= self.min_x) & (lon <= self.max_x) & (lat >= self.min_y) & (lat <= self.max_y)
+        idx = np.flatnonzero(in_extent)
+        if not len(idx):
+            return inside
+
+        cx = np.clip(((lon[idx] - self.min_x) // self.cell_w).astype(int), 0, GRID_SIZE - 1)
+        cy = np.clip(((lat[idx] - self.min_y) // self.cell_h).astype(int), 0, GRID_SIZE - 1)
+        cells = cx * GRID_SIZE + cy
+
+        # Kelompokkan titik per desa kandidat (berdasarkan sel grid)
+        candidates = {}
+        order = np.argsort(cells, kind='stable')
+        sorted_cells = cells[order]
+        unique_cells, starts = np.unique(sorted_cells, return_index=True)
+        ends = np.append(starts[1:], len(sorted_cells))
+        for cell, start, end in zip(unique_cells, starts, ends):
+            for fid in self.cell_features.get(int(cell), ()):
+                candidates.setdefault(fid, []).append(idx[order[start:end]])
+
+        for fid, groups in candidates.items():
+            pts = np.concatenate(groups)
+            pts = pts[~inside[pts]]
+            if not len(pts):
+                continue
+            bx0, by0, bx1, by1 = self.bounds[fid]
+            px, py = lon[pts], lat[pts]
+            in_box = (px >= bx0) & (px <= bx1) & (py >= by0) & (py <= by1)
+            pts = pts[in_box]
+            if not len(pts):
+                continue
+            inside[pts] = _points_in_edges(lon[pts], lat[pts], self.edges[fid])
+        return inside
+
+
+class DesaPolygonIndex:
+    """
+    Indeks poligon desa per kabupaten dari folder geojson lokal.
+    Geometri dimuat saat pertama kali dibutuhkan dan disimpan dalam cache LRU.
+    """
+
+    def __init__(self, geojson_dir, cache_size=8):
+        self.geojson_dir = geojson_dir
+        self.cache_size = max(1, cache_size)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()  # Cache LRU dipakai bersama thread validasi
+        self.files = {}
+        for path in glob.glob(os.path.join(geojson_dir, "*.geojson")):
+            full_code = extract_region_code(os.path.basename(path))
+            if full_code:
+                self.files[full_code] = path
+        logging.info(f"Ditemukan {len(self.files)} file poligon desa di '{geojson_dir}'.")
+
+    def __contains__(self, kab_code):
+        return kab_code in self.files
+
+    def _get(self, kab_code):
+        with self._lock:
+            if kab_code in self._cache:
+                self._cache.move_to_end(kab_code)
+                return self._cache[kab_code]
+
+            path = self.files[kab_code]
+            logging.debug(f"Memuat poligon desa kab {kab_code} dari {path}...")
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            polygons = KabPolygons(data.get('features', []))
+            self._cache[kab_code] = polygons
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return polygons
+
+    def contains(self, kab_codes, lon, lat):
+        """
+        Cek batch titik terhadap poligon desa kabupaten masing-masing (kode wilayah lengkap).
+        Kabupaten tanpa file geojson dianggap lolos (hanya divalidasi bbox).
+        """
+        kab_codes = np.asarray(kab_codes, dtype=object)
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        result = np.ones(len(kab_codes), dtype=bool)
+        for kab_code in np.unique(kab_codes):
+            if kab_code not in self.files:
+                continue
+            sel = np.flatnonzero(kab_codes == kab_code)
+            result[sel] = self._get(kab_code).contains(lon[sel], lat[sel])
+        return result
+
+
+def load_desa_polygon_index(geojson_dir, cache_size=8):
+    """Membuat DesaPolygonIndex jika folder geojson tersedia, None jika tidak."""
+    if not geojson_dir:
+        return None
+    if not os.path.isdir(geojson_dir):
+        logging.warning(f"Folder poligon desa '{geojson_dir}' tidak ditemukan. Validasi poligon desa dilewati.")
+        return None
+    index = DesaPolygonIndex(geojson_dir, cache_size)
+    return index if index.files else None
@@ -0,0 +1,164 @@
+"""Login SSO BPS tanpa browser: mengikuti redirect SSO dan mengisi form login/OTP lewat requests."""
+import logging
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import pyotp
+import requests
+
+SSO_LINK_TEXT = 'Sign in with SSO BPS'
+OTP_FIELD_PATTERN = re.compile(r'token|otp', re.IGNORECASE)
+
+
+class LoginError(Exception):
+    """Login HTTP gagal (form tidak dikenali, kredensial ditolak, dsb)."""
+
+
+class _PageParser(HTMLParser):
+    """Mengumpulkan form (action, method, input) dan link dari halaman HTML."""
+
+    def __init__(self):
+        super().__init__()
+        self.forms = []
+        self.links = []
+        self._form = None
+        self._link = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'form':
+            self._form = {'action': attrs.get('action', ''), 'method': attrs.get('method', 'get').lower(),
+                          'id': attrs.get('id', ''), 'inputs': {}, 'fields': []}
+            self.forms.append(self._form)
+        elif tag == 'input' and self._form is not None:
+            name = attrs.get('name') or attrs.get('id')
+            if name:
+                self._form['inputs'][name] = attrs.get('value') or ''
+                self._form['fields'].append({'name': name, 'type': (attrs.get('type') or 'text').lower()})
+        elif tag == 'a':
+            self._link = {'href': attrs.get('href', ''), 'text': ''}
+            self.links.append(self._link)
+
+    def handle_endtag(self, tag):
+        if tag == 'form':
+            self._form = None
+        elif tag == 'a':
+            self._link = None
+
+    def handle_data(self, data):
+        if self._link is not None:
+            self._link['text'] += data
+
+
+def parse_page(html):
+    parser = _PageParser()
+    parser.feed(html)
+    return parser
+
+
+def _find_login_form(page):
+    for form in page.forms:
+        names = {field['name'] for field in form['fields']}
+        if 'username' in names and 'password' in names:
+            return form
+    return None
+
+
+def _find_otp_form(page):
+    for form in page.forms:
+        for field in form['fields']:
+            if field['type'] not in ('hidden', 'submit') and OTP_FIELD_PATTERN.search(field['name']):
+                return form, field['name']
+    return None, None
+
+
+def _submit_form(session, page_url, form, data, timeout):
+    action = urljoin(page_url, form['action'] or page_url)
+    payload = dict(form['inputs'])
+    payload.update(data)
+    if form['method'] == 'post':
+        return session.post(action, data=payload, timeout=timeout, allow_redirects=True)
+    return session.get(action, params=payload, timeout=timeout, allow_redirects=True)
+
+
+def _login_flow(session, account, dir_url, timeout, otp_input):
+    """Alur redirect SSO -> form login -> OTP -> dirgc. Mengembalikan html halaman dirgc."""
+    logging.info("Membuka halaman login (HTTP)...")
+    response = session.get(dir_url, timeout=timeout)
+    response.raise_for_status()
+    if 'gcSubmitToken' in response.text:
+        logging.info("Terdeteksi sudah dalam keadaan login.")
+        return response.text
+
+    page = parse_page(response.text)
+    login_form = _find_login_form(page)
+    if login_form is None:
+        sso_link = next((link for link in page.links if SSO_LINK_TEXT in link['text']), None)
+        if sso_link is None:
+            raise LoginError("Link 'Sign in with SSO BPS' tidak ditemukan.")
+        logging.info("Mengikuti redirect SSO BPS...")
+        response = session.get(urljoin(response.url, sso_link['href']), timeout=timeout)
+        response.raise_for_status()
+        page = parse_page(response.text)
+        login_form = _find_login_form(page)
+        if login_form is None:
+            raise LoginError(f"Form login SSO tidak ditemukan di {response.url}")
+
+    logging.info("Memasukkan kredensial...")
+    response = _submit_form(session, response.url, login_form,
+                            {'username': account['username'], 'password': account['password']}, timeout)
+    response.raise_for_status()
+
+    page = parse_page(response.text)
+    if _find_login_form(page) is not None:
+        raise LoginError("Login ditolak (username/password salah?).")
+
+    otp_form, otp_field = _find_otp_form(page)
+    if otp_form is not None:
+        logging.info("Halaman OTP terdeteksi!")
+        otp_code = None
+        if account.get('otp_secret'):
+            try:
+                otp_code = pyotp.TOTP(account['otp_secret']).now()
+                logging.info("OTP dihasilkan otomatis dari secret key.")
+            except Exception as e:
+                logging.error(f"Gagal generate OTP: {e}")
+        if not otp_code and otp_input is None:
+            raise LoginError(f"Kode OTP dibutuhkan untuk akun {account['username']}. "
+                             "Isi BPS_OTP_SECRET agar login bisa tanpa interaksi.")
+        if not otp_code:
+            print("\n" + "!" * 50)
+            print(f"MASUKKAN KODE OTP SECARA MANUAL! (akun: {account['username']})")
+            print("!" * 50 + "\n")
+            print('\a')
+            otp_code = otp_input("Masukkan Kode OTP: ").strip()
+
+        logging.info("Menginput kode OTP...")
+        response = _submit_form(session, response.url, otp_form, {otp_field: otp_code}, timeout)
+        response.raise_for_status()
+
+    if 'gcSubmitToken' not in response.text:
+        # Beberapa alur berhenti di halaman lain; buka dirgc sekali lagi dengan cookie yang sudah didapat
+        response = session.get(dir_url, timeout=timeout)
+        response.raise_for_status()
+    if 'gcSubmitToken' not in response.text:
+        raise LoginError(f"gcSubmitToken tidak ditemukan setelah login. URL terakhir: {response.url}")
+
+    logging.info("Login HTTP berhasil.")
+    return response.text
+
+
+def login_http(account, dir_url, user_agent, timeout=30, otp_input=input):
+    """
+    Login SSO lewat HTTP murni. Mengembalikan (requests.Session, html halaman dirgc).
+    Melempar LoginError jika alur login tidak berjalan sesuai harapan. otp_input=None berarti
+    tanpa interaksi: OTP tanpa secret key menjadi LoginError, bukan prompt di terminal.
+    """
+    session = requests.Session()
+    session.headers.update({'User-Agent': user_agent})
+    try:
+        return session, _login_flow(session, account, dir_url, timeout, otp_input)
+    except Exception:
+        session.close()
+        raise
@@ -0,0 +1,361 @@
+"""Lapisan transport HTTP untuk request submit: connection pool, timeout adaptif dan backend sync/async."""
+import asyncio
+import importlib.util
+import logging
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+try:
+    import httpx  # Opsional, backend async (HTTP/2 jika paket h2 terpasang)
+except ImportError:
+    httpx = None
+
+BACKENDS = ('requests', 'httpx')
+# SO_KEEPALIVE agar koneksi idle di antara request lambat tidak diputus diam-diam oleh NAT/proxy
+SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+
+class TransportError(Exception):
+    """Request gagal di level koneksi (DNS, TLS, koneksi terputus, ...)."""
+
+
+class TransportTimeout(TransportError):
+    """Request melewati batas waktu connect atau read."""
+
+    def __init__(self, kind, deadline):
+        super().__init__(f"{kind} timeout ({deadline:.1f} dtk)")
+        self.kind = kind
+        self.deadline = deadline
+
+
+class _LatencyWindow:
+    """Jendela bergulir latensi satu jenis (connect/read) beserta batas waktu turunannya."""
+
+    def __init__(self, minimum, maximum, window):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.samples = deque(maxlen=window)
+        self.penalty = 1.0
+        self.timeouts = 0
+
+    def percentile(self, q):
+        return float(np.percentile(self.samples, q)) if self.samples else None
+
+
+class AdaptiveTimeout:
+    """
+    Batas waktu connect & read yang mengikuti latensi teramati (dipakai bersama semua worker):
+    batas = persentil (default p99) x factor, dibatasi [minimum, maksimum]. Selama sampel belum
+    cukup dipakai nilai maksimum. Setiap timeout menggandakan batas (sampai maksimum) hingga
+    ada respons lagi, jadi server yang sedang lambat tidak langsung dianggap mati.
+    """
+
+    def __init__(self, connect_max=10.0, read_max=30.0, connect_min=2.0, read_min=5.0,
+                 percentile=99, factor=3.0, window=500, min_samples=20):
+        self.percentile = percentile
+        self.factor = factor
+        self.min_samples = min_samples
+        self._windows = {
+            'connect': _LatencyWindow(min(connect_min, connect_max), connect_max, window),
+            'read': _LatencyWindow(min(read_min, read_max), read_max, window),
+        }
+        self._deadlines = {'connect': connect_max, 'read': read_max}
+        self._lock = threading.Lock()
+
+    def _update(self, kind):
+        w = self._windows[kind]
+        if len(w.samples) < self.min_samples:
+            deadline = w.maximum
+        else:
+            deadline = w.percentile(self.percentile) * self.factor * w.penalty
+        self._deadlines[kind] = min(w.maximum, max(w.minimum, deadline))
+
+    def observe(self, kind, seconds):
+        """Mencatat satu latensi connect (TCP + TLS) atau read (request terkirim -> header respons)."""
+        with self._lock:
+            w = self._windows[kind]
+            w.samples.append(seconds)
+            w.penalty = 1.0
+            # Hitung ulang secara berkala saja; persentil dari jendela penuh tidak perlu tiap request
+            if len(w.samples) <= self.min_samples or len(w.samples) % 10 == 0:
+                self._update(kind)
+
+    def on_timeout(self, kind):
+        with self._lock:
+            w = self._windows[kind]
+            w.timeouts += 1
+            w.penalty = min(w.penalty * 2, 8.0)
+            self._update(kind)
+
+    def current(self):
+        """(batas connect, batas read) dalam detik."""
+        with self._lock:
+            return self._deadlines['connect'], self._deadlines['read']
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for kind, w in self._windows.items():
+                result[kind] = {
+                    'deadline': self._deadlines[kind],
+                    'timeouts': w.timeouts,
+                    'samples': len(w.samples),
+                    'p50': w.percentile(50),
+                    'p95': w.percentile(95),
+                    'p99': w.percentile(99),
+                }
+            return result
+
+
+class _TransportStats:
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.tls_resumed = 0
+        self.timeouts = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self):
+        with self._lock:
+            return {'requests': self.requests, 'connections': self.connections,
+                    'tls_resumed': self.tls_resumed, 'timeouts': self.timeouts}
+
+
+class _ResumingSSLContext(ssl.SSLContext):
+    """SSLContext yang menawarkan sesi TLS terakhir saat membuka koneksi baru (resumption, handshake singkat)."""
+
+    tls_session = None
+
+    def wrap_socket(self, sock, *args, **kwargs):
+        if self.tls_session is not None and kwargs.get('session') is None:
+            kwargs['session'] = self.tls_session
+        return super().wrap_socket(sock, *args, **kwargs)
+
+
+class _ObservedConnectionMixin:
+    """Mengukur lama connect dan waktu tunggu header respons per koneksi urllib3."""
+
+    transport = None
+
+    def connect(self):
+        started = time.monotonic()
+        super().connect()
+        resumed = bool(getattr(self.sock, 'session_reused', False))
+        self.transport._on_connect(time.monotonic() - started, resumed)
+
+    def getresponse(self, *args, **kwargs):
+        sock = self.sock  # http.client melepas self.sock jika server menutup koneksi setelah respons ini
+        started = time.monotonic()
+        response = super().getresponse(*args, **kwargs)
+        self.transport._on_response(time.monotonic() - started, sock)
+        return response
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter dengan kelas koneksi terukur, SO_KEEPALIVE dan SSLContext bersama per transport."""
+
+    def __init__(self, transport, **kwargs):
+        self._transport = transport
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault('socket_options', SOCKET_OPTIONS)
+        pool_kwargs.setdefault('ssl_context', self._transport.ssl_context)
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        attrs = {'transport': self._transport}
+        http_conn = type('ObservedHTTPConnection', (_ObservedConnectionMixin, HTTPConnection), attrs)
+        https_conn = type('ObservedHTTPSConnection', (_ObservedConnectionMixin, HTTPSConnection), attrs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('ObservedHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': http_conn}),
+            'https': type('ObservedHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': https_conn}),
+        }
+
+
+class RequestsTransport:
+    """
+    Backend default: satu requests.Session dengan pool koneksi keep-alive (pool_size koneksi per host),
+    resumption sesi TLS untuk koneksi baru, retry otomatis hanya untuk gagal connect (request belum
+    terkirim, aman untuk POST) dan batas waktu connect/read dari AdaptiveTimeout.
+    """
+
+    name = 'requests'
+
+    def __init__(self, timeouts=None, pool_size=2, connect_retries=2):
+        self.timeouts = timeouts or AdaptiveTimeout()
+        self.stats = _TransportStats()
+        self.ssl_context = _ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        self.ssl_context.load_default_certs()
+        self.session = requests.Session()
+        retries = Retry(total=connect_retries, connect=connect_retries, read=False, status=False,
+                        redirect=False, other=0, backoff_factor=0.2)
+        adapter = _PooledAdapter(self, pool_connections=2, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def _on_connect(self, seconds, resumed):
+        self.timeouts.observe('connect', seconds)
+        self.stats.add(connections=1, tls_resumed=int(resumed))
+
+    def _on_response(self, seconds, sock):
+        self.timeouts.observe('read', seconds)
+        # Sesi TLS 1.3 baru tersedia setelah tiket diterima, yaitu setelah data pertama dibaca
+        session = getattr(sock, 'session', None)
+        if session is not None:
+            self.ssl_context.tls_session = session
+
+    def request(self, method, url, headers=None, data=None, timeout=None):
+        """Kirim request. timeout (detik) menggantikan batas read adaptif untuk request ini."""
+        connect, read = self.timeouts.current()
+        if timeout is not None:
+            read = timeout
+        self.stats.add(requests=1)
+        try:
+            return self.session.request(method, url, headers=headers, data=data, timeout=(connect, read))
+        except requests.exceptions.ConnectTimeout as e:
+            self.timeouts.on_timeout('connect')
+            self.stats.add(timeouts=1)
+            raise TransportTimeout('connect', connect) from e
+        except requests.exceptions.Timeout as e:
+            self.timeouts.on_timeout('read')
+            self.stats.add(timeouts=1)
+            raise TransportTimeout('read', read) from e
+        except requests.exceptions.RequestException as e:
+            raise TransportError(str(e)) from e
+
+    def post(self, url, headers=None, data=None, timeout=None):
+        return self.request('POST', url, headers=headers, data=data, timeout=timeout)
+
+    def get(self, url, headers=None, timeout=None):
+        return self.request('GET', url, headers=headers, timeout=timeout)
+
+    def close(self):
+        self.session.close()
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop():
+    """Satu event loop di thread background, dipakai bersama oleh semua HttpxTransport."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="http-async", daemon=True).start()
+        return _loop
+
+
+class HttpxTransport:
+    """
+    Backend async: httpx.AsyncClient (HTTP/2 jika paket h2 terpasang, sehingga request
+    dimultipleks di satu koneksi) yang berjalan di event loop bersama. Antarmukanya sama dengan
+    RequestsTransport (pemanggil tetap sinkron), cookie disimpan di RequestsCookieJar yang sama formatnya.
+    """
+
+    name = 'httpx'
+
+    def __init__(self, timeouts=None, pool_size=2, connect_retries=2, http2=True):
+        if httpx is None:
+            raise ImportError("Paket httpx tidak terpasang.")
+        self.timeouts = timeouts or AdaptiveTimeout()
+        self.stats = _TransportStats()
+        self.cookies = RequestsCookieJar()
+        self.http2 = bool(http2) and importlib.util.find_spec('h2') is not None
+        self._loop = _event_loop()
+        self._client = self._run(self._create_client(pool_size, connect_retries))
+
+    async def _create_client(self, pool_size, connect_retries):
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        transport = httpx.AsyncHTTPTransport(http2=self.http2, limits=limits, retries=connect_retries,
+                                             socket_options=SOCKET_OPTIONS)
+        # httpx.Cookies membungkus jar ini langsung, jadi cookie yang dipasang dari luar ikut terkirim
+        return httpx.AsyncClient(transport=transport, cookies=self.cookies)
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _send(self, method, url, headers, data, connect, read):
+        marks = {}
+
+        async def trace(event, info):
+            now = time.monotonic()
+            if event == 'connection.connect_tcp.started':
+                marks['connect'] = now
+            elif event in ('connection.connect_tcp.complete', 'connection.start_tls.complete'):
+                marks['connected'] = now
+            elif event.endswith('receive_response_headers.started'):
+                marks['headers'] = now
+            elif event.endswith('receive_response_headers.complete') and 'headers' in marks:
+                self.timeouts.observe('read', now - marks['headers'])
+
+        timeout = httpx.Timeout(read, connect=connect)
+        try:
+            return await self._client.request(method, url, headers=headers, data=data, timeout=timeout,
+                                              extensions={'trace': trace})
+        finally:
+            if 'connect' in marks and 'connected' in marks:
+                self.timeouts.observe('connect', marks['connected'] - marks['connect'])
+                self.stats.add(connections=1)
+
+    def request(self, method, url, headers=None, data=None, timeout=None):
+        """Kirim request. timeout (detik) menggantikan batas read adaptif untuk request ini."""
+        connect, read = self.timeouts.current()
+        if timeout is not None:
+            read = timeout
+        self.stats.add(requests=1)
+        try:
+            return self._run(self._send(method, url, headers, data, connect, read))
+        except httpx.ConnectTimeout as e:
+            self.timeouts.on_timeout('connect')
+            self.stats.add(timeouts=1)
+            raise TransportTimeout('connect', connect) from e
+        except httpx.TimeoutException as e:
+            self.timeouts.on_timeout('read')
+            self.stats.add(timeouts=1)
+            raise TransportTimeout('read', read) from e
+        except httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+
+    def post(self, url, headers=None, data=None, timeout=None):
+        return self.request('POST', url, headers=headers, data=data, timeout=timeout)
+
+    def get(self, url, headers=None, timeout=None):
+        return self.request('GET', url, headers=headers, timeout=timeout)
+
+    def close(self):
+        try:
+            self._run(self._client.aclose())
+        except Exception as e:
+            logging.debug(f"Gagal menutup klien httpx: {e}")
+
+
+def create_transport(backend='requests', timeouts=None, pool_size=2, http2=True):
+    """Membuat transport sesuai backend; jatuh ke 'requests' jika httpx tidak terpasang."""
+    if backend == 'httpx':
+        if httpx is not None:
+            return HttpxTransport(timeouts, pool_size, http2=http2)
+        logging.warning("HTTP_BACKEND=httpx tetapi paket httpx tidak terpasang, memakai backend requests.")
+    elif backend != 'requests':
+        logging.warning(f"HTTP_BACKEND '{backend}' tidak dikenal (pilihan: {', '.join(BACKENDS)}), memakai requests.")
+    return RequestsTransport(timeouts, pool_size)
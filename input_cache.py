@@ -0,0 +1,192 @@
+"""Cache hasil parse & validasi file input (sidecar SQLite) berdasarkan hash file dan hash per baris."""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+ERROR_SEPARATOR = '\x1f'
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    """Hash isi file (dibaca per blok)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class InputCache:
+    """
+    Menyimpan per baris: row_key, status di file, pesan error validasi dan payload siap kirim
+    (hanya untuk baris valid yang belum selesai). Entri file dikunci dengan hash isi file dan
+    konteks validasi (bounding box, poligon desa, aturan), sehingga:
+    - file yang tidak berubah bisa diproses tanpa membaca Excel sama sekali,
+    - file yang diedit hanya memvalidasi ulang baris yang row_key-nya baru.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Dipakai dari beberapa tahap pipeline (ingest, validasi, koordinator)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " file_hash TEXT PRIMARY KEY, name TEXT NOT NULL, context TEXT NOT NULL,"
+            " columns TEXT NOT NULL, total INTEGER NOT NULL, complete INTEGER NOT NULL,"
+            " updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS rows ("
+            " file_hash TEXT NOT NULL, position INTEGER NOT NULL, row_key TEXT NOT NULL,"
+            " status TEXT NOT NULL, errors TEXT NOT NULL, payload TEXT,"
+            " PRIMARY KEY (file_hash, position));"
+            "CREATE INDEX IF NOT EXISTS idx_rows_key ON rows (file_hash, row_key);"
+            "CREATE INDEX IF NOT EXISTS idx_files_name ON files (name);"
+        )
+        # Sisa baris sementara dari run yang terhenti mendadak
+        self.conn.execute("DELETE FROM rows WHERE file_hash LIKE 'tmp-%'")
+        self.conn.commit()
+
+    def lookup(self, file_hash, context):
+        """Entri file dengan hash & konteks yang sama, atau None."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT columns, total, complete FROM files WHERE file_hash = ? AND context = ?",
+                (file_hash, context),
+            ).fetchone()
+        if row is None:
+            return None
+        return {'file_hash': file_hash, 'columns': json.loads(row[0]), 'total': row[1], 'complete': bool(row[2])}
+
+    def previous_version(self, name, context):
+        """Hash entri terakhir (dengan data baris) untuk nama file yang sama, untuk dipakai ulang per baris."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT file_hash FROM files WHERE name = ? AND context = ? AND complete = 0"
+                " ORDER BY updated_at DESC LIMIT 1",
+                (name, context),
+            ).fetchone()
+        return row[0] if row else None
+
+    def begin(self):
+        """Token sementara untuk baris yang ditulis selama file dibaca."""
+        return f"tmp-{uuid.uuid4().hex}"
+
+    def add_rows(self, token, positions, keys, statuses, errors, payloads):
+        """Menyimpan satu chunk baris. errors: list pesan per baris, payloads: dict atau None."""
+        records = [
+            (token, int(pos), key, status, ERROR_SEPARATOR.join(err),
+             json.dumps(payload, ensure_ascii=False) if payload is not None else None)
+            for pos, key, status, err, payload in zip(positions, keys, statuses, errors, payloads)
+        ]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rows (file_hash, position, row_key, status, errors, payload)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                records,
+            )
+
+    def reuse(self, file_hash, keys):
+        """Hasil validasi tersimpan untuk row_key yang ada di entri file_hash: {row_key: (errors, payload)}."""
+        found = {}
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT row_key, errors, payload FROM rows WHERE file_hash = ? AND row_key IN ({placeholders})",
+                    [file_hash] + batch,
+                ).fetchall()
+            for row_key, errors, payload in rows:
+                found[row_key] = (errors.split(ERROR_SEPARATOR) if errors else [],
+                                  json.loads(payload) if payload is not None else None)
+        return found
+
+    def iter_chunks(self, file_hash, chunk_size=5000, status_prefixes=None):
+        """
+        Baris tersimpan per chunk sebagai DataFrame (index = posisi baris). Jika status_prefixes
+        diberikan, hanya baris yang statusnya diawali salah satu prefix tersebut.
+        """
+        status_filter, status_params = '', []
+        if status_prefixes:
+            status_filter = " AND (" + " OR ".join("substr(status, 1, ?) = ?" for _ in status_prefixes) + ")"
+            for prefix in status_prefixes:
+                status_params += [len(prefix), prefix]
+        last_position = -1
+        while True:
+            # Paginasi per posisi (tanpa cursor yang terbuka lama, koneksi dipakai bersama thread lain)
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT position, row_key, status, errors, payload FROM rows"
+                    f" WHERE file_hash = ? AND position > ?{status_filter} ORDER BY position LIMIT ?",
+                    [file_hash, last_position] + status_params + [chunk_size],
+                ).fetchall()
+            if not rows:
+                return
+            last_position = rows[-1][0]
+            positions, keys, statuses, errors, payloads = zip(*rows)
+            yield pd.DataFrame({
+                'row_key': pd.Series(keys, dtype=object),
+                'status_upload': pd.Series(statuses, dtype=object),
+                'errors': pd.Series([e.split(ERROR_SEPARATOR) if e else [] for e in errors], dtype=object),
+                'payload': pd.Series([json.loads(p) if p is not None else None for p in payloads], dtype=object),
+            }).set_axis(pd.Index(positions, name='position'))
+
+    def statuses(self, file_hash):
+        """Status semua baris satu entri file sebagai Series (index = posisi baris)."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT position, status FROM rows WHERE file_hash = ? ORDER BY position", (file_hash,)
+            ).fetchall()
+        return pd.Series([status for _, status in rows], index=[pos for pos, _ in rows], dtype=object)
+
+    def finish(self, token, file_hash, name, context, columns, total, statuses, complete):
+        """
+        Menutup entri: menerapkan status akhir ({posisi: status}), memindahkan baris dari token
+        ke hash file terbaru dan menghapus versi lama file yang sama. Baris dari file yang sudah
+        selesai 100% tidak disimpan lagi (cukup metadata untuk mengenali file tersebut).
+        """
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE rows SET status = ? WHERE file_hash = ? AND position = ?",
+                [(status, token, int(pos)) for pos, status in statuses.items()],
+            )
+            old_hashes = [row[0] for row in self.conn.execute(
+                "SELECT file_hash FROM files WHERE name = ? AND file_hash != ?", (name, token))]
+            for old_hash in old_hashes + ([file_hash] if file_hash != token else []):
+                self.conn.execute("DELETE FROM rows WHERE file_hash = ?", (old_hash,))
+                self.conn.execute("DELETE FROM files WHERE file_hash = ?", (old_hash,))
+            if complete:
+                self.conn.execute("DELETE FROM rows WHERE file_hash = ?", (token,))
+            elif file_hash != token:
+                self.conn.execute("UPDATE rows SET file_hash = ? WHERE file_hash = ?", (file_hash, token))
+            self.conn.execute("DELETE FROM files WHERE file_hash = ?", (token,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (file_hash, name, context, columns, total, complete, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_hash, name, context, json.dumps(list(columns)), int(total), int(bool(complete)), time.time()),
+            )
+        logging.debug(f"Cache input '{name}' diperbarui ({total} baris, selesai={complete}).")
+
+    def discard(self, token):
+        """Membuang baris sementara (file tidak selesai dibaca / gagal disimpan)."""
+        if not token.startswith('tmp-'):
+            return
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM rows WHERE file_hash = ?", (token,))
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception as e:
+            logging.debug(f"Gagal menutup cache input: {e}")
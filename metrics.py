@@ -0,0 +1,304 @@
+"""Metrik kinerja (counter & histogram) dengan ekspor berkala ke file JSON/Prometheus atau endpoint lokal."""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+RESERVOIR_SIZE = 4096
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    items = list(key) + list(extra)
+    if not items:
+        return ''
+    escaped = (f'{k}="{_escape(v)}"' for k, v in items)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+class Counter:
+    """Counter per kombinasi label. Mencatat waktu inc pertama & terakhir untuk menghitung throughput."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+        self.first_at = None
+        self.last_at = None
+        self._lock = threading.Lock()
+
+    def inc(self, value=1, **labels):
+        if not value:
+            return
+        key = _label_key(labels)
+        now = time.time()
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + value
+            if self.first_at is None:
+                self.first_at = now
+            self.last_at = now
+
+    def total(self, **labels):
+        """Jumlah semua nilai yang labelnya cocok dengan labels (kosong = semua)."""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(v for key, v in self.values.items() if wanted <= set(key))
+
+    def per_minute(self, **labels):
+        """Throughput berkelanjutan: total / rentang waktu inc pertama s.d. terakhir (per menit)."""
+        total = self.total(**labels)
+        if self.first_at is None or self.last_at - self.first_at <= 0:
+            return None
+        return total / (self.last_at - self.first_at) * 60
+
+    def snapshot(self):
+        with self._lock:
+            return {'help': self.help, 'type': self.kind,
+                    'values': [{'labels': dict(key), 'value': value} for key, value in sorted(self.values.items())]}
+
+    def prometheus_lines(self):
+        with self._lock:
+            items = sorted(self.values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(key)} {value}" for key, value in items)
+        return lines
+
+
+class _HistogramSeries:
+    def __init__(self, n_buckets):
+        self.bucket_counts = [0] * n_buckets
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram:
+    """
+    Histogram bucket (format Prometheus) per kombinasi label. Persentil untuk JSON & laporan
+    dihitung dari sampel reservoir (ukuran tetap, mewakili seluruh run) agar tidak terlalu kasar.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}
+        self.reservoir = []
+        self.seen = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = _HistogramSeries(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.bucket_counts[i] += 1
+                    break
+            series.count += 1
+            series.sum += value
+            # Reservoir sampling (Algorithm R) untuk semua label sekaligus
+            self.seen += 1
+            if len(self.reservoir) < RESERVOIR_SIZE:
+                self.reservoir.append(value)
+            else:
+                j = random.randrange(self.seen)
+                if j < RESERVOIR_SIZE:
+                    self.reservoir[j] = value
+
+    def time(self, **labels):
+        """Context manager untuk mengukur durasi blok kode."""
+        return _Timer(self, labels)
+
+    @property
+    def count(self):
+        with self._lock:
+            return sum(s.count for s in self.series.values())
+
+    def percentiles(self, qs=(50, 95, 99)):
+        """{q: nilai} dari sampel reservoir; None jika belum ada observasi."""
+        with self._lock:
+            samples = sorted(self.reservoir)
+        if not samples:
+            return {q: None for q in qs}
+        return {q: samples[min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))] for q in qs}
+
+    def snapshot(self):
+        p = self.percentiles()
+        with self._lock:
+            series = [{'labels': dict(key), 'count': s.count, 'sum': s.sum,
+                       'buckets': dict(zip([str(b) for b in self.buckets], s.bucket_counts))}
+                      for key, s in sorted(self.series.items())]
+        return {'help': self.help, 'type': self.kind, 'p50': p[50], 'p95': p[95], 'p99': p[99], 'series': series}
+
+    def prometheus_lines(self):
+        with self._lock:
+            items = [(key, list(s.bucket_counts), s.count, s.sum) for key, s in sorted(self.series.items())]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, bucket_counts, count, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, bucket_counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.monotonic() - self.started, **self.labels)
+        return False
+
+
+class Metrics:
+    """Registry metrik proses. counter()/histogram() mengembalikan metrik yang sama untuk nama yang sama."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args)
+            return metric
+
+    def counter(self, name, help_text):
+        return self._get(Counter, name, help_text)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, buckets)
+
+    def snapshot(self):
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        return {'generated_at': time.time(), 'uptime_seconds': time.time() - self.started_at,
+                'metrics': {name: metric.snapshot() for name, metric in metrics}}
+
+    def prometheus_text(self):
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for _, metric in metrics:
+            lines.extend(metric.prometheus_lines())
+        return '\n'.join(lines) + '\n'
+
+
+METRICS = Metrics()
+
+
+def _write_atomic(path, content):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class MetricsExporter:
+    """
+    Menulis snapshot metrik setiap `interval` detik ke `path` (JSON) dan ke file .prom di
+    sebelahnya (format teks Prometheus, bisa dibaca node_exporter textfile collector).
+    Jika port > 0, metrik juga disajikan di http://127.0.0.1:<port>/metrics.
+    """
+
+    def __init__(self, registry=METRICS, path=None, interval=15.0, port=0):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.port = port
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+
+    def start(self):
+        if self.path and self.interval > 0:
+            self._thread = threading.Thread(target=self._loop, name="metrics-exporter", daemon=True)
+            self._thread.start()
+        if self.port:
+            try:
+                self._server = ThreadingHTTPServer(('127.0.0.1', self.port), _handler_for(self.registry))
+            except OSError as e:
+                logging.warning(f"Endpoint metrik di port {self.port} gagal dibuka: {e}")
+            else:
+                threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+                logging.info(f"Metrik tersedia di http://127.0.0.1:{self.port}/metrics")
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _write_atomic(self.path, json.dumps(self.registry.snapshot(), ensure_ascii=False, indent=2))
+            _write_atomic(os.path.splitext(self.path)[0] + '.prom', self.registry.prometheus_text())
+        except Exception as e:
+            logging.debug(f"Gagal menulis file metrik: {e}")
+
+    def stop(self):
+        """Hentikan ekspor berkala dan tulis snapshot terakhir."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.flush()
+
+
+def _handler_for(registry):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') in ('', '/metrics'):
+                body = registry.prometheus_text().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            elif self.path == '/metrics.json':
+                body = json.dumps(registry.snapshot(), ensure_ascii=False).encode('utf-8')
+                content_type = 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return MetricsHandler
@@ -0,0 +1,221 @@
+"""Mode profil (--profile): span waktu per tahap, opsional cProfile & tracemalloc, artefak per run."""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+
+class _NullSpan:
+    """Span kosong saat profil nonaktif (satu objek bersama, tanpa alokasi)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'started', 'child_time')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.child_time = 0.0
+        self.profiler._stack().append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_time += elapsed
+        path = [threading.current_thread().name] + [s.name for s in stack] + [self.name]
+        self.profiler._record(self.name, ';'.join(path), elapsed, elapsed - self.child_time)
+        if self.profiler.memory:
+            self.profiler._check_memory()
+        return False
+
+
+class Profiler:
+    """
+    Pengumpul span: total/self/maks per tahap dan stack 'folded' (thread;tahap;subtahap) untuk
+    flamegraph. Saat nonaktif, span() hanya mengembalikan objek kosong.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.cpu = False
+        self.memory = False
+        self.started_at = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stages = {}   # nama -> [jumlah, total, self, maks]
+        self._folded = {}   # path -> detik (self time)
+        self._profiles = []
+        self._peak_snapshot = None
+        self._peak_memory = 0
+
+    def enable(self, cpu=False, memory=False):
+        self.enabled = True
+        self.cpu = cpu
+        self.memory = memory
+        self.started_at = time.perf_counter()
+        if memory:
+            tracemalloc.start(10)
+        if cpu:
+            if sys.version_info >= (3, 12):
+                # cProfile memakai sys.monitoring sejak 3.12 dan sudah mencakup semua thread
+                self._start_cpu_profile()
+            else:
+                threading.setprofile(self._thread_bootstrap)
+                self._start_cpu_profile()
+
+    def _start_cpu_profile(self):
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def _thread_bootstrap(self, frame, event, arg):
+        # Dipanggil sekali di awal setiap thread baru, lalu digantikan profiler cProfile thread itu
+        sys.setprofile(None)
+        self._start_cpu_profile()
+
+    def _check_memory(self):
+        # Snapshot lokasi alokasi setiap memori naik >= 10% dari tertinggi sebelumnya (jarang terjadi)
+        current, _ = tracemalloc.get_traced_memory()
+        if current < self._peak_memory * 1.1 + 1024 * 1024:
+            return
+        with self._lock:
+            if current < self._peak_memory * 1.1 + 1024 * 1024:
+                return
+            self._peak_memory = current
+        snapshot = tracemalloc.take_snapshot()
+        with self._lock:
+            self._peak_snapshot = snapshot
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, name, path, elapsed, self_time):
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = [0, 0.0, 0.0, 0.0]
+            stage[0] += 1
+            stage[1] += elapsed
+            stage[2] += self_time
+            stage[3] = max(stage[3], elapsed)
+            self._folded[path] = self._folded.get(path, 0.0) + self_time
+
+    def span(self, name):
+        """Context manager yang mencatat durasi blok kode sebagai tahap `name`."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def iterate(self, name, iterable):
+        """Membungkus generator: waktu untuk menghasilkan tiap item dicatat sebagai tahap `name`."""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            with self.span(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def stage_table(self):
+        with self._lock:
+            stages = sorted(self._stages.items(), key=lambda item: item[1][1], reverse=True)
+        wall = time.perf_counter() - self.started_at if self.started_at else 0.0
+        lines = [f"Durasi run: {wall:.2f} dtk (span di thread berbeda bisa tumpang tindih)", "",
+                 f"{'Tahap':<24}{'Jumlah':>10}{'Total (dtk)':>14}{'Self (dtk)':>14}{'Rata2 (ms)':>13}{'Maks (ms)':>12}"]
+        for name, (count, total, self_time, longest) in stages:
+            lines.append(f"{name:<24}{count:>10}{total:>14.3f}{self_time:>14.3f}"
+                         f"{total / count * 1000:>13.2f}{longest * 1000:>12.2f}")
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, directory='profile'):
+        """Menulis artefak profil ke directory/<timestamp>/. Mengembalikan path folder."""
+        if not self.enabled:
+            return None
+        out_dir = os.path.join(directory, datetime.now().strftime("%Y%m%d_%H%M%S"))
+        os.makedirs(out_dir, exist_ok=True)
+
+        with open(os.path.join(out_dir, 'stages.txt'), 'w', encoding='utf-8') as f:
+            f.write(self.stage_table())
+
+        # Format folded stack (Brendan Gregg / speedscope / inferno): "a;b;c <mikrodetik>"
+        with self._lock:
+            folded = sorted(self._folded.items())
+        with open(os.path.join(out_dir, 'stacks.folded'), 'w', encoding='utf-8') as f:
+            for path, seconds in folded:
+                weight = int(seconds * 1_000_000)
+                if weight > 0:
+                    f.write(f"{path.replace(' ', '_')} {weight}\n")
+
+        # Snapshot memori diambil dulu agar alokasi pstats di bawah tidak ikut terhitung
+        if self.memory and tracemalloc.is_tracing():
+            exclude = [tracemalloc.Filter(False, tracemalloc.__file__),
+                       tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")]
+            final = tracemalloc.take_snapshot().filter_traces(exclude)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f"Memori saat ini: {current / 1024 / 1024:.1f} MB, puncak: {peak / 1024 / 1024:.1f} MB"]
+            sections = [("saat run selesai", final)]
+            if self._peak_snapshot is not None:
+                sections.insert(0, (f"saat memori tertinggi yang teramati ({self._peak_memory / 1024 / 1024:.1f} MB)",
+                                    self._peak_snapshot.filter_traces(exclude)))
+            for title, snapshot in sections:
+                lines.extend(["", f"Lokasi alokasi terbesar {title}:"])
+                for stat in snapshot.statistics('lineno')[:25]:
+                    lines.append(f"  {stat.size / 1024:>10.1f} KB  {stat.count:>8} blok  {stat.traceback}")
+            with open(os.path.join(out_dir, 'allocations.txt'), 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+
+        if self.cpu:
+            threading.setprofile(None)
+            with self._lock:
+                profiles = list(self._profiles)
+            for profile in profiles:
+                profile.disable()
+            stats = pstats.Stats(*profiles)
+            stats.dump_stats(os.path.join(out_dir, 'cpu.prof'))
+            text = io.StringIO()
+            report = pstats.Stats(*profiles, stream=text)
+            report.sort_stats('cumulative').print_stats(40)
+            report.sort_stats('tottime').print_stats(40)
+            with open(os.path.join(out_dir, 'cpu.txt'), 'w', encoding='utf-8') as f:
+                f.write(text.getvalue())
+
+        logging.info(f"Profil run disimpan di: {out_dir}")
+        return out_dir
+
+
+PROFILER = Profiler()
+
+
+def span(name):
+    """Singkatan PROFILER.span(name)."""
+    return PROFILER.span(name)
@@ -0,0 +1,174 @@
+"""Pengatur laju kirim adaptif (token bucket + AIMD) yang dipakai bersama oleh semua worker submit."""
+import logging
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value, default=30.0):
+    """Membaca header Retry-After (detik atau tanggal HTTP). Mengembalikan detik tunggu."""
+    if not value:
+        return default
+    value = value.strip()
+    if value.isdigit():
+        return float(value) + 1  # Tambah 1 detik buffer
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time()) + 1
+    except (TypeError, ValueError):
+        return default
+
+
+class RateController:
+    """
+    Token bucket dengan penyesuaian AIMD:
+    - slow start: laju naik berlipat setiap request sukses sampai ambang (ssthresh),
+    - setelah itu naik aditif: per detik kirim sukses +additive_increase x laju terakhir sebelum
+      penurunan, jadi kembali ke laju yang terbukti jalan dalam hitungan detik, bukan menit,
+    - 429 (sinyal utama) / latensi tinggi: laju dikali decrease_factor (latensi: 0.85),
+    - timeout / 5xx dianggap gagal per baris; laju baru turun jika porsi error di error_window
+      hasil terakhir mencapai error_threshold,
+    - paling banyak satu penurunan per jendela (smoothed RTT, minimal satu interval kirim), agar
+      beberapa respons gagal dari request yang sedang berjalan paralel tidak memotong laju berkali-kali,
+    - 429 juga memasang jeda global (Retry-After) yang dipatuhi semua worker.
+    """
+
+    def __init__(self, initial_rate=0.5, min_rate=0.05, max_rate=5.0, additive_increase=0.1,
+                 decrease_factor=0.5, slow_start_factor=1.25, latency_factor=3.0, log_interval=30.0,
+                 error_window=20, error_threshold=0.2):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.slow_start_factor = slow_start_factor
+        self.latency_factor = latency_factor
+        self.log_interval = log_interval
+        self.error_threshold = error_threshold
+
+        self.rate = min(max(initial_rate, min_rate), max_rate)
+        self.ssthresh = max_rate
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.pause_until = 0.0
+        self.latency_baseline = None
+        self.recovery_rate = max_rate   # laju sebelum penurunan terakhir (acuan langkah aditif)
+        self.last_decrease = None
+        self.outcomes = deque(maxlen=error_window)  # True = error, False = sukses
+        self.last_log = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Statistik untuk log & laporan
+        self.peak_rate = self.rate
+        self.rate_limited_count = 0
+        self.slowdown_count = 0
+        self.total_pause = 0.0
+
+    @property
+    def current_rate(self):
+        return self.rate
+
+    def _refill(self, now):
+        self.tokens = min(1.0, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self, stop_event=None):
+        """Menunggu giliran kirim. Mengembalikan False jika stop_event diset saat menunggu."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.pause_until:
+                    wait = self.pause_until - now
+                elif self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    self._maybe_log(now)
+                    return True
+                else:
+                    wait = (1.0 - self.tokens) / self.rate
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+    def on_success(self, latency):
+        """Dipanggil setelah request sukses (HTTP 200) dengan latensinya dalam detik."""
+        with self._lock:
+            if self.latency_baseline is None:
+                self.latency_baseline = latency
+            else:
+                # Baseline mengikuti latensi normal secara perlahan
+                self.latency_baseline = 0.9 * self.latency_baseline + 0.1 * min(latency, self.latency_baseline * 2)
+
+            self.outcomes.append(False)
+
+            if latency > self.latency_baseline * self.latency_factor:
+                # Server melambat: turunkan sedikit sebelum kena 429
+                self._decrease(0.85)
+                return
+
+            if self.rate < self.ssthresh:
+                self.rate = min(self.rate * self.slow_start_factor, self.ssthresh, self.max_rate)
+            else:
+                # rate sukses per detik x langkah ini = additive_increase x recovery_rate per detik
+                step = self.additive_increase * self.recovery_rate / self.rate
+                self.rate = min(self.rate + step, self.max_rate)
+            self.peak_rate = max(self.peak_rate, self.rate)
+
+    def on_rate_limited(self, retry_after=None):
+        """Dipanggil saat 429. Memasang jeda global dan menurunkan laju."""
+        wait = parse_retry_after(retry_after)
+        with self._lock:
+            self.rate_limited_count += 1
+            if self._decrease(self.decrease_factor):
+                self.ssthresh = self.rate
+            now = time.monotonic()
+            new_pause = now + wait
+            if new_pause > self.pause_until:
+                self.total_pause += new_pause - max(now, self.pause_until)
+                self.pause_until = new_pause
+            self.tokens = 0.0
+        logging.warning(f"Rate limit (429): semua worker jeda {wait:.0f} detik, laju kirim turun ke {self.rate:.2f} req/dtk.")
+        return wait
+
+    def on_error(self):
+        """Dipanggil saat timeout / HTTP 5xx / error koneksi. Error sesekali tidak menurunkan laju."""
+        with self._lock:
+            self.outcomes.append(True)
+            if len(self.outcomes) < self.outcomes.maxlen:
+                return
+            error_ratio = sum(self.outcomes) / len(self.outcomes)
+            if error_ratio >= self.error_threshold and self._decrease(self.decrease_factor):
+                self.ssthresh = self.rate
+                # Penurunan berikutnya butuh bukti baru, bukan error yang sama dihitung ulang
+                self.outcomes.clear()
+                logging.warning(f"Error server {error_ratio:.0%} dari {self.outcomes.maxlen} request terakhir, "
+                                f"laju kirim turun ke {self.rate:.2f} req/dtk.")
+
+    def _decrease(self, factor):
+        """Turunkan laju, paling banyak sekali per jendela. Mengembalikan False jika diabaikan."""
+        now = time.monotonic()
+        window = max(self.latency_baseline or 0.0, 1.0 / self.rate)
+        if self.last_decrease is not None and now - self.last_decrease < window:
+            return False
+        self.last_decrease = now
+        self.recovery_rate = self.rate
+        self.rate = max(self.min_rate, self.rate * factor)
+        self.slowdown_count += 1
+        return True
+
+    def _maybe_log(self, now):
+        if now - self.last_log >= self.log_interval:
+            self.last_log = now
+            logging.info(f"Laju kirim saat ini: {self.rate:.2f} req/dtk (maks tercapai {self.peak_rate:.2f}, 429: {self.rate_limited_count}x).")
+
+    def snapshot(self):
+        """Ringkasan kondisi pengatur laju untuk laporan."""
+        with self._lock:
+            return {
+                'current_rate': self.rate,
+                'peak_rate': self.peak_rate,
+                'rate_limited': self.rate_limited_count,
+                'slowdowns': self.slowdown_count,
+                'total_pause': self.total_pause,
+            }
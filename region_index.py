@@ -0,0 +1,169 @@
+"""Indeks wilayah (bounding box per kode wilayah lengkap) dengan cache biner yang bisa di-mmap."""
+import json
+import logging
+import os
+import re
+import struct
+
+import numpy as np
+
+INDEX_MAGIC = b'MGCRIDX1'
+# magic, ukuran file sumber, mtime_ns file sumber, jumlah wilayah, padding
+HEADER_STRUCT = struct.Struct('<8sqqI4x')
+CODE_DTYPE = np.dtype('S16')
+
+NOT_FOUND = -1
+AMBIGUOUS = -2
+
+
+def extract_region_code(key):
+    """Ekstrak kode wilayah lengkap dari nama file (misal: 13301 dari final_desa_202413301.geojson)."""
+    match = re.search(r'2024(\d+)\.geojson', key)
+    return match.group(1) if match else None
+
+
+class RegionIndex:
+    """
+    Tabel berbasis array: kode wilayah lengkap (terurut) beserta min/max lon/lat.
+    Pencarian menerima array kode; kode pendek (misal kdkab 2 digit) dicocokkan sebagai
+    akhiran kode lengkap dan ditandai ambigu jika cocok dengan lebih dari satu provinsi.
+    """
+
+    def __init__(self, codes, bounds):
+        self.codes = codes    # array CODE_DTYPE, terurut
+        self.bounds = bounds  # array float64 (n, 4): min_lon, min_lat, max_lon, max_lat
+        self._suffix_tables = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """Membuat indeks dari dict {kode_lengkap: [min_lon, min_lat, max_lon, max_lat]}."""
+        items = sorted(mapping.items())
+        codes = np.array([code for code, _ in items], dtype=CODE_DTYPE)
+        bounds = np.array([bbox for _, bbox in items], dtype=np.float64).reshape(-1, 4)
+        return cls(codes, bounds)
+
+    def save(self, path, source_size, source_mtime_ns):
+        """Menulis indeks ke file biner (atomic replace)."""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER_STRUCT.pack(INDEX_MAGIC, source_size, source_mtime_ns, len(self.codes)))
+            f.write(np.ascontiguousarray(self.codes, dtype=CODE_DTYPE).tobytes())
+            f.write(np.ascontiguousarray(self.bounds, dtype='<f8').tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def open(cls, path, source_size=None, source_mtime_ns=None):
+        """Membuka file indeks via mmap. Mengembalikan None jika tidak valid / sudah usang."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            header = f.read(HEADER_STRUCT.size)
+        if len(header) != HEADER_STRUCT.size:
+            return None
+        magic, size, mtime_ns, count = HEADER_STRUCT.unpack(header)
+        if magic != INDEX_MAGIC:
+            return None
+        if source_size is not None and (size, mtime_ns) != (source_size, source_mtime_ns):
+            return None
+        if count == 0:
+            return cls(np.empty(0, dtype=CODE_DTYPE), np.empty((0, 4)))
+        codes_offset = HEADER_STRUCT.size
+        bounds_offset = codes_offset + count * CODE_DTYPE.itemsize
+        codes = np.memmap(path, dtype=CODE_DTYPE, mode='r', offset=codes_offset, shape=(count,))
+        bounds = np.memmap(path, dtype='<f8', mode='r', offset=bounds_offset, shape=(count, 4))
+        return cls(codes, bounds)
+
+    def _suffix_table(self, length):
+        """Tabel akhiran kode (panjang tertentu) untuk pencarian kode pendek."""
+        if length not in self._suffix_tables:
+            positions = [i for i, code in enumerate(self.codes) if len(code) >= length]
+            suffixes = np.array([self.codes[i][-length:] for i in positions], dtype=CODE_DTYPE)
+            order = np.argsort(suffixes, kind='stable')
+            suffixes = suffixes[order]
+            positions = np.array(positions, dtype=np.int64)[order]
+            duplicated = np.zeros(len(suffixes), dtype=bool)
+            if len(suffixes) > 1:
+                same = suffixes[1:] == suffixes[:-1]
+                duplicated[1:] |= same
+                duplicated[:-1] |= same
+            self._suffix_tables[length] = (suffixes, positions, duplicated)
+        return self._suffix_tables[length]
+
+    def lookup(self, codes):
+        """
+        Mencari posisi baris untuk array kode. Hasil: posisi (>=0), NOT_FOUND atau AMBIGUOUS.
+        """
+        query = np.char.encode(np.asarray(codes, dtype=str), 'ascii', 'replace').astype(CODE_DTYPE)
+        result = np.full(len(query), NOT_FOUND, dtype=np.int64)
+        if not len(self.codes) or not len(query):
+            return result
+        lengths = np.char.str_len(query)
+        for length in np.unique(lengths):
+            if length == 0:
+                continue
+            sel = np.flatnonzero(lengths == length)
+            suffixes, positions, duplicated = self._suffix_table(int(length))
+            if not len(suffixes):
+                continue
+            found = np.searchsorted(suffixes, query[sel])
+            found_clipped = np.minimum(found, len(suffixes) - 1)
+            hit = suffixes[found_clipped] == query[sel]
+            result[sel[hit]] = np.where(duplicated[found_clipped[hit]], AMBIGUOUS, positions[found_clipped[hit]])
+        return result
+
+    def code_at(self, positions):
+        """Kode lengkap (str) untuk array posisi hasil lookup."""
+        return np.char.decode(self.codes[np.asarray(positions)], 'ascii')
+
+    def contains(self, positions, lon, lat):
+        """Mengembalikan (lat_ok, lon_ok) untuk titik pada wilayah di posisi yang diberikan."""
+        bounds = self.bounds[np.asarray(positions)]
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        lat_ok = (bounds[:, 1] <= lat) & (lat <= bounds[:, 3])
+        lon_ok = (bounds[:, 0] <= lon) & (lon <= bounds[:, 2])
+        return lat_ok, lon_ok
+
+
+def build_region_index(source_path):
+    """Parse bounding_boxes.json menjadi RegionIndex (kunci: kode wilayah lengkap)."""
+    with open(source_path, 'r') as f:
+        data = json.load(f)
+
+    mapping = {}
+    for key, bbox in data.items():
+        full_code = extract_region_code(key)
+        if not full_code:
+            logging.warning(f"Tidak dapat mengekstrak kode wilayah dari '{key}', dilewati.")
+            continue
+        if full_code in mapping:
+            logging.warning(f"Kode wilayah '{full_code}' duplikat di '{key}', entri terakhir dipakai.")
+        mapping[full_code] = bbox
+    return RegionIndex.from_mapping(mapping)
+
+
+def load_region_index(source_path, index_path):
+    """
+    Memuat indeks wilayah dari cache biner; membangun ulang hanya jika file sumber berubah.
+    """
+    stat = os.stat(source_path)
+    index = None
+    try:
+        index = RegionIndex.open(index_path, stat.st_size, stat.st_mtime_ns)
+    except Exception as e:
+        logging.warning(f"Cache indeks wilayah '{index_path}' tidak bisa dibaca: {e}")
+
+    if index is not None:
+        logging.debug(f"Indeks wilayah dimuat dari cache '{index_path}'.")
+        return index
+
+    logging.info(f"Membangun indeks wilayah dari '{source_path}'...")
+    index = build_region_index(source_path)
+    try:
+        index.save(index_path, stat.st_size, stat.st_mtime_ns)
+    except Exception as e:
+        logging.warning(f"Gagal menyimpan cache indeks wilayah: {e}")
+    return index
@@ -0,0 +1,1678 @@
+"""
+Run utama: login, validasi, pipeline submit dan laporan. Diimport oleh CLI (main.py) setelah
+konfigurasi dimuat; Selenium baru diimport saat browser benar-benar dibutuhkan.
+"""
+import json
+import re
+import time
+import numpy as np
+import pandas as pd
+import random
+import logging
+import os
+import requests
+import sys
+import shutil
+import glob
+import hashlib
+import heapq
+import itertools
+import atexit
+import queue
+import threading
+from datetime import datetime
+
+from geo_validation import load_desa_polygon_index
+from region_index import load_region_index
+from rate_control import RateController
+from http_login import login_http, LoginError
+from session_manager import SessionManager, cookies_from_jar, set_cookies
+from http_transport import AdaptiveTimeout, TransportError, TransportTimeout, create_transport
+from metrics import METRICS, MetricsExporter
+from profiling import PROFILER, span
+from structured_log import ProgressReporter, RowLabel, log_body
+from dry_run import run_validate_only
+from status_journal import (LEDGER_STATUS, TRANSIENT_PREFIXES, StatusJournal, confirmed_mask, done_mask,
+                            file_fingerprint, is_transient, merge_statuses, row_keys)
+from backup_store import BackupStore
+from table_io import iter_chunks, read_header, sidecar_path, write_statuses
+from input_cache import InputCache, file_sha256
+from submission_ledger import SubmissionLedger
+from validation import REQUIRED_COLUMNS, VALID_FLAG, VALID_HASILGC, format_errors, validate_dataframe
+from settings import (
+    BACKUP_COMPRESS, BACKUP_DIR, BACKUP_KEEP, BACKUP_MAX_DAYS, BOUNDING_BOX_FILE, CHECKPOINT_INTERVAL, CHROME_PROFILE_DIR, DESA_CACHE_SIZE, DESA_GEOJSON_DIR,
+    DRIVER_PATH_CACHE, HEADLESS_MODE, HTTP_BACKEND, HTTP_CONNECT_TIMEOUT, HTTP_POOL_SIZE, HTTP_READ_TIMEOUT,
+    INPUT_CACHE_FILE, INPUT_DIR, INPUT_EXTENSIONS, LEDGER_FILE, LEDGER_IMPORT_DIR, LOGIN_BACKEND, LOG_PROGRESS_INTERVAL, METRICS_FILE, METRICS_INTERVAL,
+    METRICS_PORT, OTP_SECRET, PASSWORD, PIPELINE_QUEUE_SIZE, PROCESSED_DIR, PROFILE_DIR, RATE_INITIAL, RATE_MAX,
+    RATE_MIN, READ_CHUNK_SIZE, REGION_INDEX_FILE, RETRY_BASE_DELAY, RETRY_MAX_ATTEMPTS, RETRY_MAX_DELAY, SESSION_FILE, SESSION_KEEPALIVE, STATUS_JOURNAL_FILE, STATUS_SIDECAR,
+    SUBMIT_WORKERS, USE_SESSION_CACHE, USERNAME, VALIDATE_WORKERS,
+)
+
+CUSTOM_USER_AGENT = 'Mozilla/5.0 (Linux; Android 13; itel A666LN Build/TP1A.220624.014; wv) AppleWebKit/537.36 (KHTML, like Gecko) Version/4.0 Chrome/143.0.7499.192 Mobile Safari/537.36'
+
+DIR_URL = "https://matchapro.web.bps.go.id/dirgc"
+POST_URL = 'https://matchapro.web.bps.go.id/dirgc/konfirmasi-user'
+
+POST_HEADERS = {
+    'Accept': '*/*', 'Origin': 'https://matchapro.web.bps.go.id', 'Referer': DIR_URL,
+    'User-Agent': CUSTOM_USER_AGENT, 'X-Requested-With': 'XMLHttpRequest'
+}
+POST_LATENCY = METRICS.histogram('matchain_post_latency_seconds', 'Latensi POST konfirmasi-user (detik)')
+POST_RESPONSES = METRICS.counter('matchain_post_responses_total', 'Respons POST per kode HTTP (atau timeout/error)')
+SERVER_MESSAGES = METRICS.counter('matchain_server_messages_total', 'Pesan respons server per isi pesan')
+ROWS_SUBMITTED = METRICS.counter('matchain_rows_submitted_total', 'Baris yang selesai dikirim per hasil')
+ROWS_SKIPPED = METRICS.counter('matchain_rows_skipped_total', 'Baris yang tidak dikirim per alasan')
+ROWS_RETRIED = METRICS.counter('matchain_rows_retried_total', 'Baris gagal sementara yang dijadwalkan kirim ulang')
+VALIDATE_SECONDS = METRICS.histogram('matchain_validate_chunk_seconds', 'Durasi validasi & payload per chunk (detik)')
+SAVE_SECONDS = METRICS.histogram('matchain_save_seconds', 'Durasi penulisan status ke file Excel (detik)')
+BLOCKED_RESOURCE_PATTERNS = ['*.css', '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.woff', '*.woff2', '*.ttf']
+
+_driver_path = None
+
+# False di mode daemon: tidak ada prompt input(); koneksi gagal / OTP manual dilaporkan ke pemanggil
+INTERACTIVE = True
+
+
+def get_driver_path():
+    """Path chromedriver; hasil ChromeDriverManager().install() di-cache (memori & file) agar tidak cek jaringan tiap kali."""
+    global _driver_path
+    if _driver_path and os.path.exists(_driver_path):
+        return _driver_path
+    if os.path.exists(DRIVER_PATH_CACHE):
+        with open(DRIVER_PATH_CACHE, 'r') as f:
+            cached = f.read().strip()
+        if cached and os.path.exists(cached):
+            _driver_path = cached
+            return _driver_path
+    from webdriver_manager.chrome import ChromeDriverManager
+    _driver_path = ChromeDriverManager().install()
+    try:
+        with open(DRIVER_PATH_CACHE, 'w') as f:
+            f.write(_driver_path)
+    except OSError as e:
+        logging.debug(f"Gagal menyimpan cache path chromedriver: {e}")
+    return _driver_path
+
+
+def get_driver(profile_dir=None):
+    """Menginisialisasi dan mengembalikan driver Selenium."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    logging.info("Menginisialisasi Chrome Driver...")
+    chrome_options = Options()
+    chrome_options.add_argument(f'user-agent={CUSTOM_USER_AGENT}')
+    if HEADLESS_MODE:
+        chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--log-level=3")
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+    # Anti-detection
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    # Hanya butuh DOM (token), jadi jangan tunggu/muat gambar & CSS
+    chrome_options.page_load_strategy = 'eager'
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+    })
+
+    with span('chrome_start'):
+        service = Service(get_driver_path())
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_RESOURCE_PATTERNS})
+    except Exception as e:
+        logging.debug(f"Gagal memblokir resource via CDP: {e}")
+    return driver
+
+
+class BrowserManager:
+    """
+    Menjaga satu Chrome tetap hidup per akun selama aplikasi berjalan (profil user-data-dir persisten),
+    sehingga refresh token cukup memuat ulang halaman tanpa start Chrome baru.
+    """
+
+    def __init__(self, profile_root):
+        self.profile_root = profile_root
+        self.drivers = {}
+
+    def get(self, account):
+        """Mengembalikan driver yang masih hidup untuk akun ini (start ulang jika sudah mati)."""
+        key = account['username']
+        driver = self.drivers.get(key)
+        if driver is not None:
+            try:
+                driver.current_url  # Cek apakah browser masih merespons
+                return driver
+            except Exception:
+                logging.warning("Browser tidak merespons, memulai ulang Chrome...")
+                self.discard(account)
+        driver = get_driver(os.path.join(self.profile_root, re.sub(r'[^\w.-]', '_', key)))
+        self.drivers[key] = driver
+        return driver
+
+    def discard(self, account):
+        """Tutup & lupakan driver akun ini (misal setelah error tak terduga)."""
+        driver = self.drivers.pop(account['username'], None)
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def close(self):
+        for driver in self.drivers.values():
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.drivers = {}
+
+
+def wait_for_page_tokens(driver, timeout=15):
+    """Tunggu (berbasis kondisi, bukan sleep tetap) sampai token muncul di DOM atau halaman login tampil."""
+    from selenium.webdriver.support.ui import WebDriverWait
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+            lambda d: 'gcSubmitToken' in d.page_source or 'Sign in' in d.page_source)
+    except Exception:
+        logging.debug("Timeout menunggu token / halaman login muncul.")
+
+
+def load_accounts():
+    """Membaca daftar akun SSO dari .env (BPS_USERNAME, lalu BPS_USERNAME_2, BPS_USERNAME_3, ...)."""
+    accounts = [{'username': USERNAME, 'password': PASSWORD, 'otp_secret': OTP_SECRET}]
+    i = 2
+    while os.getenv(f"BPS_USERNAME_{i}") and os.getenv(f"BPS_PASSWORD_{i}"):
+        accounts.append({
+            'username': os.getenv(f"BPS_USERNAME_{i}"),
+            'password': os.getenv(f"BPS_PASSWORD_{i}"),
+            'otp_secret': os.getenv(f"BPS_OTP_SECRET_{i}"),
+        })
+        i += 1
+    return accounts
+
+
+def get_session_file(worker_id):
+    """File sesi per rantai submit. Rantai pertama tetap memakai SESSION_FILE."""
+    if worker_id == 1:
+        return SESSION_FILE
+    name, ext = os.path.splitext(SESSION_FILE)
+    return f"{name}_{worker_id}{ext}"
+
+
+def parse_page_tokens(page_source):
+    """Mengambil CSRF token dan gcSubmitToken dari source halaman dirgc."""
+    # Mencari CSRF Token
+    match = re.search(r'<meta name="csrf-token" content="([^"]+)">', page_source)
+    csrf_token = match.group(1) if match else None
+
+    if not csrf_token:
+        logging.warning("Tidak dapat menemukan token CSRF di halaman.")
+
+    # Mencari gcSubmitToken
+    logging.debug("Mencari gcSubmitToken di source code halaman...") # Changed to debug
+    gc_token_match = re.search(r"gcSubmitToken\s*=\s*['\"]([^'\"]+)['\"]", page_source)
+    gc_token = None
+    if gc_token_match:
+        gc_token = gc_token_match.group(1)
+        logging.debug(f"Ditemukan gcSubmitToken: {gc_token}") # Changed to debug
+    else:
+        logging.warning("gcSubmitToken tidak ditemukan di halaman.")
+
+    return csrf_token, gc_token
+
+
+def store_session_data(cookies, csrf_token, session_file=SESSION_FILE, gc_token=None, quiet=False):
+    """
+    Menyusun session_data dan menyimpannya ke file jika USE_SESSION_CACHE aktif.
+    gc_token terakhir yang belum terpakai ikut disimpan agar bisa langsung dipakai saat start ulang.
+    """
+    session_data = None
+    if csrf_token:
+        session_data = {'cookies': cookies, 'csrf_token': csrf_token, 'gc_token': gc_token}
+
+        if USE_SESSION_CACHE:
+            tmp_file = session_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                json.dump(session_data, f)
+            os.replace(tmp_file, session_file)
+            if not quiet:
+                logging.info(f"Sesi berhasil diperbarui dan disimpan di '{session_file}'.")
+        else:
+            logging.info("Sesi diperbarui (Tidak disimpan ke file karena USE_SESSION_CACHE=false).")
+
+    return session_data
+
+
+def save_session_data(driver, session_file=SESSION_FILE):
+    """Menyimpan data sesi (cookies & csrf) dan mengembalikan gc_token dari driver yang aktif."""
+    logging.debug("Mengambil cookie dan token CSRF dari browser...") # Changed to debug
+    wait_for_page_tokens(driver)
+    cookies = driver.get_cookies()
+    csrf_token, gc_token = parse_page_tokens(driver.page_source)
+    return store_session_data(cookies, csrf_token, session_file, gc_token), gc_token
+
+
+def get_authenticated_session_http(account=None, session_file=SESSION_FILE):
+    """Login penuh tanpa browser (HTTP + TOTP). Mengembalikan (session_data, gc_token)."""
+    logging.info("--- MEMULAI OTENTIKASI BARU VIA HTTP (TANPA BROWSER) ---")
+    account = account or load_accounts()[0]
+    try:
+        with span('login_http'):
+            http_session, page_source = login_http(account, DIR_URL, CUSTOM_USER_AGENT,
+                                                   otp_input=input if INTERACTIVE else None)
+    except (LoginError, requests.exceptions.RequestException) as e:
+        logging.warning(f"Login HTTP gagal: {e}")
+        return None, None
+    try:
+        csrf_token, gc_token = parse_page_tokens(page_source)
+        return store_session_data(cookies_from_jar(http_session.cookies), csrf_token, session_file, gc_token), gc_token
+    finally:
+        http_session.close()
+
+
+def build_http_session(session_data):
+    """Membuat requests.Session dari session_data dengan atribut cookie lengkap (path, expiry, secure)."""
+    http_session = requests.Session()
+    set_cookies(http_session.cookies, session_data.get('cookies', []))
+    return http_session
+
+
+def probe_session(session_data, session_file=SESSION_FILE, transport=None):
+    """
+    Cek sesi tersimpan dengan satu GET ke DIR_URL (tanpa browser) dan ambil token dari HTML.
+    Jika transport diberikan (cookie-nya sudah berisi sesi ini), GET memakai koneksi transport
+    tersebut alih-alih membuka Session baru.
+    Mengembalikan (session_data, gc_token) atau (None, None) jika sesi sudah tidak valid.
+    """
+    if not session_data or not session_data.get('cookies'):
+        return None, None
+    http_session = transport if transport is not None else build_http_session(session_data)
+    try:
+        response = http_session.get(DIR_URL, headers={'User-Agent': CUSTOM_USER_AGENT}, timeout=15)
+        if response.status_code != 200 or 'gcSubmitToken' not in response.text:
+            logging.info("Sesi tersimpan sudah tidak valid (probe HTTP).")
+            return None, None
+        csrf_token, gc_token = parse_page_tokens(response.text)
+        if not csrf_token or not gc_token:
+            return None, None
+        logging.debug("Sesi tersimpan masih valid, token baru didapat via probe HTTP.")
+        return store_session_data(cookies_from_jar(http_session.cookies), csrf_token, session_file, gc_token, quiet=True), gc_token
+    except (requests.exceptions.RequestException, TransportError) as e:
+        logging.warning(f"Probe sesi via HTTP gagal: {e}")
+        return None, None
+    finally:
+        if transport is None:
+            http_session.close()
+
+
+def get_authenticated_session(account=None, session_file=SESSION_FILE):
+    """Login penuh sesuai LOGIN_BACKEND. Backend HTTP otomatis jatuh ke Selenium jika gagal."""
+    if LOGIN_BACKEND == 'http':
+        session_data, gc_token = get_authenticated_session_http(account, session_file)
+        if session_data and gc_token:
+            return session_data, gc_token
+        logging.warning("Beralih ke login Selenium sebagai cadangan...")
+    return get_authenticated_session_selenium(account, session_file)
+
+
+def refresh_gc_token(account=None, session_file=SESSION_FILE, session_data=None):
+    """
+    Ambil sesi & gc_token baru. Urutan: probe HTTP dengan cookie yang ada, lalu login sesuai
+    LOGIN_BACKEND (browser hanya jika perlu). Mengembalikan (session_data, gc_token).
+    """
+    if session_data:
+        new_session_data, gc_token = probe_session(session_data, session_file)
+        if new_session_data and gc_token:
+            return new_session_data, gc_token
+    if LOGIN_BACKEND == 'http':
+        session_data, gc_token = get_authenticated_session_http(account, session_file)
+        if session_data and gc_token:
+            return session_data, gc_token
+        logging.warning("Beralih ke refresh token Selenium sebagai cadangan...")
+    return refresh_gc_token_selenium(account, session_file)
+
+
+def login_selenium(driver, account=None):
+    """Melakukan proses login."""
+    import pyotp
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    account = account or load_accounts()[0]
+    logging.info("Membuka halaman login...")
+    
+    while True:
+        # Retry logic for connection reset
+        max_retries = 3
+        success = False
+        for attempt in range(max_retries):
+            try:
+                driver.get(DIR_URL)
+                success = True
+                break
+            except WebDriverException as e:
+                if "ERR_CONNECTION_RESET" in str(e) or "ERR_CONNECTION_CLOSED" in str(e):
+                    logging.warning(f"Koneksi terputus (ERR_CONNECTION_RESET). Mencoba ulang... ({attempt + 1}/{max_retries})")
+                    time.sleep(5)
+                else:
+                    raise e
+        
+        if success:
+            break
+        if not INTERACTIVE:
+            raise ConnectionError("Gagal menghubungi server (ERR_CONNECTION_RESET).")
+            
+        print("\n" + "!" * 50)
+        print("GAGAL MENGHUBUNGI SERVER (ERR_CONNECTION_RESET)")
+        print("Silakan cek koneksi internet Anda atau pastikan VPN FortiClient sudah terhubung.")
+        print("!" * 50 + "\n")
+        # Bunyikan beep
+        print('\a')
+        
+        choice = input("Ketik 'y' untuk mencoba lagi, atau 'n' untuk keluar: ").strip().lower()
+        if choice == 'n':
+            logging.error("User memilih untuk keluar aplikasi karena masalah koneksi.")
+            sys.exit(1)
+        else:
+            logging.info("User memilih untuk mencoba koneksi lagi...")
+
+    # Cek jika sudah login
+    if driver.current_url == DIR_URL or "Sign in" not in driver.page_source:
+        try:
+            WebDriverWait(driver, 5).until(
+                EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Sign in with SSO BPS')]")))
+        except:
+            logging.info("Terdeteksi sudah dalam keadaan login.")
+            return
+
+    logging.info("Melakukan klik tombol Sign in with SSO BPS...")
+    WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Sign in with SSO BPS')]"))).click()
+
+    logging.info("Memasukkan kredensial...")
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "username"))).send_keys(account['username'])
+    driver.find_element(By.ID, "password").send_keys(account['password'])
+    driver.find_element(By.XPATH, "//input[@type='submit']").click()
+
+    # --- OTP HANDLING ---
+    logging.info("Menunggu respons login (OTP atau Redirect)...")
+    
+    otp_xpath = "//input[contains(@name, 'token') or contains(@id, 'token') or contains(@name, 'otp') or contains(@id, 'otp')]"
+    
+    try:
+        # Tunggu sampai URL adalah DIR_URL ATAU elemen OTP ditemukan
+        WebDriverWait(driver, 10).until(
+            lambda d: d.current_url == DIR_URL or len(d.find_elements(By.XPATH, otp_xpath)) > 0
+        )
+    except Exception:
+        logging.warning("Timeout menunggu transisi halaman setelah login. Memeriksa kondisi terakhir...")
+
+    if driver.current_url == DIR_URL:
+        logging.info("Login berhasil tanpa OTP.")
+    else:
+        otp_elements = driver.find_elements(By.XPATH, otp_xpath)
+        if otp_elements:
+            logging.info("Halaman OTP terdeteksi!")
+            otp_field = otp_elements[0]
+
+            otp_code = None
+            if account['otp_secret']:
+                try:
+                    totp = pyotp.TOTP(account['otp_secret'])
+                    otp_code = totp.now()
+                    logging.info("OTP dihasilkan otomatis dari secret key.")
+                except Exception as e:
+                    logging.error(f"Gagal generate OTP: {e}")
+
+            if not otp_code and not INTERACTIVE:
+                raise LoginError(f"Kode OTP dibutuhkan untuk akun {account['username']}. "
+                                 "Isi BPS_OTP_SECRET agar login bisa tanpa interaksi.")
+            if not otp_code:
+                print("\n" + "!" * 50)
+                print(f"MASUKKAN KODE OTP SECARA MANUAL! (akun: {account['username']})")
+                print("!" * 50 + "\n")
+                # Bunyikan beep sistem agar user sadar (opsional, hanya work di beberapa terminal)
+                print('\a')
+                otp_code = input("Masukkan Kode OTP: ").strip()
+
+            logging.info("Menginput kode OTP...")
+            otp_field.send_keys(otp_code)
+
+            # Cari tombol submit OTP (biasanya type submit atau button dengan text Sign in/Verifikasi)
+            # Kita coba enter saja di field atau cari tombol
+            try:
+                otp_field.submit()
+            except:
+                driver.find_element(By.XPATH, "//input[@type='submit'] or //button[@type='submit']").click()
+
+            WebDriverWait(driver, 20).until(EC.url_to_be(DIR_URL))
+            logging.info("Login berhasil setelah OTP.")
+        else:
+            logging.warning(f"Tidak terdeteksi OTP dan belum masuk ke halaman utama. URL saat ini: {driver.current_url}")
+
+
+BROWSER = BrowserManager(CHROME_PROFILE_DIR)
+atexit.register(BROWSER.close)
+BACKUPS = BackupStore(BACKUP_DIR, BACKUP_KEEP, BACKUP_MAX_DAYS, BACKUP_COMPRESS)
+atexit.register(BACKUPS.close)
+
+
+def get_authenticated_session_selenium(account=None, session_file=SESSION_FILE):
+    """Fungsi wrapper untuk login penuh. Mengembalikan (session_data, gc_token)."""
+    logging.info("--- MEMULAI OTENTIKASI BARU DENGAN SELENIUM ---")
+    account = account or load_accounts()[0]
+    driver = BROWSER.get(account)
+    try:
+        # Browser dipakai ulang: buang cookie domain aktif agar login menghasilkan sesi baru
+        if driver.current_url.startswith('http'):
+            driver.delete_all_cookies()
+        login_selenium(driver, account)
+        return save_session_data(driver, session_file)
+    except Exception:
+        BROWSER.discard(account)
+        raise
+
+
+def refresh_gc_token_selenium(account=None, session_file=SESSION_FILE):
+    """Mencoba refresh halaman untuk dapat token baru. Login ulang jika perlu. Mengembalikan (session_data, gc_token)."""
+    from selenium.common.exceptions import WebDriverException
+
+    logging.info("--- REFRESH TOKEN DENGAN SELENIUM ---")
+    account = account or load_accounts()[0]
+    driver = BROWSER.get(account)
+    try:
+        if os.path.exists(session_file):
+            try:
+                with open(session_file, 'r') as f:
+                    old_session = json.load(f)
+
+                driver.get(DIR_URL)
+                for cookie in old_session.get('cookies', []):
+                    try:
+                        driver.add_cookie(cookie)
+                    except:
+                        pass
+            except Exception as e:
+                logging.error(f"Gagal load cookie lama: {e}")
+
+        logging.debug(f"Membuka {DIR_URL} untuk cek token...") # Changed to debug
+        
+        while True:
+            # Retry logic for connection reset
+            max_retries = 3
+            success = False
+            for attempt in range(max_retries):
+                try:
+                    driver.get(DIR_URL)
+                    success = True
+                    break
+                except WebDriverException as e:
+                    if "ERR_CONNECTION_RESET" in str(e) or "ERR_CONNECTION_CLOSED" in str(e):
+                        logging.warning(f"Koneksi terputus saat refresh token. Mencoba ulang... ({attempt + 1}/{max_retries})")
+                        time.sleep(5)
+                    else:
+                        logging.error(f"Error Selenium tak terduga: {e}")
+                        return None, None
+            
+            if success:
+                break
+            if not INTERACTIVE:
+                logging.error("Gagal menghubungi server saat refresh token.")
+                return None, None
+                
+            print("\n" + "!" * 50)
+            print("GAGAL MENGHUBUNGI SERVER SAAT REFRESH TOKEN")
+            print("Silakan cek koneksi internet Anda atau pastikan VPN FortiClient sudah terhubung.")
+            print("!" * 50 + "\n")
+            print('\a')
+            
+            choice = input("Ketik 'y' untuk mencoba lagi, atau 'n' untuk membatalkan refresh: ").strip().lower()
+            if choice == 'n':
+                logging.error("User membatalkan refresh token.")
+                return None, None
+            else:
+                logging.info("User memilih untuk mencoba refresh lagi...")
+
+        wait_for_page_tokens(driver)
+
+        page_source = driver.page_source
+        if "gcSubmitToken" in page_source:
+            logging.debug("gcSubmitToken ditemukan tanpa perlu login ulang.") # Changed to debug
+            return save_session_data(driver, session_file)
+        else:
+            logging.warning("gcSubmitToken tidak ditemukan. Kemungkinan sesi habis. Melakukan login ulang...")
+            login_selenium(driver, account)
+            return save_session_data(driver, session_file)
+
+    except Exception:
+        BROWSER.discard(account)
+        raise
+
+
+def load_session_from_file(session_file=SESSION_FILE):
+    """Mencoba memuat sesi dari file."""
+    if not USE_SESSION_CACHE:
+        logging.info("USE_SESSION_CACHE=false, melewati pemuatan sesi dari file.")
+        return None
+
+    if os.path.exists(session_file):
+        logging.info(f"Mencoba memuat sesi dari file '{session_file}'...")
+        with open(session_file, 'r') as f:
+            return json.load(f)
+    return None
+
+
+def create_backup(file_path, file_hash=None):
+    """
+    Menjadwalkan backup file input ke folder backup/ (di background, isi yang sama tidak disalin
+    ulang). Penulisan status & pemindahan file menunggu backup selesai lewat BACKUPS.wait().
+    """
+    BACKUPS.submit(file_path, file_hash)
+
+
+def load_bounding_boxes():
+    """
+    Memuat indeks bounding box wilayah (kunci: kode wilayah lengkap).
+    Cache biner di REGION_INDEX_FILE hanya dibangun ulang jika file JSON berubah.
+    """
+    if not os.path.exists(BOUNDING_BOX_FILE):
+        logging.warning(f"File '{BOUNDING_BOX_FILE}' tidak ditemukan. Validasi lokasi dilewati.")
+        return None
+    
+    try:
+        region_index = load_region_index(BOUNDING_BOX_FILE, REGION_INDEX_FILE)
+        logging.info(f"Berhasil memuat {len(region_index)} data bounding box wilayah.")
+        return region_index
+    except Exception as e:
+        logging.error(f"Gagal memuat file bounding box: {e}")
+        return None
+
+
+def print_validation_rules():
+    """Menampilkan aturan validasi ke console/log."""
+    rules = """
+    =======================================================
+    ATURAN VALIDASI DATA:
+    1. perusahaan_id : Wajib terisi.
+    2. kdkab         : Wajib terisi (2 digit).
+    3. hasilgc       : Harus salah satu dari ['1', '3', '4', '99'].
+    4. edit_nama     : Harus '0' atau '1'.
+    5. edit_alamat   : Harus '0' atau '1'.
+    6. Konsistensi   :
+       - Jika nama_usaha terisi, edit_nama harus '1'.
+       - Jika nama_usaha kosong, edit_nama harus '0'.
+       - Jika alamat_usaha terisi, edit_alamat harus '1'.
+       - Jika alamat_usaha kosong, edit_alamat harus '0'.
+    7. Lokasi        : Latitude & Longitude harus berada dalam
+                       wilayah kabupaten (berdasarkan kolom kdkab).
+                       (Harus dua-duanya terisi atau dua-duanya kosong)
+                       Jika DESA_GEOJSON_DIR diisi, titik juga harus
+                       berada di dalam poligon desa kabupaten tersebut.
+    =======================================================
+    """
+    print(rules)
+    input("Tekan Enter untuk melanjutkan...")
+    logging.info("Aturan validasi ditampilkan dan disetujui user.")
+
+
+def get_input_files():
+    """Mencari semua file input (Excel, CSV, Parquet, JSONL) di folder input."""
+    if not os.path.exists(INPUT_DIR):
+        os.makedirs(INPUT_DIR)
+        logging.info(f"Folder '{INPUT_DIR}' dibuat. Silakan letakkan file Excel/CSV/Parquet/JSONL di dalamnya.")
+        return []
+
+    files = [f for ext in INPUT_EXTENSIONS for f in glob.glob(os.path.join(INPUT_DIR, f"*{ext}"))]
+    # Filter file temporary (yang dimulai dengan ~$)
+    files = [f for f in files if not os.path.basename(f).startswith("~$")]
+    return files
+
+
+class SubmitWorker:
+    """
+    Satu rantai submit: transport HTTP (pool koneksi), CSRF token dan rantai gc_token milik sendiri.
+    Setiap gc_token hanya bisa dipakai sekali, jadi tiap worker mengirim satu baris pada satu waktu.
+    """
+
+    # Login/refresh (Chrome & prompt OTP) hanya boleh dipakai satu worker pada satu waktu
+    login_lock = threading.Lock()
+
+    def __init__(self, worker_id, account, session_file, rate_controller, transport=None):
+        self.worker_id = worker_id
+        self.account = account
+        self.session_file = session_file
+        self.rate_controller = rate_controller
+        self.name = f"W{worker_id}"
+        self.manager = SessionManager(self.name, self._probe, self._login, self._save, SESSION_KEEPALIVE, transport)
+
+    def _probe(self, session_data):
+        return probe_session(session_data, self.session_file, self.manager.transport)
+
+    def _login(self):
+        with SubmitWorker.login_lock:
+            return refresh_gc_token(self.account, self.session_file)
+
+    def _save(self, session_data):
+        if session_data:
+            store_session_data(session_data['cookies'], session_data['csrf_token'], self.session_file,
+                               session_data['gc_token'], quiet=True)
+
+    def save_state(self):
+        """Simpan cookie, CSRF & gc_token terakhir agar start berikutnya tidak perlu login/browser."""
+        try:
+            self._save(self.manager.snapshot())
+        except Exception as e:
+            logging.warning(f"[{self.name}] Gagal menyimpan sesi: {e}")
+
+    def authenticate(self):
+        """
+        Siapkan sesi dan gc_token pertama. Warm start: pakai gc_token tersimpan langsung,
+        lalu probe HTTP, baru login penuh (HTTP/browser) jika keduanya gagal.
+        """
+        logging.info(f"[{self.name}] Menyiapkan sesi untuk akun {self.account['username']}...")
+        session_data = load_session_from_file(self.session_file)
+        gc_token = None
+        fresh_login = False
+        if session_data and session_data.get('gc_token') and session_data.get('csrf_token'):
+            logging.info(f"[{self.name}] Memakai sesi & gc_token tersimpan (warm start).")
+            gc_token = session_data['gc_token']
+        else:
+            with SubmitWorker.login_lock:
+                if not session_data:
+                    session_data, gc_token = get_authenticated_session(self.account, self.session_file)
+                    fresh_login = True
+                else:
+                    logging.info(f"[{self.name}] Sesi dimuat dari file, mengambil gc_token awal...")
+                    session_data, gc_token = refresh_gc_token(self.account, self.session_file, session_data)
+
+        if not session_data:
+            logging.critical(f"[{self.name}] Gagal mendapatkan sesi otentikasi.")
+            return False
+        if not gc_token:
+            logging.critical(f"[{self.name}] Gagal mendapatkan gc_token awal.")
+            return False
+
+        self.manager.apply(session_data, gc_token, fresh_login)
+        self.manager.start_keepalive()
+        return True
+
+    def stop(self):
+        """Hentikan keepalive dan tutup koneksi."""
+        stats = self.manager.transport.stats.snapshot()
+        logging.debug(f"[{self.name}] Transport {self.manager.transport.name}: {stats['requests']} request, "
+                      f"{stats['connections']} koneksi baru ({stats['tls_resumed']} resume TLS), "
+                      f"{stats['timeouts']} timeout.")
+        self.manager.stop()
+
+    def submit(self, row_data, log_prefix, stop_event=None):
+        """Mengirim satu baris data. Mengembalikan (status_akhir, response)."""
+        gc_token, csrf_token, generation = self.manager.token()
+        data = dict(row_data)
+        data['gc_token'] = gc_token
+        data['time_on_page'] = str(random.randint(30, 120))
+        data['_token'] = csrf_token
+
+        logging.debug("[%s] Mengirim data: perusahaan_id=%s, time_on_page=%s", self.name, data['perusahaan_id'], data['time_on_page'])
+
+        status_akhir = "gagal"
+        response = None # Initialize response
+
+        # Timeout/5xx/error koneksi tidak diulang di sini (worker tidak tertahan): baris dikembalikan
+        # dengan status gagal sementara dan dikirim ulang pipeline lewat antrian tunda
+        while True:
+            # Tunggu giliran dari pengatur laju (termasuk jeda global setelah 429)
+            if not self.rate_controller.acquire(stop_event):
+                status_akhir = "gagal - Dihentikan"
+                break
+            try:
+                started = time.monotonic()
+                with span('post'):
+                    response = self.manager.transport.post(POST_URL, headers=POST_HEADERS, data=data)
+                latency = time.monotonic() - started
+                POST_LATENCY.observe(latency)
+                POST_RESPONSES.inc(code=str(response.status_code))
+                logging.debug("Status Code: %s", response.status_code)
+
+                if response.status_code == 200:
+                    self.rate_controller.on_success(latency)
+                    try:
+                        response_json = response.json()
+                        msg = response_json.get('message', 'No message')
+                        SERVER_MESSAGES.inc(message=str(msg)[:80])
+                        logging.debug("Response Message: %s", msg)
+
+                        if response_json.get('status') == 'success' and 'new_gc_token' in response_json:
+                            new_token = response_json['new_gc_token']
+                            self.manager.update_token(new_token, generation)
+                            logging.debug("[SUCCESS] Token diperbarui: %.10s...", new_token)
+                            status_akhir = "berhasil"
+                            break
+                        else:
+                            logging.warning("%s - Gagal: %s", log_prefix, msg, extra={'event': 'respons_server'})
+                            status_akhir = f"gagal - {msg}"
+                            log_body("Full Response", response)
+                            break
+                    except json.JSONDecodeError:
+                        logging.error("Gagal memparsing respons sebagai JSON.")
+                        log_body("Response Text", response)
+                        break
+                elif response.status_code == 429:
+                    # Jeda global dipasang di pengatur laju; acquire() berikutnya akan menunggu
+                    wait_time = self.rate_controller.on_rate_limited(response.headers.get('Retry-After'))
+                    logging.info(f"{log_prefix} - Rate Limit (429). Menunggu {wait_time:.0f} detik...") # Concise for console
+                    # Coba lagi request yang sama
+                    continue
+                elif response.status_code == 400:
+                    try:
+                        response_json = response.json()
+                        msg = response_json.get('message', '')
+                        SERVER_MESSAGES.inc(message=str(msg)[:80])
+
+                        if "Token invalid atau sudah terpakai" in msg:
+                            logging.warning(f"[{self.name}] Token invalid. Mencoba refresh token...")
+
+                            # Single-flight: jika sesi sudah diperbarui (keepalive/thread lain), cukup pakai token terbaru
+                            if self.manager.refresh(generation):
+                                gc_token, csrf_token, generation = self.manager.token()
+                                data['gc_token'] = gc_token
+                                data['_token'] = csrf_token
+
+                                logging.info("Mencoba mengirim ulang request dengan token baru...")
+                                continue
+                            else:
+                                logging.error("Gagal mendapatkan sesi atau token baru.")
+                                status_akhir = "gagal - Refresh token error"
+                                break
+                        else:
+                            logging.error(f"Request gagal (400): {msg}")
+                            status_akhir = f"gagal - {msg}"
+                            break
+                    except:
+                        logging.error("Request gagal (400).")
+                        log_body("Response Text", response)
+                        status_akhir = "gagal - 400 Bad Request"
+                        break
+                else:
+                    logging.error(f"Request gagal dengan status {response.status_code}.")
+                    log_body("Response Text", response)
+                    if response.status_code >= 500:
+                        self.rate_controller.on_error()
+                    status_akhir = f"gagal - HTTP {response.status_code}"
+                    break
+
+            except TransportTimeout as e:
+                POST_RESPONSES.inc(code='timeout')
+                logging.error(f"Request Timeout ({e}). Server tidak merespons.")
+                self.rate_controller.on_error()
+                status_akhir = "gagal - Timeout"
+                break
+            except Exception as e:
+                POST_RESPONSES.inc(code='error')
+                logging.error(f"Terjadi kesalahan saat melakukan request: {e}", exc_info=True)
+                self.rate_controller.on_error()
+                status_akhir = f"gagal - Error: {str(e)}"
+                break
+
+        return status_akhir, response
+
+    def run(self, task_queue, result_queue, stop_event):
+        """Loop thread worker: ambil baris dari antrian, kirim, laporkan hasil (sampai stop_event diset)."""
+        while not stop_event.is_set():
+            try:
+                task_id, log_prefix, row_data = task_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                logging.info("%s - Memproses... [%s]", log_prefix, self.name, extra={'event': 'kirim_baris'})
+                status_akhir, _ = self.submit(row_data, log_prefix, stop_event)
+            except Exception as e:
+                logging.error(f"[{self.name}] Error tak terduga: {e}", exc_info=True)
+                status_akhir = f"gagal - Error: {str(e)}"
+            if status_akhir == "gagal - Dihentikan":
+                # Baris belum terkirim, biarkan statusnya kosong agar diproses lagi run berikutnya
+                status_akhir = ''
+            result_queue.put((task_id, status_akhir))
+
+
+def create_workers(rate_controller, timeouts):
+    """Membuat SUBMIT_WORKERS rantai submit, dibagi bergiliran ke akun yang dikonfigurasi."""
+    accounts = load_accounts()
+    workers = []
+    for i in range(SUBMIT_WORKERS):
+        worker_id = i + 1
+        transport = create_transport(HTTP_BACKEND, timeouts, HTTP_POOL_SIZE)
+        worker = SubmitWorker(worker_id, accounts[i % len(accounts)], get_session_file(worker_id),
+                              rate_controller, transport)
+        if worker.authenticate():
+            workers.append(worker)
+        else:
+            logging.error(f"[{worker.name}] Worker dilewati karena gagal otentikasi.")
+    logging.info(f"{len(workers)} rantai submit siap ({len(accounts)} akun).")
+    return workers
+
+
+def save_statuses(file_path, statuses):
+    """Menulis status ({posisi baris: status}) ke file input (atau sidecar) dengan retry jika file terkunci."""
+    BACKUPS.wait(file_path)  # Backup harus berisi file sebelum status ditulis
+    for attempt in range(3):
+        try:
+            with span('tulis_excel'):
+                write_statuses(file_path, statuses)
+            return True
+        except PermissionError:
+            logging.warning(f"File terkunci. Retry save ({attempt + 1}/3)...")
+            time.sleep(2)
+        except Exception as e:
+            logging.error(f"Gagal menyimpan file {os.path.basename(file_path)}: {e}")
+            break
+    return False
+
+
+def validation_context(bbox_map, polygon_index=None):
+    """
+    Sidik jari semua hal yang memengaruhi hasil validasi (aturan, bounding box, poligon desa).
+    Cache input hanya dipakai ulang jika konteks ini sama.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([REQUIRED_COLUMNS, VALID_HASILGC, VALID_FLAG]).encode('utf-8'))
+    if bbox_map is not None and os.path.exists(BOUNDING_BOX_FILE):
+        stat = os.stat(BOUNDING_BOX_FILE)
+        digest.update(f"bbox:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+    if polygon_index is not None:
+        for kab_code, path in sorted(polygon_index.files.items()):
+            stat = os.stat(path)
+            digest.update(f"desa:{kab_code}:{stat.st_size}:{stat.st_mtime_ns}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def prepare_chunk(chunk, keys, bbox_map, polygon_index, input_cache=None, reuse_hash=None, cache_token=None):
+    """
+    Validasi & bangun payload satu chunk Excel. Mengembalikan (posisi, row_key, perusahaan_id,
+    status, errors, payload). Baris yang row_key-nya ada di cache versi sebelumnya (reuse_hash)
+    tidak divalidasi ulang. Jika cache_token diberikan, hasilnya disimpan ke cache input.
+    """
+    n = len(chunk)
+    errors = np.empty(n, dtype=object)
+    payload_records = [None] * n
+    need_validation = np.ones(n, dtype=bool)
+
+    if input_cache is not None and reuse_hash:
+        with span('cache_input'):
+            cached = input_cache.reuse(reuse_hash, keys)
+        for i, key in enumerate(keys):
+            hit = cached.get(key)
+            if hit is not None and (hit[0] or hit[1] is not None):
+                errors[i], payload_records[i] = hit
+                need_validation[i] = False
+
+    idx = np.flatnonzero(need_validation)
+    if len(idx) < n:
+        logging.debug(f"Hasil validasi {n - len(idx)} baris dipakai dari cache input.")
+    if len(idx):
+        with span('validasi'):
+            new_errors, payload = validate_dataframe(chunk.iloc[idx], bbox_map, polygon_index)
+        for j, record in enumerate(payload.to_dict('records')):
+            errors[idx[j]] = new_errors[j]
+            payload_records[idx[j]] = record
+
+    status_values = chunk['status_upload'].astype(str)
+    if input_cache is not None and cache_token:
+        # Payload hanya perlu disimpan untuk baris valid yang belum selesai
+        done = done_mask(status_values)
+        cached_payloads = [None if done[i] or errors[i] else payload_records[i] for i in range(n)]
+        with span('cache_input'):
+            input_cache.add_rows(cache_token, chunk.index, keys, status_values, errors, cached_payloads)
+
+    perusahaan_ids = chunk['perusahaan_id'].astype(str).str.strip().to_numpy(dtype=object)
+    return chunk.index.to_numpy(), keys, perusahaan_ids, status_values, errors, payload_records
+
+
+def cached_chunks(input_cache, file_hash, status_prefixes=None):
+    """
+    Chunk siap pakai (format sama dengan prepare_chunk) dari cache input, tanpa membaca Excel.
+    status_prefixes membatasi ke baris dengan status tertentu (mis. gagal sementara).
+    """
+    for chunk in PROFILER.iterate('baca_cache', input_cache.iter_chunks(file_hash, READ_CHUNK_SIZE, status_prefixes)):
+        payloads = chunk['payload'].tolist()
+        # perusahaan_id hanya tersimpan di payload (baris yang belum selesai)
+        perusahaan_ids = np.array([p['perusahaan_id'] if p else '' for p in payloads], dtype=object)
+        yield (chunk.index.to_numpy(), chunk['row_key'].to_numpy(dtype=object), perusahaan_ids,
+               chunk['status_upload'], chunk['errors'].to_numpy(dtype=object), payloads)
+
+
+def put_until_stopped(target_queue, item, stop_event):
+    """put() ke antrian terbatas (backpressure) yang tetap bisa dibatalkan. False jika dihentikan."""
+    while not stop_event.is_set():
+        try:
+            target_queue.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class FileJob:
+    """State satu file input selama berada di pipeline."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.name = os.path.basename(file_path)
+        self.file_hash = None
+        self.cache_entry = None
+        self.columns = None
+        self.estimated_total = None
+        self.fingerprint = None
+        self.cache_token = None
+        self.reuse_hash = None
+        self.retry_only = False  # Hanya baris gagal sementara (perintah retry), bukan seluruh file
+
+        # Dipakai hanya oleh thread utama (koordinator)
+        self.journal_statuses = {}
+        self.statuses = {}  # posisi baris -> status baru (ditulis ke Excel saat checkpoint)
+        self.dirty = False  # Ada status yang belum ditulis ke Excel
+        self.saving = False  # Sedang ditulis oleh thread penulis
+        self.chunks_total = None  # Diisi saat file selesai dibaca
+        self.chunks_done = 0
+        self.queued = 0
+        self.done = 0
+        self.pending_duplicates = 0  # Baris yang menunggu hasil baris lain dengan perusahaan_id sama
+        self.pending_retries = 0  # Baris gagal sementara yang menunggu jadwal kirim ulang
+        self.last_checkpoint = time.monotonic()
+        # transient_failed: bagian dari 'failed' yang masih gagal sementara setelah semua percobaan
+        self.stats = {'filename': self.name, 'total': 0, 'success': 0, 'failed': 0, 'skipped': 0,
+                      'transient_failed': 0, 'start_time': datetime.now()}
+
+    @property
+    def reading(self):
+        """File sumber masih dibaca (belum boleh ditimpa)."""
+        return self.chunks_total is None or self.chunks_done < self.chunks_total
+
+    @property
+    def settled(self):
+        """Semua baris sudah dibaca dan semua kiriman sudah ada hasilnya."""
+        return (not self.reading and self.done >= self.queued and self.pending_duplicates == 0
+                and self.pending_retries == 0)
+
+
+def open_file_job(file_path, input_cache=None, context=None, retry_only=False):
+    """
+    Tahap awal ingest: hash file, cek cache input, baca header, backup dan cek kolom wajib.
+    Mengembalikan FileJob, atau None jika file tidak bisa diproses. Dengan retry_only, file
+    harus masih sama dengan entri cache input (baris gagal sementara dicari di sana).
+    """
+    job = FileJob(file_path)
+    try:
+        with span('hash_file'):
+            job.file_hash = file_sha256(file_path)
+        job.cache_entry = input_cache.lookup(job.file_hash, context) if input_cache is not None else None
+        if job.cache_entry is None and retry_only:
+            logging.warning(f"[{job.name}] Berubah sejak run terakhir (tidak ada di cache input), dilewati. "
+                            "Jalankan 'python main.py run' untuk file ini.")
+            return None
+        if job.cache_entry is not None:
+            logging.debug(f"Isi file sama dengan cache input, Excel tidak dibaca ulang: {file_path}")
+            job.columns, job.estimated_total = job.cache_entry['columns'], job.cache_entry['total']
+        else:
+            logging.debug(f"Membaca header file data: {file_path}") # Changed to debug
+            with span('baca_header'):
+                job.columns, job.estimated_total = read_header(file_path)
+    except PermissionError:
+        logging.error(f"File '{job.name}' sedang dibuka/terkunci, dilewati. Tutup file lalu jalankan ulang.")
+        return None
+    except Exception as e:
+        logging.error(f"Gagal membaca file {file_path}: {e}", exc_info=True)
+        return None
+    job.fingerprint = file_fingerprint(file_path, job.columns)
+    job.stats['fingerprint'] = job.fingerprint
+
+    if job.cache_entry is not None and job.cache_entry['complete']:
+        return job
+
+    # Buat Backup (Hanya jika file berhasil dibaca). Mode sidecar tidak pernah mengubah file input.
+    if not STATUS_SIDECAR:
+        create_backup(file_path, job.file_hash)
+
+    if not all(col in job.columns for col in REQUIRED_COLUMNS):
+        logging.error(f"Kolom di file {file_path} tidak lengkap. Harus ada: {', '.join(REQUIRED_COLUMNS)}")
+        return None
+
+    if job.cache_entry is not None:
+        job.cache_token = job.cache_entry['file_hash']
+        job.retry_only = retry_only
+    elif input_cache is not None:
+        job.cache_token = input_cache.begin()
+        job.reuse_hash = input_cache.previous_version(job.name, context)
+    return job
+
+
+def ingest_stage(file_paths, raw_queue, event_queue, stop_event, input_cache, context, validate_workers,
+                 retry_only=False):
+    """
+    Tahap 1 (1 thread): membuka file satu per satu dan membaca baris per chunk ke raw_queue.
+    Event file (start/end/complete) dikirim langsung ke event_queue untuk koordinator.
+    File berikutnya langsung dibaca tanpa menunggu file sebelumnya selesai dikirim.
+    Dengan retry_only hanya baris gagal sementara yang diambil, langsung dari cache input.
+    """
+    try:
+        for file_path in file_paths:
+            if stop_event.is_set():
+                break
+            logging.info(f"Memproses file: {os.path.basename(file_path)}") # Concise for console
+            job = open_file_job(file_path, input_cache, context, retry_only)
+            if job is None:
+                continue
+            if job.cache_entry is not None and job.cache_entry['complete']:
+                put_until_stopped(event_queue, ('complete', job, None), stop_event)
+                continue
+            if not put_until_stopped(event_queue, ('start', job, None), stop_event):
+                break
+
+            chunk_count = 0
+            try:
+                if job.cache_entry is not None:
+                    status_prefixes = TRANSIENT_PREFIXES if job.retry_only else None
+                    for prepared in cached_chunks(input_cache, job.cache_token, status_prefixes):
+                        if not put_until_stopped(event_queue, ('chunk', job, prepared), stop_event):
+                            return
+                        chunk_count += 1
+                else:
+                    seen_rows = {}
+                    for chunk in PROFILER.iterate('baca_excel', iter_chunks(file_path, READ_CHUNK_SIZE)):
+                        with span('row_key'):
+                            keys = row_keys(chunk, seen_rows)  # Urutan kemunculan butuh urutan chunk
+                        if not put_until_stopped(raw_queue, (job, chunk, keys), stop_event):
+                            return
+                        chunk_count += 1
+            except Exception as e:
+                logging.error(f"Gagal membaca file {file_path}: {e}", exc_info=True)
+            put_until_stopped(event_queue, ('end', job, chunk_count), stop_event)
+    finally:
+        for _ in range(validate_workers):
+            put_until_stopped(raw_queue, None, stop_event)
+        put_until_stopped(event_queue, ('finished', None, None), stop_event)
+
+
+def validate_stage(raw_queue, event_queue, stop_event, bbox_map, polygon_index, input_cache):
+    """Tahap 2 (VALIDATE_WORKERS thread): validasi + payload (Base64) per chunk."""
+    while not stop_event.is_set():
+        try:
+            item = raw_queue.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        if item is None:
+            return
+        job, chunk, keys = item
+        try:
+            with VALIDATE_SECONDS.time():
+                prepared = prepare_chunk(chunk, keys, bbox_map, polygon_index, input_cache, job.reuse_hash,
+                                         job.cache_token)
+        except Exception as e:
+            logging.error(f"[{job.name}] Gagal memvalidasi chunk: {e}", exc_info=True)
+            prepared = None
+        if not put_until_stopped(event_queue, ('chunk', job, prepared), stop_event):
+            return
+
+
+def writer_stage(write_queue, saved_queue, stop_event):
+    """Tahap 5 (1 thread): menulis status ke file Excel tanpa menahan koordinator."""
+    while not stop_event.is_set():
+        try:
+            item = write_queue.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        job, statuses, reason = item
+        with SAVE_SECONDS.time(reason=reason):
+            ok = save_statuses(job.file_path, statuses)
+        file_hash = None
+        if ok:
+            try:
+                file_hash = file_sha256(job.file_path)
+            except Exception as e:
+                logging.debug(f"Gagal menghitung hash {job.file_path}: {e}")
+        saved_queue.put((job, ok, reason, file_hash))
+
+
+def retry_delay(attempt):
+    """Jeda sebelum kirim ulang ke-`attempt`: backoff eksponensial (dibatasi RETRY_MAX_DELAY) dengan jitter."""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def run_pipeline(file_paths, workers, bbox_map, polygon_index=None, journal=None, input_cache=None, context=None,
+                 ledger=None, retry_only=False, cancel_event=None):
+    """
+    Memproses semua file input lewat tahap-tahap yang dihubungkan antrian terbatas:
+    ingest (baca per chunk, lintas file) -> validasi & payload (VALIDATE_WORKERS thread) ->
+    koordinator (thread utama: jurnal, ledger, antrian kirim) -> submit (SUBMIT_WORKERS) ->
+    penulis Excel (1 thread). Jaringan tetap sibuk sementara parsing, validasi dan penulisan
+    file berjalan bersamaan. Mengembalikan list statistik per file.
+
+    cancel_event (opsional, dipakai daemon): jika diset, pipeline berhenti seperti Ctrl+C
+    (request berjalan diselesaikan, status disimpan) di titik aman koordinator.
+    """
+    stop_event = threading.Event()
+    raw_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    event_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    task_queue = queue.Queue(maxsize=READ_CHUNK_SIZE)
+    result_queue = queue.Queue()
+    write_queue = queue.Queue()
+    saved_queue = queue.Queue()
+
+    threads = [threading.Thread(target=ingest_stage, name="ingest", daemon=True,
+                                args=(file_paths, raw_queue, event_queue, stop_event, input_cache, context, VALIDATE_WORKERS,
+                                      retry_only))]
+    threads += [threading.Thread(target=validate_stage, name=f"validate-{i + 1}", daemon=True,
+                                 args=(raw_queue, event_queue, stop_event, bbox_map, polygon_index, input_cache))
+                for i in range(VALIDATE_WORKERS)]
+    submit_threads = [threading.Thread(target=worker.run, args=(task_queue, result_queue, stop_event), name=worker.name, daemon=True)
+                      for worker in workers]
+    writer_thread = threading.Thread(target=writer_stage, name="writer", daemon=True,
+                                     args=(write_queue, saved_queue, stop_event))
+    for thread in threads + submit_threads + [writer_thread]:
+        thread.start()
+
+    all_stats = []
+    open_jobs = []
+    tasks = {}  # (job, posisi) -> (row_key, perusahaan_id, task, percobaan ke-)
+    in_flight = {}  # perusahaan_id yang sedang dikirim -> baris lain dengan ID sama yang menunggu
+    requeue = []  # Baris tertunda yang perlu dikirim karena baris pertama gagal
+    deferred = []  # Heap (jadwal kirim ulang, urutan, job, task, row_key, perusahaan_id, percobaan)
+    deferred_seq = itertools.count()
+    ingest_finished = False
+    # Console: ringkasan progres berkala (log per baris hanya di app.log kecuali LOG_CONSOLE_ROWS=true)
+    progress = ProgressReporter(LOG_PROGRESS_INTERVAL, ROWS_SUBMITTED.total)
+
+    def remaining_rows():
+        return sum(max(0, max(0 if job.retry_only else job.estimated_total or 0, job.stats['total'])
+                       - job.stats['success'] - job.stats['failed'] - job.stats['skipped']) for job in open_jobs)
+
+    def enqueue(task):
+        while True:
+            try:
+                task_queue.put(task, timeout=0.2)
+                return
+            except queue.Full:
+                drain_results()
+
+    def submit_row(job, task, pid, row_key, waiting=(), attempt=1):
+        pos, log_prefix, row_data = task
+        tasks[(job, pos)] = (row_key, pid, task, attempt)
+        in_flight[pid] = list(waiting)
+        job.queued += 1
+        enqueue(((job, pos), log_prefix, row_data))
+
+    def flush_requeue():
+        while requeue:
+            job, task, row_key, waiting = requeue.pop(0)
+            job.pending_duplicates -= 1
+            submit_row(job, task, task[2]['perusahaan_id'], row_key, waiting)
+
+    def flush_deferred():
+        """Kirim ulang baris gagal sementara yang jadwalnya sudah tiba (antri di belakang baris baru)."""
+        now = time.monotonic()
+        while deferred and deferred[0][0] <= now:
+            _, _, job, task, row_key, pid, attempt = heapq.heappop(deferred)
+            job.pending_retries -= 1
+            submit_row(job, task, pid, row_key, in_flight.get(pid, ()), attempt)
+
+    def request_save(job, reason):
+        job.saving = True
+        job.dirty = False
+        job.last_checkpoint = time.monotonic()
+        write_queue.put((job, dict(job.statuses), reason))
+
+    def handle_result(job, pos, status_akhir):
+        job.done += 1
+        row_key, pid, task, attempt = tasks.pop((job, pos))
+        if is_transient(status_akhir) and attempt < RETRY_MAX_ATTEMPTS and not stop_event.is_set():
+            # Baris lain dengan perusahaan_id sama tetap menunggu (in_flight tidak dilepas)
+            delay = retry_delay(attempt)
+            job.pending_retries += 1
+            heapq.heappush(deferred, (time.monotonic() + delay, next(deferred_seq), job, task, row_key, pid, attempt + 1))
+            ROWS_RETRIED.inc(alasan=status_akhir[len('gagal - '):].split(':')[0][:40])
+            logging.info("[%s] Baris %d gagal sementara (%s), dikirim ulang dalam %.1f dtk (percobaan %d/%d).",
+                         job.name, pos + 1, status_akhir, delay, attempt + 1, RETRY_MAX_ATTEMPTS,
+                         extra={'event': 'baris_ditunda', 'file': job.name, 'baris': pos + 1, 'status': status_akhir})
+            return
+        waiting = in_flight.pop(pid, [])
+        if not status_akhir:
+            for waiting_job, _, _ in waiting:
+                waiting_job.pending_duplicates -= 1
+            return
+        job.statuses[pos] = status_akhir
+        if journal is not None:
+            with span('jurnal'):
+                journal.record(job.fingerprint, row_key, pos, status_akhir)
+        job.dirty = True
+        ROWS_SUBMITTED.inc(hasil=status_akhir.split(' - ')[0])
+        if status_akhir == "berhasil":
+            job.stats['success'] += 1
+        else:
+            job.stats['failed'] += 1
+            if is_transient(status_akhir):
+                job.stats['transient_failed'] += 1
+        logging.info("[%s] Baris %d Status: %s", job.name, pos + 1, status_akhir,
+                     extra={'event': 'hasil_baris', 'file': job.name, 'baris': pos + 1, 'status': status_akhir})
+
+        # --- LEDGER ---
+        if confirmed_mask(pd.Series([status_akhir]))[0]:
+            if ledger is not None:
+                ledger.add([pid], status_akhir, job.name)
+            for waiting_job, waiting_task, _ in waiting:
+                waiting_job.statuses[waiting_task[0]] = LEDGER_STATUS
+                waiting_job.stats['skipped'] += 1
+                waiting_job.pending_duplicates -= 1
+                waiting_job.dirty = True
+            if waiting:
+                ROWS_SKIPPED.inc(len(waiting), alasan='duplikat')
+                logging.info(f"{len(waiting)} baris lain dengan perusahaan_id {pid} dilewati (sudah terkirim).")
+        elif waiting:
+            # Baris pertama gagal: kirim baris berikutnya dengan ID yang sama
+            waiting_job, waiting_task, waiting_key = waiting[0]
+            requeue.append((waiting_job, waiting_task, waiting_key, waiting[1:]))
+
+    def drain_results():
+        while True:
+            # Di laju tinggi koordinator bisa lama berada di loop ini, jadi progres dicek di sini
+            progress.tick(remaining_rows)
+            try:
+                (job, pos), status_akhir = result_queue.get_nowait()
+            except queue.Empty:
+                return
+            handle_result(job, pos, status_akhir)
+
+    def dispatch_chunk(job, prepared):
+        """Koordinator: gabung jurnal, lewati baris selesai/ledger/invalid, antrikan sisanya."""
+        positions, keys, perusahaan_ids, status_values, all_errors, payload_records = prepared
+        job.stats['total'] += len(positions)
+        restored = merge_statuses(status_values, keys, job.journal_statuses)
+        if len(restored):
+            job.statuses.update(restored.to_dict())
+            job.dirty = True
+            logging.info(f"[{job.name}] {len(restored)} status dipulihkan dari jurnal (run sebelumnya).")
+
+        skip_mask = done_mask(status_values)
+        total_label = max(job.estimated_total or 0, positions[-1] + 1)
+
+        # Baris yang sudah selesai dilewati langsung lewat mask, tanpa log per baris
+        skipped = int(skip_mask.sum())
+        job.stats['skipped'] += skipped
+        ROWS_SKIPPED.inc(skipped, alasan='sudah_selesai')
+        if skipped:
+            logging.info(f"[{job.name}] {skipped} baris sudah selesai sebelumnya, dilewati.")
+
+        # --- LEDGER: catat ID terkonfirmasi dari file, lewati ID yang sudah terkonfirmasi di mana pun ---
+        if ledger is not None:
+            confirmed = confirmed_mask(status_values)
+            if confirmed.any():
+                ledger.add(perusahaan_ids[confirmed].tolist(), "status file", job.name)
+            in_ledger = ~skip_mask & ledger.contains(perusahaan_ids)
+            if in_ledger.any():
+                for pos in positions[in_ledger]:
+                    job.statuses[int(pos)] = LEDGER_STATUS
+                job.dirty = True
+                skip_mask = skip_mask | in_ledger
+                job.stats['skipped'] += int(in_ledger.sum())
+                ROWS_SKIPPED.inc(int(in_ledger.sum()), alasan='ledger')
+                logging.info(f"[{job.name}] {int(in_ledger.sum())} baris dilewati karena perusahaan_id sudah ada di ledger.")
+
+        for i in np.flatnonzero(~skip_mask):
+            pos = int(positions[i])
+            log_prefix = RowLabel(job.name, pos + 1, total_label)
+
+            validation_errors = all_errors[i]
+            if validation_errors:
+                error_msg = format_errors(validation_errors)
+                logging.warning("%s - Gagal Validasi: %s", log_prefix, error_msg,
+                                extra={'event': 'baris_invalid', 'file': job.name, 'baris': pos + 1})
+                if status_values.iat[i] != error_msg:
+                    job.statuses[pos] = error_msg
+                    job.dirty = True
+                job.stats['failed'] += 1
+                ROWS_SKIPPED.inc(alasan='tidak_valid')
+                continue
+
+            task = (pos, log_prefix, payload_records[i])
+            pid = payload_records[i]['perusahaan_id']
+            if pid in in_flight:
+                in_flight[pid].append((job, task, keys[i]))
+                job.pending_duplicates += 1
+                continue
+            submit_row(job, task, pid, keys[i])
+
+    def finalize(job, saved):
+        """File selesai: tutup cache input, pindahkan jika 100%, catat statistik."""
+        open_jobs.remove(job)
+        stats = job.stats
+        total = stats['total']
+        complete = stats['success'] + stats['skipped'] == total and total > 0
+        if job.retry_only:
+            # Hanya sebagian baris yang dikirim ulang: kelengkapan dinilai dari semua baris di cache
+            statuses = input_cache.statuses(job.cache_token)
+            statuses.update(pd.Series(job.statuses, dtype=object))
+            total = len(statuses)
+            complete = total > 0 and bool(done_mask(statuses).all())
+        if input_cache is not None and job.cache_token:
+            if saved:
+                input_cache.finish(job.cache_token, job.file_hash, job.name, context, job.columns,
+                                   total, job.statuses, complete)
+            else:
+                input_cache.discard(job.cache_token)
+        for worker in workers:
+            worker.save_state()
+        stats['end_time'] = datetime.now()
+        all_stats.append(stats)
+        if complete:
+            move_to_processed(job.file_path, journal, job.fingerprint)
+
+    def advance(job):
+        """Checkpoint berkala dan penutupan file yang sudah tuntas."""
+        if job.saving:
+            return
+        if job.settled:
+            if job.dirty:
+                request_save(job, "akhir file")
+            else:
+                finalize(job, True)
+        elif job.dirty and not job.reading and CHECKPOINT_INTERVAL > 0 \
+                and time.monotonic() - job.last_checkpoint >= CHECKPOINT_INTERVAL:
+            request_save(job, "checkpoint")
+
+    def shutdown():
+        """Hentikan semua tahap, tunggu request berjalan selesai, lalu simpan status file yang masih terbuka."""
+        stop_event.set()
+        logging.info("Menunggu request yang sedang berjalan selesai...")
+        for thread in submit_threads:
+            thread.join(timeout=35)
+        writer_thread.join()  # Jangan sampai dua penulis menimpa file yang sama
+        for thread in threads:
+            thread.join(timeout=10)
+        while not result_queue.empty():
+            (job, pos), status_akhir = result_queue.get_nowait()
+            if (job, pos) in tasks:
+                handle_result(job, pos, status_akhir)
+        logging.info("Menyimpan data terakhir sebelum keluar...")
+        for job in list(open_jobs):
+            if save_statuses(job.file_path, job.statuses):
+                logging.info(f"[{job.name}] Data berhasil disimpan.")
+            else:
+                logging.error(f"[{job.name}] Gagal menyimpan data saat exit. Status tetap aman di jurnal dan dipulihkan pada run berikutnya.")
+            if input_cache is not None and job.cache_token:
+                input_cache.discard(job.cache_token)
+            job.stats['end_time'] = datetime.now()
+            all_stats.append(job.stats)
+        # Tetap return stats agar laporan bisa dibuat
+        return all_stats
+
+    try:
+        while not (ingest_finished and not open_jobs):
+            if cancel_event is not None and cancel_event.is_set():
+                logging.warning("Pipeline dihentikan (sinyal stop), menyelesaikan request yang berjalan...")
+                return shutdown()
+            drain_results()
+            flush_requeue()
+            flush_deferred()
+
+            while True:
+                try:
+                    job, ok, reason, file_hash = saved_queue.get_nowait()
+                except queue.Empty:
+                    break
+                job.saving = False
+                if ok:
+                    job.file_hash = file_hash
+                    logging.info(f"[{job.name}] Status digabung ke Excel ({reason}).")
+                else:
+                    job.dirty = True
+                    logging.error(f"[{job.name}] GAGAL MENYIMPAN STATUS KE EXCEL ({reason}). Status tetap aman di jurnal.")
+                if reason == "akhir file":
+                    finalize(job, ok)
+
+            try:
+                kind, job, data = event_queue.get(timeout=0.1)
+            except queue.Empty:
+                kind = None
+            if kind == 'start':
+                job.journal_statuses = journal.latest(job.fingerprint) if journal is not None else {}
+                logging.info(f"[{job.name}] Sekitar {job.estimated_total} baris data, dibaca per {READ_CHUNK_SIZE} baris.") # Concise for console
+                open_jobs.append(job)
+            elif kind == 'chunk':
+                job.chunks_done += 1
+                if data is not None:
+                    dispatch_chunk(job, data)
+            elif kind == 'end':
+                job.chunks_total = data
+            if kind in ('chunk', 'end') and not job.reading:
+                logging.info(f"[{job.name}] Selesai membaca {job.stats['total']} baris, {job.queued} baris dikirim.")
+            elif kind == 'complete':
+                logging.info(f"[{job.name}] Tidak berubah sejak selesai 100%, dilewati tanpa membaca ulang.")
+                now = datetime.now()
+                job.stats.update({'total': job.cache_entry['total'], 'skipped': job.cache_entry['total'],
+                                  'start_time': now, 'end_time': now})
+                all_stats.append(job.stats)
+                move_to_processed(job.file_path, journal, job.fingerprint)
+            elif kind == 'finished':
+                ingest_finished = True
+
+            for job in list(open_jobs):
+                advance(job)
+
+            if not any(thread.is_alive() for thread in submit_threads) and (tasks or requeue or deferred):
+                logging.error("Semua worker submit berhenti, sisa baris tidak dikirim.")
+                break
+
+    except KeyboardInterrupt:
+        logging.warning("\n!!! PROSES DIHENTIKAN OLEH PENGGUNA (Ctrl+C) !!!")
+        return shutdown()
+
+    stop_event.set()  # Semua tahap (termasuk worker submit) berhenti
+    return all_stats
+
+
+def move_to_processed(file_path, journal=None, fingerprint=None):
+    """Memindahkan file yang selesai 100% ke PROCESSED_DIR dan membuang entri jurnalnya."""
+    try:
+        BACKUPS.wait(file_path)
+        if not os.path.exists(PROCESSED_DIR):
+            os.makedirs(PROCESSED_DIR)
+        dest_path = os.path.join(PROCESSED_DIR, os.path.basename(file_path))
+        shutil.move(file_path, dest_path)
+        if os.path.exists(sidecar_path(file_path)):
+            shutil.move(sidecar_path(file_path), sidecar_path(dest_path))
+        logging.info(f"File '{os.path.basename(file_path)}' SELESAI 100% dan dipindahkan ke '{PROCESSED_DIR}'.")
+        # Status sudah lengkap di file Excel, entri jurnal tidak diperlukan lagi
+        if journal is not None and fingerprint:
+            journal.forget(fingerprint)
+    except Exception as e:
+        logging.error(f"Gagal memindahkan file selesai: {e}")
+
+
+def generate_summary_report(all_stats, rate_summary=None, timeout_summary=None):
+    """Membuat dan menampilkan laporan ringkasan."""
+    if not all_stats:
+        return
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_filename = f"summary_report_{timestamp}.txt"
+    
+    lines = []
+    lines.append("=" * 60)
+    lines.append(f"RINGKASAN EKSEKUSI MATCHAIN GC - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append("=" * 60)
+    lines.append("")
+
+    total_all_files = 0
+    total_all_success = 0
+    total_all_failed = 0
+    total_all_skipped = 0
+
+    for stats in all_stats:
+        duration = stats['end_time'] - stats['start_time']
+        duration_str = str(duration).split('.')[0] # Remove microseconds
+
+        lines.append(f"FILE: {stats['filename']}")
+        lines.append(f"  - Total Data    : {stats['total']}")
+        lines.append(f"  - Berhasil      : {stats['success']}")
+        lines.append(f"  - Gagal         : {stats['failed']}")
+        if stats.get('transient_failed'):
+            lines.append(f"      (sementara: {stats['transient_failed']}, kirim ulang: python main.py retry)")
+        lines.append(f"  - Dilewati      : {stats['skipped']}")
+        lines.append(f"  - Durasi        : {duration_str}")
+        lines.append("-" * 40)
+
+        total_all_files += 1
+        total_all_success += stats['success']
+        total_all_failed += stats['failed']
+        total_all_skipped += stats['skipped']
+
+    lines.append("")
+    lines.append("=" * 60)
+    lines.append("TOTAL KESELURUHAN")
+    lines.append(f"  - Jumlah File   : {total_all_files}")
+    lines.append(f"  - Total Berhasil: {total_all_success}")
+    lines.append(f"  - Total Gagal   : {total_all_failed}")
+    lines.append(f"  - Total Dilewati: {total_all_skipped}")
+    if rate_summary:
+        lines.append(f"  - Laju Akhir    : {rate_summary['current_rate']:.2f} req/dtk")
+        lines.append(f"  - Laju Maks     : {rate_summary['peak_rate']:.2f} req/dtk")
+        lines.append(f"  - Rate Limit 429: {rate_summary['rate_limited']}x (total jeda {rate_summary['total_pause']:.0f} dtk)")
+    latency = POST_LATENCY.percentiles()
+    if latency[50] is not None:
+        lines.append(f"  - Latensi POST  : p50 {latency[50]:.2f} / p95 {latency[95]:.2f} / p99 {latency[99]:.2f} dtk")
+    throughput = ROWS_SUBMITTED.per_minute()
+    if throughput is not None:
+        lines.append(f"  - Throughput    : {throughput:.1f} baris/menit (kiriman pertama s.d. terakhir)")
+    if timeout_summary:
+        read = timeout_summary['read']
+        lines.append(f"  - Batas Timeout : connect {timeout_summary['connect']['deadline']:.1f} dtk, "
+                     f"read {read['deadline']:.1f} dtk ({read['timeouts'] + timeout_summary['connect']['timeouts']}x timeout)")
+    lines.append("=" * 60)
+
+    report_content = "\n".join(lines)
+
+    # Tampilkan di console
+    print("\n" + report_content + "\n")
+
+    # Simpan ke file
+    try:
+        with open(report_filename, "w") as f:
+            f.write(report_content)
+        logging.info(f"Laporan ringkasan disimpan di: {report_filename}")
+    except Exception as e:
+        logging.error(f"Gagal menyimpan laporan ringkasan: {e}")
+
+
+def validate_only(jobs=None, write_status=True):
+    """Perintah validate: cek semua file input tanpa aturan interaktif, login, maupun kirim."""
+    # Load bounding boxes sekaligus membangun cache .idx yang dibuka proses validasi
+    bbox_map = load_bounding_boxes()
+    input_files = get_input_files()
+    if not input_files:
+        logging.warning(f"Tidak ada file input ({', '.join(INPUT_EXTENSIONS)}) ditemukan di folder '{INPUT_DIR}'.")
+        return
+    ready = []
+    for file_path in input_files:
+        lock_file_path = os.path.join(os.path.dirname(file_path), "~$" + os.path.basename(file_path))
+        if os.path.exists(lock_file_path):
+            logging.warning(f"File '{os.path.basename(file_path)}' sedang dibuka, dilewati. Tutup file lalu jalankan ulang.")
+            continue
+        if write_status:
+            create_backup(file_path)
+        ready.append(file_path)
+    BACKUPS.wait()  # File ditulis proses validasi (di luar thread ini), jadi backup harus selesai dulu
+    if ready:
+        bbox_file = BOUNDING_BOX_FILE if bbox_map is not None else None
+        run_validate_only(ready, bbox_file, REGION_INDEX_FILE, DESA_GEOJSON_DIR, DESA_CACHE_SIZE, READ_CHUNK_SIZE,
+                          jobs, write_status)
+
+
+def remove_cached_sessions():
+    """Bersihkan sesi lama jika cache dimatikan."""
+    if USE_SESSION_CACHE:
+        return
+    for worker_id in range(1, SUBMIT_WORKERS + 1):
+        session_file = get_session_file(worker_id)
+        if os.path.exists(session_file):
+            try:
+                os.remove(session_file)
+                logging.info(f"Sesi lama '{session_file}' dihapus karena USE_SESSION_CACHE=false.")
+            except:
+                pass
+
+
+def main(profile=False, profile_cpu=False, profile_memory=False, retry_only=False):
+    """
+    Perintah run: login, validasi dan kirim semua file input. Dengan retry_only (perintah retry)
+    hanya baris berstatus gagal sementara yang dikirim ulang, dicari lewat cache input.
+    """
+    if profile or profile_cpu or profile_memory:
+        PROFILER.enable(cpu=profile_cpu, memory=profile_memory)
+    logging.info("Aplikasi dimulai.")
+
+    # Load bounding boxes
+    bbox_map = load_bounding_boxes()
+    polygon_index = load_desa_polygon_index(DESA_GEOJSON_DIR, DESA_CACHE_SIZE)
+
+    if not retry_only:
+        print_validation_rules()
+    remove_cached_sessions()
+
+    input_files = get_input_files()
+    if not input_files:
+        logging.warning(f"Tidak ada file input ({', '.join(INPUT_EXTENSIONS)}) ditemukan di folder '{INPUT_DIR}'.")
+        return
+
+    # Inisialisasi rantai submit (sesi, CSRF & gc_token per worker)
+    rate_controller = RateController(RATE_INITIAL, RATE_MIN, RATE_MAX)
+    timeouts = AdaptiveTimeout(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    workers = create_workers(rate_controller, timeouts)
+    if not workers:
+        logging.critical("Gagal mendapatkan sesi otentikasi. Proses dihentikan.")
+        return
+
+    metrics_exporter = MetricsExporter(METRICS, METRICS_FILE, METRICS_INTERVAL, METRICS_PORT)
+    metrics_exporter.start()
+    journal = StatusJournal(STATUS_JOURNAL_FILE)
+    input_cache = InputCache(INPUT_CACHE_FILE)
+    ledger = SubmissionLedger(LEDGER_FILE)
+    ledger.import_dir(LEDGER_IMPORT_DIR)
+    logging.info(f"Ledger berisi {len(ledger)} perusahaan_id yang sudah terkonfirmasi.")
+    context = validation_context(bbox_map, polygon_index)
+
+    # --- Cek apakah ada file yang sedang dibuka (sebelum pipeline mulai membaca) ---
+    for file_path in input_files:
+        lock_file_path = os.path.join(os.path.dirname(file_path), "~$" + os.path.basename(file_path))
+        while os.path.exists(lock_file_path):
+            print("\n" + "!" * 50)
+            print(f"PERINGATAN: File '{os.path.basename(file_path)}' terdeteksi sedang dibuka.")
+            print("Mohon TUTUP file Excel tersebut sebelum melanjutkan.")
+            print("!" * 50 + "\n")
+            print('\a') # Beep
+            input("Tekan ENTER jika sudah menutup file untuk melanjutkan...")
+            logging.info(f"Menunggu user menutup file: {file_path}")
+
+    # Proses semua file lewat pipeline (file yang selesai 100% otomatis dipindahkan ke PROCESSED_DIR)
+    all_files_stats = run_pipeline(input_files, workers, bbox_map, polygon_index, journal, input_cache, context, ledger,
+                                   retry_only)
+
+    for worker in workers:
+        worker.save_state()
+        worker.stop()
+    journal.close()
+    input_cache.close()
+    ledger.close()
+    metrics_exporter.stop()
+    generate_summary_report(all_files_stats, rate_controller.snapshot(), timeouts.snapshot())
+    BROWSER.close()
+    PROFILER.write_report(PROFILE_DIR)
+    logging.info("Semua proses selesai.")
@@ -0,0 +1,183 @@
+"""Pengelola sesi per rantai submit: cookie, CSRF token & gc_token, refresh single-flight dan keepalive."""
+import logging
+import threading
+import time
+
+from http_transport import RequestsTransport
+from metrics import METRICS
+
+REFRESHES = METRICS.counter('matchain_token_refresh_total', 'Refresh sesi per alasan & hasil')
+REFRESH_SECONDS = METRICS.histogram('matchain_token_refresh_seconds', 'Durasi refresh sesi per cara (detik)')
+
+
+def cookies_from_jar(cookie_jar):
+    """Mengubah cookie jar requests ke format list dict (sama seperti driver.get_cookies())."""
+    cookies = []
+    for cookie in cookie_jar:
+        item = {'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain,
+                'path': cookie.path, 'secure': bool(cookie.secure)}
+        if cookie.expires:
+            item['expiry'] = int(cookie.expires)
+        cookies.append(item)
+    return cookies
+
+
+def set_cookies(cookie_jar, cookies):
+    """Memasang cookie (format session.json) ke cookie jar; cookie kedaluwarsa dilewati."""
+    now = time.time()
+    for cookie in cookies:
+        expiry = cookie.get('expiry')
+        if expiry and expiry < now:
+            continue
+        cookie_jar.set(
+            cookie['name'], cookie['value'], domain=cookie.get('domain', ''),
+            path=cookie.get('path', '/'), expires=expiry, secure=cookie.get('secure', False),
+        )
+
+
+class SessionManager:
+    """
+    Memegang satu transport HTTP yang dipakai terus (connection pool tidak dibuang) beserta
+    CSRF token dan gc_token. Refresh bersifat single-flight: permintaan refresh yang datang
+    bersamaan digabung menjadi satu, dan cookie baru dipasang ke session yang sama.
+    Thread keepalive me-refresh sesi sebelum perkiraan kedaluwarsa (dari umur sesi yang teramati).
+    """
+
+    def __init__(self, name, probe_func, login_func, save_func=None, keepalive_interval=900.0, transport=None):
+        self.name = name
+        self.probe_func = probe_func  # session_data -> (session_data, gc_token) atau (None, None)
+        self.login_func = login_func  # () -> (session_data, gc_token) atau (None, None)
+        self.save_func = save_func    # session_data -> None
+        self.keepalive_interval = keepalive_interval
+
+        self.transport = transport if transport is not None else RequestsTransport()
+        self.csrf_token = None
+        self.gc_token = None
+        self.generation = 0
+        self.established_at = None   # waktu login terakhir (awal umur sesi)
+        self.refreshed_at = None     # waktu token/cookie terakhir diperbarui
+        self.lifetimes = []          # umur sesi yang teramati (login -> sesi tidak valid)
+        self.refresh_count = 0
+
+        self._state_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def apply(self, session_data, gc_token, fresh_login=False):
+        """Pasang cookie & token baru ke session yang sama (hot-swap, tanpa Session baru)."""
+        with self._state_lock:
+            new_cookies = session_data.get('cookies', [])
+            set_cookies(self.transport.cookies, new_cookies)
+            # Buang cookie lama yang tidak ada lagi di sesi baru
+            keep = {(c['name'], c.get('domain', ''), c.get('path', '/')) for c in new_cookies}
+            for cookie in list(self.transport.cookies):
+                if (cookie.name, cookie.domain, cookie.path) not in keep:
+                    self.transport.cookies.clear(cookie.domain, cookie.path, cookie.name)
+            self.csrf_token = session_data['csrf_token']
+            self.gc_token = gc_token
+            self.generation += 1
+            now = time.monotonic()
+            self.refreshed_at = now
+            if fresh_login or self.established_at is None:
+                self.established_at = now
+
+    def token(self):
+        """Mengembalikan (gc_token, csrf_token, generation) saat ini."""
+        with self._state_lock:
+            return self.gc_token, self.csrf_token, self.generation
+
+    def update_token(self, new_gc_token, generation):
+        """Simpan gc_token dari respons sukses, kecuali sesi sudah diganti di tengah request."""
+        with self._state_lock:
+            if generation == self.generation:
+                self.gc_token = new_gc_token
+
+    def snapshot(self):
+        """session_data saat ini (cookie jar lengkap, CSRF & gc_token)."""
+        with self._state_lock:
+            if not self.csrf_token:
+                return None
+            return {'cookies': cookies_from_jar(self.transport.cookies), 'csrf_token': self.csrf_token,
+                    'gc_token': self.gc_token}
+
+    def estimated_lifetime(self):
+        """Perkiraan umur sesi: umur terpendek yang pernah teramati (None jika belum pernah habis)."""
+        return min(self.lifetimes) if self.lifetimes else None
+
+    def refresh(self, generation=None, reason="token invalid", force_login=False):
+        """
+        Refresh single-flight. Jika generation diberikan dan sesi sudah diperbarui thread lain
+        sejak token itu diambil, langsung kembali True tanpa refresh lagi.
+        """
+        with self._refresh_lock:
+            if generation is not None and generation != self.generation:
+                logging.debug(f"[{self.name}] Sesi sudah diperbarui thread lain, refresh dilewati.")
+                REFRESHES.inc(reason=reason, result='digabung')
+                return True
+
+            started = time.monotonic()
+            logging.info(f"[{self.name}] Refresh sesi ({reason})...")
+            session_data, gc_token = (None, None)
+            if self.csrf_token and not force_login:
+                session_data, gc_token = self.probe_func(self.snapshot())
+            fresh_login = False
+            if not (session_data and gc_token):
+                if self.established_at is not None and not force_login:
+                    lifetime = started - self.established_at
+                    self.lifetimes.append(lifetime)
+                    logging.info(f"[{self.name}] Sesi habis setelah {lifetime / 60:.1f} menit, login ulang...")
+                session_data, gc_token = self.login_func()
+                fresh_login = True
+                if not (session_data and gc_token):
+                    REFRESHES.inc(reason=reason, result='gagal')
+                    REFRESH_SECONDS.observe(time.monotonic() - started, method='login')
+                    return False
+
+            self.apply(session_data, gc_token, fresh_login)
+            self.refresh_count += 1
+            if self.save_func:
+                self.save_func(self.snapshot())
+            duration = time.monotonic() - started
+            REFRESHES.inc(reason=reason, result='ok')
+            REFRESH_SECONDS.observe(duration, method='login' if fresh_login else 'probe')
+            logging.debug(f"[{self.name}] Refresh selesai dalam {duration:.2f} detik.")
+            return True
+
+    def start_keepalive(self):
+        """Jalankan thread keepalive (tidak dijalankan jika keepalive_interval <= 0)."""
+        if self.keepalive_interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._keepalive_loop, name=f"{self.name}-keepalive", daemon=True)
+        self._thread.start()
+
+    def _keepalive_loop(self):
+        """
+        Probe berkala (keepalive_interval) agar sesi tidak idle, dan login ulang proaktif
+        saat umur sesi mendekati umur terpendek yang pernah teramati.
+        """
+        while True:
+            now = time.monotonic()
+            lifetime = self.estimated_lifetime()
+            next_probe = (self.refreshed_at or now) + self.keepalive_interval
+            next_login = float('inf')
+            if lifetime is not None and self.established_at is not None:
+                next_login = self.established_at + 0.8 * lifetime
+            if self._stop.wait(max(5.0, min(next_probe, next_login) - now)):
+                return
+
+            now = time.monotonic()
+            try:
+                if now >= next_login:
+                    self.refresh(self.generation, reason="sesi hampir habis", force_login=True)
+                elif now >= (self.refreshed_at or now) + self.keepalive_interval:
+                    self.refresh(self.generation, reason="keepalive")
+            except Exception as e:
+                logging.warning(f"[{self.name}] Keepalive gagal: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.transport.close()
@@ -0,0 +1,141 @@
+"""
+Konfigurasi aplikasi: nilai dari environment (.env) dan lokasi file kerja.
+
+Import modul ini tidak membaca .env; CLI memanggil load() sekali sebelum modul yang memakai
+konfigurasi (runner, dst) diimport, sehingga nilai yang diimport modul tersebut sudah final.
+"""
+import os
+
+# --- LOKASI FILE & FOLDER ---
+SESSION_FILE = 'session.json'
+INPUT_DIR = 'input'
+BACKUP_DIR = 'backup'
+PROCESSED_DIR = 'processed'
+BOUNDING_BOX_FILE = 'bounding_boxes.json'
+REGION_INDEX_FILE = 'bounding_boxes.idx'
+CHROME_PROFILE_DIR = 'chrome_profile'
+DRIVER_PATH_CACHE = '.chromedriver_path'
+STATUS_JOURNAL_FILE = 'status_journal.sqlite'
+INPUT_CACHE_FILE = os.path.join('cache', 'input_cache.sqlite')
+LEDGER_FILE = 'submission_ledger.sqlite'
+LEDGER_IMPORT_DIR = 'ledger_import'
+PROFILE_DIR = 'profile'
+LOG_FILE = 'app.log'
+# Format file input yang diproses (lihat table_io) dan akhiran file status sidecar (STATUS_SIDECAR=true)
+INPUT_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.parquet', '.jsonl')
+STATUS_SIDECAR_SUFFIX = '.status.tsv'
+# Variabel environment yang nilainya tidak bisa dibaca (diisi ulang setiap _read_env)
+ENV_ERRORS = []
+
+
+class ConfigError(ValueError):
+    """Konfigurasi dari environment / .env tidak valid."""
+
+
+def _number(name, default, convert):
+    """Angka dari environment; kosong = default. Nilai tidak valid dicatat di ENV_ERRORS dan diganti default."""
+    value = os.getenv(name, "").strip()
+    if not value:
+        return convert(default)
+    try:
+        return convert(value)
+    except ValueError:
+        kind = "bilangan bulat" if convert is int else "angka"
+        ENV_ERRORS.append(f"{name}={value!r} bukan {kind}")
+        return convert(default)
+
+
+def _read_env():
+    global USERNAME, PASSWORD, OTP_SECRET, USE_SESSION_CACHE, HEADLESS_MODE, LOGIN_BACKEND, SUBMIT_WORKERS
+    global RATE_INITIAL, RATE_MIN, RATE_MAX, HTTP_BACKEND, HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT
+    global SESSION_KEEPALIVE, DESA_GEOJSON_DIR, DESA_CACHE_SIZE, CHECKPOINT_INTERVAL, READ_CHUNK_SIZE
+    global VALIDATE_WORKERS, PIPELINE_QUEUE_SIZE, METRICS_FILE, METRICS_INTERVAL, METRICS_PORT
+    global DAEMON_POLL_INTERVAL, DAEMON_SETTLE_SECONDS, DAEMON_RETRY_INTERVAL, DAEMON_API_PORT
+    global RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, STATUS_SIDECAR
+    global BACKUP_KEEP, BACKUP_MAX_DAYS, BACKUP_COMPRESS
+    global LOG_FORMAT, LOG_ASYNC, LOG_CONSOLE_ROWS, LOG_PROGRESS_INTERVAL, LOG_BODY_MAX, LOG_BODY_SAMPLE
+
+    ENV_ERRORS.clear()
+    USERNAME = os.getenv("BPS_USERNAME")
+    PASSWORD = os.getenv("BPS_PASSWORD")
+    OTP_SECRET = os.getenv("BPS_OTP_SECRET")
+    # Default True jika tidak ada setting
+    USE_SESSION_CACHE = os.getenv("USE_SESSION_CACHE", "true").lower() == "true"
+    HEADLESS_MODE = os.getenv("HEADLESS", "true").lower() == "true"
+    # Cara login: 'http' (tanpa browser, cadangan Selenium) atau 'selenium'
+    LOGIN_BACKEND = os.getenv("LOGIN_BACKEND", "http").lower()
+    # Jumlah rantai submit paralel (masing-masing punya sesi, CSRF & gc_token sendiri)
+    SUBMIT_WORKERS = max(1, _number("SUBMIT_WORKERS", "1", int))
+    # Pengatur laju kirim adaptif (total req/dtk untuk semua worker)
+    RATE_INITIAL = _number("RATE_INITIAL", "0.5", float)
+    RATE_MIN = _number("RATE_MIN", "0.05", float)
+    RATE_MAX = _number("RATE_MAX", "5", float)
+    # Transport HTTP untuk submit: 'requests' (default) atau 'httpx' (async, HTTP/2 jika paket h2 terpasang)
+    HTTP_BACKEND = os.getenv("HTTP_BACKEND", "requests").lower()
+    HTTP_POOL_SIZE = max(1, _number("HTTP_POOL_SIZE", "2", int))
+    # Batas atas timeout (detik); batas sebenarnya menyesuaikan persentil latensi yang teramati
+    HTTP_CONNECT_TIMEOUT = _number("HTTP_CONNECT_TIMEOUT", "10", float)
+    HTTP_READ_TIMEOUT = _number("HTTP_READ_TIMEOUT", "30", float)
+    # Baris gagal sementara (timeout, HTTP 5xx, koneksi) dikirim ulang lewat antrian tunda: jumlah percobaan
+    # total per baris dan jeda awal/maksimum (detik, berlipat dua tiap percobaan + jitter)
+    RETRY_MAX_ATTEMPTS = max(1, _number("RETRY_MAX_ATTEMPTS", "4", int))
+    RETRY_BASE_DELAY = max(0.0, _number("RETRY_BASE_DELAY", "5", float))
+    RETRY_MAX_DELAY = max(0.0, _number("RETRY_MAX_DELAY", "300", float))
+    # Interval keepalive sesi di background (detik, 0 = nonaktif)
+    SESSION_KEEPALIVE = _number("SESSION_KEEPALIVE", "900", float)
+    # Folder berisi final_desa_2024*.geojson untuk validasi poligon desa (kosong = nonaktif)
+    DESA_GEOJSON_DIR = os.getenv("DESA_GEOJSON_DIR", "")
+    DESA_CACHE_SIZE = _number("DESA_CACHE_SIZE", "8", int)
+    # Interval (detik) penggabungan status dari jurnal ke file Excel; 0 = hanya di akhir file
+    CHECKPOINT_INTERVAL = _number("CHECKPOINT_INTERVAL", "300", float)
+    # Jumlah baris yang dibaca & divalidasi sekaligus dari file input (membatasi pemakaian memori)
+    READ_CHUNK_SIZE = max(1, _number("READ_CHUNK_SIZE", "5000", int))
+    # true = status_upload ditulis ke file sidecar <file>.status.tsv, file input tidak pernah diubah
+    STATUS_SIDECAR = os.getenv("STATUS_SIDECAR", "false").lower() == "true"
+    # Backup file input: jumlah snapshot per nama file & umur maksimum (hari), 0 = tanpa batas;
+    # BACKUP_COMPRESS=true menyimpan snapshot CSV/JSONL/XLS dengan gzip
+    BACKUP_KEEP = max(0, _number("BACKUP_KEEP", "10", int))
+    BACKUP_MAX_DAYS = max(0.0, _number("BACKUP_MAX_DAYS", "0", float))
+    BACKUP_COMPRESS = os.getenv("BACKUP_COMPRESS", "false").lower() == "true"
+    # Jumlah thread validasi & jumlah chunk yang boleh menunggu di antara tahap pipeline
+    VALIDATE_WORKERS = max(1, _number("VALIDATE_WORKERS", "1", int))
+    PIPELINE_QUEUE_SIZE = max(1, _number("PIPELINE_QUEUE_SIZE", "4", int))
+    # Ekspor metrik: file JSON (+ .prom di sebelahnya) tiap METRICS_INTERVAL detik, endpoint lokal jika METRICS_PORT > 0
+    METRICS_FILE = os.getenv("METRICS_FILE", "metrics.json")
+    METRICS_INTERVAL = _number("METRICS_INTERVAL", "15", float)
+    METRICS_PORT = _number("METRICS_PORT", "0", int)
+    # Mode daemon: interval scan folder input (jika watchdog tidak terpasang), lama file harus tidak berubah
+    # sebelum diproses, jeda awal kirim ulang file yang masih punya baris gagal kirim, port API job lokal
+    DAEMON_POLL_INTERVAL = max(0.5, _number("DAEMON_POLL_INTERVAL", "5", float))
+    DAEMON_SETTLE_SECONDS = max(0.0, _number("DAEMON_SETTLE_SECONDS", "3", float))
+    DAEMON_RETRY_INTERVAL = max(1.0, _number("DAEMON_RETRY_INTERVAL", "600", float))
+    DAEMON_API_PORT = _number("DAEMON_API_PORT", "0", int)
+    # Log: format app.log ('text' atau 'json' = JSON lines), tulis app.log di thread terpisah,
+    # tampilkan log per baris di console (false = ringkasan progres tiap LOG_PROGRESS_INTERVAL detik)
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+    LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    LOG_CONSOLE_ROWS = os.getenv("LOG_CONSOLE_ROWS", "false").lower() == "true"
+    LOG_PROGRESS_INTERVAL = _number("LOG_PROGRESS_INTERVAL", "10", float)
+    # Isi respons server di log DEBUG: maks. karakter (0 = utuh) dan fraksi respons yang ditulis (0 - 1)
+    LOG_BODY_MAX = _number("LOG_BODY_MAX", "500", int)
+    LOG_BODY_SAMPLE = min(1.0, max(0.0, _number("LOG_BODY_SAMPLE", "1", float)))
+
+
+def load(env_file=None):
+    """
+    Membaca .env (variabel yang sudah ada di environment tidak ditimpa) lalu mengisi ulang konfigurasi.
+    ConfigError jika ada angka yang tidak valid (pesannya menyebut variabel yang salah).
+    """
+    from dotenv import load_dotenv
+    load_dotenv(env_file)
+    _read_env()
+    if ENV_ERRORS:
+        raise ConfigError("Konfigurasi tidak valid: " + "; ".join(ENV_ERRORS))
+
+
+def has_credentials():
+    return bool(USERNAME and PASSWORD)
+
+
+# Nilai awal dari environment proses saja (tanpa .env); tidak pernah gagal, error dilaporkan oleh load()
+_read_env()
@@ -0,0 +1,127 @@
+"""Jurnal status upload (SQLite, append-only) agar progres tidak hilang saat proses terhenti."""
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+STATUS_COLUMN = 'status_upload'
+LEDGER_STATUS = 'sudah dikirim sebelumnya (ledger)'
+# Gagal karena jaringan/server (bukan isi data): baris dikirim ulang otomatis dan lewat perintah retry
+TRANSIENT_PREFIXES = ('gagal - Timeout', 'gagal - HTTP 5', 'gagal - Error:', 'gagal - Refresh token error')
+
+
+def row_keys(df, seen=None):
+    """
+    Identitas baris: hash isi kolom data (tanpa status_upload) + urutan kemunculan,
+    sehingga baris kembar tetap punya kunci berbeda. `seen` (dict hash -> jumlah) dipakai
+    bersama antar chunk agar urutan kemunculan dihitung untuk seluruh file.
+    """
+    if seen is None:
+        seen = {}
+    data = df.drop(columns=[STATUS_COLUMN], errors='ignore')
+    hashes = pd.util.hash_pandas_object(data.astype(str), index=False).to_numpy()
+    keys = np.empty(len(hashes), dtype=object)
+    for i, row_hash in enumerate(hashes.tolist()):
+        occurrence = seen.get(row_hash, 0)
+        seen[row_hash] = occurrence + 1
+        keys[i] = f"{row_hash:016x}-{occurrence}"
+    return keys
+
+
+def file_fingerprint(file_path, columns):
+    """
+    Identitas file untuk jurnal: nama file + kolom data (tanpa status_upload). Tidak bergantung
+    pada isi baris, jadi bisa dihitung dari header saja; baris yang diedit otomatis punya
+    row_key baru sehingga diproses ulang.
+    """
+    digest = hashlib.sha256()
+    digest.update(os.path.basename(file_path).encode('utf-8'))
+    digest.update(b'\0')
+    digest.update('\x1f'.join(c for c in columns if c != STATUS_COLUMN).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def merge_statuses(status, keys, statuses):
+    """
+    Menggabungkan status dari jurnal ({row_key: status}) ke Series status (diubah di tempat).
+    Mengembalikan Series status yang berubah (index = posisi baris).
+    """
+    if not statuses:
+        return status.iloc[:0]
+    journal_status = pd.Series(keys, index=status.index).map(statuses)
+    changed = journal_status.notna() & (journal_status != status)
+    status.loc[changed] = journal_status[changed]
+    return journal_status[changed]
+
+
+def confirmed_mask(status_values):
+    """Status dari server yang berarti perusahaan_id sudah terkonfirmasi (masuk ledger)."""
+    status_lower = status_values.astype(str).str.lower()
+    return ((status_lower == 'berhasil') | status_lower.str.contains('sudah diground check oleh user lain', regex=False)).to_numpy()
+
+
+def is_transient(status):
+    """Status gagal sementara (timeout, HTTP 5xx, koneksi/refresh sesi gagal)."""
+    return str(status).startswith(TRANSIENT_PREFIXES)
+
+
+def done_mask(status_values):
+    """Baris yang sudah selesai: terkonfirmasi, atau dilewati karena ID-nya sudah ada di ledger."""
+    return confirmed_mask(status_values) | (status_values.astype(str) == LEDGER_STATUS).to_numpy()
+
+
+class StatusJournal:
+    """
+    Setiap hasil submit ditulis sebagai satu entri baru (tidak pernah di-update) dan di-commit
+    langsung, jadi status tetap aman walau proses mati mendadak. Status terakhir per baris
+    dibaca lewat indeks (fingerprint, row_key).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " fingerprint TEXT NOT NULL,"
+            " row_key TEXT NOT NULL,"
+            " position INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_row ON entries (fingerprint, row_key, id)")
+        self.conn.commit()
+
+    def record(self, fingerprint, row_key, position, status):
+        """Menambahkan satu entri status dan langsung commit (durable)."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO entries (fingerprint, row_key, position, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (fingerprint, row_key, int(position), status, time.time()),
+            )
+
+    def latest(self, fingerprint):
+        """Status terakhir per baris untuk satu file: dict {row_key: status}."""
+        rows = self.conn.execute(
+            "SELECT row_key, status FROM entries WHERE id IN"
+            " (SELECT MAX(id) FROM entries WHERE fingerprint = ? GROUP BY row_key)",
+            (fingerprint,),
+        )
+        return dict(rows.fetchall())
+
+    def forget(self, fingerprint):
+        """Menghapus entri satu file (dipanggil setelah file selesai & dipindahkan)."""
+        with self.conn:
+            self.conn.execute("DELETE FROM entries WHERE fingerprint = ?", (fingerprint,))
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception as e:
+            logging.debug(f"Gagal menutup jurnal status: {e}")
@@ -0,0 +1,145 @@
+"""
+Logging untuk jalur per baris: penulisan file lewat antrian (thread penulis di background),
+format JSON lines, filter log per baris di console, ringkasan progres berkala dan pemotongan
+isi respons server.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+import settings
+
+# Event per baris: tetap ditulis ke app.log, di console diganti ringkasan progres berkala
+ROW_EVENTS = frozenset(('kirim_baris', 'hasil_baris', 'baris_invalid', 'respons_server'))
+# Atribut bawaan LogRecord; atribut lain berasal dari extra={...} dan ikut ditulis di JSON
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu objek JSON per baris: ts, level, thread, msg, field extra, dan exc jika ada."""
+
+    def format(self, record):
+        entry = {'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+                 'level': record.levelname, 'thread': record.threadName, 'msg': record.getMessage()}
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Record dikirim apa adanya: pesan baru diformat di thread penulis, bukan di thread pemanggil."""
+
+    def prepare(self, record):
+        return record
+
+
+def start_async(*handlers):
+    """
+    Jalankan handler di thread penulis (QueueListener). Mengembalikan handler antrian untuk
+    dipasang di logger; record yang masih antri ditulis saat stop_async() / proses keluar.
+    """
+    global _listener
+    stop_async()
+    log_queue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _DeferredQueueHandler(log_queue)
+
+
+def stop_async():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_async)
+
+
+def drop_row_events(record):
+    """Filter console: buang log per baris (diganti ProgressReporter)."""
+    return getattr(record, 'event', None) not in ROW_EVENTS
+
+
+class RowLabel:
+    """Label baris untuk log ('[file] Baris 12/500 (2.40%)'), baru diformat saat benar-benar ditulis."""
+
+    __slots__ = ('name', 'number', 'total')
+
+    def __init__(self, name, number, total):
+        self.name = name
+        self.number = number
+        self.total = total
+
+    def __str__(self):
+        return f"[{self.name}] Baris {self.number}/{self.total} ({self.number / self.total * 100:.2f}%)"
+
+
+def log_body(label, response):
+    """
+    DEBUG isi respons server, disampel (LOG_BODY_SAMPLE) dan dipotong (LOG_BODY_MAX karakter).
+    Body baru dibaca jika memang akan ditulis.
+    """
+    sample = settings.LOG_BODY_SAMPLE
+    if sample <= 0 or not logging.getLogger().isEnabledFor(logging.DEBUG):
+        return
+    if sample < 1 and random.random() >= sample:
+        return
+    text = getattr(response, 'text', '') or ''
+    limit = settings.LOG_BODY_MAX
+    if 0 < limit < len(text):
+        text = f"{text[:limit]}... (+{len(text) - limit} karakter)"
+    logging.debug("%s: %s", label, text, extra={'event': 'isi_respons'})
+
+
+def _format_eta(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
+
+class ProgressReporter:
+    """
+    Ringkasan progres tiap `interval` detik: jumlah baris terkirim, laju (baris/dtk) sejak
+    ringkasan sebelumnya, sisa baris dan perkiraan waktu selesai. Tidak menulis apa pun jika
+    tidak ada perubahan sejak ringkasan terakhir.
+    """
+
+    def __init__(self, interval, sent_func):
+        self.interval = interval
+        self.sent_func = sent_func
+        self._started = time.monotonic()
+        self._last_time = self._started
+        self._last_sent = sent_func()
+        self._first_sent = self._last_sent
+        self._last_remaining = None
+
+    def tick(self, remaining_func):
+        """Dipanggil sering dari loop koordinator; hanya menghitung saat interval sudah lewat."""
+        now = time.monotonic()
+        if self.interval <= 0 or now - self._last_time < self.interval:
+            return
+        sent = self.sent_func()
+        remaining = remaining_func()
+        if sent == self._last_sent and remaining == self._last_remaining:
+            self._last_time = now
+            return
+        rate = (sent - self._last_sent) / (now - self._last_time)
+        eta = _format_eta(remaining / rate) if rate > 0 else "-"
+        logging.info("Progres: %d baris terkirim, %.1f baris/dtk, sisa ~%d baris, perkiraan selesai %s",
+                     sent - self._first_sent, rate, remaining, eta,
+                     extra={'event': 'progres', 'terkirim': sent - self._first_sent, 'baris_per_detik': round(rate, 2),
+                            'sisa': remaining, 'eta_detik': round(remaining / rate) if rate > 0 else None})
+        self._last_time = now
+        self._last_sent = sent
+        self._last_remaining = remaining
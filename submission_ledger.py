@@ -0,0 +1,104 @@
+"""Ledger global perusahaan_id yang sudah terkonfirmasi, agar tidak dikirim ulang lintas file & run."""
+import glob
+import logging
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+IMPORT_EXTENSIONS = ('.txt', '.csv', '.xlsx')
+
+
+class SubmissionLedger:
+    """
+    Tabel SQLite (perusahaan_id unik) ditambah indeks di memori untuk cek keanggotaan per chunk.
+    ID yang dimuat saat start disimpan dalam pd.Index (hash table dibangun sekali), ID baru
+    selama run ditampung di set kecil.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS confirmed ("
+            " perusahaan_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " source TEXT NOT NULL,"
+            " recorded_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+        ids = [row[0] for row in self.conn.execute("SELECT perusahaan_id FROM confirmed")]
+        self._index = pd.Index(ids, dtype=object)
+        self._recent = set()
+
+    def __len__(self):
+        return len(self._index) + len(self._recent)
+
+    def contains(self, ids):
+        """Mask boolean: ID mana yang sudah ada di ledger."""
+        ids = np.asarray(ids, dtype=object)
+        mask = self._index.get_indexer(ids) >= 0
+        if self._recent:
+            mask |= np.fromiter((i in self._recent for i in ids), dtype=bool, count=len(ids))
+        return mask
+
+    def add(self, ids, status, source):
+        """Menambahkan ID terkonfirmasi (ID yang sudah ada dibiarkan). Mengembalikan jumlah ID baru."""
+        ids = [i for i in dict.fromkeys(ids) if i]
+        if not ids:
+            return 0
+        new_ids = [i for i, known in zip(ids, self.contains(ids)) if not known]
+        if not new_ids:
+            return 0
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO confirmed (perusahaan_id, status, source, recorded_at) VALUES (?, ?, ?, ?)",
+                [(i, status, source, now) for i in new_ids],
+            )
+        self._recent.update(new_ids)
+        return len(new_ids)
+
+    def import_dir(self, directory):
+        """
+        Impor daftar ID dari folder: .txt/.csv (satu ID per baris, atau kolom perusahaan_id)
+        dan .xlsx (kolom perusahaan_id). File yang sudah diimpor diberi akhiran '.imported'.
+        """
+        if not directory or not os.path.isdir(directory):
+            return 0
+        total = 0
+        for path in sorted(glob.glob(os.path.join(directory, "*"))):
+            if not path.lower().endswith(IMPORT_EXTENSIONS) or os.path.basename(path).startswith("~$"):
+                continue
+            try:
+                ids = _read_id_file(path)
+                added = self.add(ids, "impor", os.path.basename(path))
+                os.replace(path, path + ".imported")
+                logging.info(f"Ledger: {added} ID baru diimpor dari '{os.path.basename(path)}' ({len(ids)} ID di file).")
+                total += added
+            except Exception as e:
+                logging.error(f"Gagal mengimpor ledger dari '{path}': {e}")
+        return total
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception as e:
+            logging.debug(f"Gagal menutup ledger: {e}")
+
+
+def _read_id_file(path):
+    if path.lower().endswith('.xlsx'):
+        values = pd.read_excel(path, dtype=str)['perusahaan_id']
+    else:
+        df = pd.read_csv(path, dtype=str, header=None)
+        first_row = df.iloc[0].astype(str).str.strip().tolist() if len(df) else []
+        if 'perusahaan_id' in first_row:
+            values = df.iloc[1:, first_row.index('perusahaan_id')]
+        else:
+            values = df.iloc[:, 0]
+    values = values.dropna().astype(str).str.strip()
+    return values[values != ''].tolist()
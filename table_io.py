@@ -0,0 +1,369 @@
+"""
+Baca & tulis file input per format: Excel (lewat excel_stream), CSV, Parquet dan JSONL.
+
+Semua format memakai kontrak yang sama dengan excel_stream: read_header() -> (kolom, perkiraan
+jumlah baris), iter_chunks() -> DataFrame string per chunk dengan index = posisi baris data dan
+kolom status_upload, write_statuses() -> menulis {posisi: status} kembali ke format yang sama
+(atau ke file sidecar jika STATUS_SIDECAR=true, sehingga file input tidak pernah diubah).
+"""
+import csv
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+import excel_stream
+import settings
+from excel_stream import STATUS_COLUMN, cell_to_str, header_names, make_chunk
+
+try:
+    import pyarrow as pa  # Opsional, hanya untuk file .parquet
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+# Jumlah baris per blok saat menulis ulang file (lebih besar dari chunk baca: penulisan tidak menahan validasi)
+WRITE_CHUNK_SIZE = 100_000
+CSV_DELIMITERS = (',', ';', '\t', '|')
+
+
+def _tmp_path(path):
+    return os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+
+
+def _replace_atomically(path, write):
+    """Tulis ke file sementara di folder yang sama lalu ganti file asli (file asli utuh jika gagal)."""
+    tmp_path = _tmp_path(path)
+    try:
+        write(tmp_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+
+def _count_lines(path):
+    """Perkiraan cepat jumlah baris (jumlah newline, baca biner per 1 MB)."""
+    count = 0
+    last = b''
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            count += block.count(b'\n')
+            last = block
+    return count + (1 if last and not last.endswith(b'\n') else 0)
+
+
+def _sorted_statuses(statuses):
+    """{posisi: status} -> (array posisi terurut, array status) untuk dipotong per blok dengan searchsorted."""
+    positions = np.fromiter(statuses.keys(), dtype=np.int64, count=len(statuses))
+    values = np.array(list(statuses.values()), dtype=object)
+    order = np.argsort(positions, kind='stable')
+    return positions[order], values[order]
+
+
+def _statuses_between(positions, values, start, end):
+    lo, hi = np.searchsorted(positions, [start, end])
+    return positions[lo:hi], values[lo:hi]
+
+
+# --- CSV ---
+
+def _csv_dialect(path):
+    """(delimiter, encoding, akhir baris) dari baris header: delimiter yang paling sering muncul."""
+    with open(path, 'rb') as f:
+        first = f.readline()
+    encoding = 'utf-8-sig' if first.startswith(b'\xef\xbb\xbf') else 'utf-8'
+    text = first.decode('utf-8-sig', errors='replace')
+    delimiter = max(CSV_DELIMITERS, key=text.count) if any(d in text for d in CSV_DELIMITERS) else ','
+    return delimiter, encoding, '\r\n' if first.endswith(b'\r\n') else '\n'
+
+
+def _csv_raw_header(path, delimiter, encoding):
+    with open(path, 'r', newline='', encoding=encoding) as f:
+        return next(csv.reader(f, delimiter=delimiter), [])
+
+
+def _csv_reader(path, header, delimiter, encoding, chunk_size):
+    # Semua kolom string apa adanya (tanpa konversi NaN). usecols: kolom lebih dari header (mis. delimiter
+    # di akhir baris) diabaikan, bukan ParserError; kolom kurang diisi ''
+    return pd.read_csv(path, sep=delimiter, encoding=encoding, header=None, skiprows=1, names=header,
+                       usecols=range(len(header)), index_col=False, dtype=str, na_filter=False,
+                       chunksize=chunk_size)
+
+
+def _csv_read_header(path):
+    delimiter, encoding, _ = _csv_dialect(path)
+    return header_names(_csv_raw_header(path, delimiter, encoding)), max(0, _count_lines(path) - 1)
+
+
+def _csv_iter_chunks(path, chunk_size):
+    delimiter, encoding, _ = _csv_dialect(path)
+    header = header_names(_csv_raw_header(path, delimiter, encoding))
+    start = 0
+    with _csv_reader(path, header, delimiter, encoding, chunk_size) as reader:
+        for chunk in reader:
+            chunk = chunk.fillna('').set_axis(pd.RangeIndex(start, start + len(chunk)))
+            if STATUS_COLUMN not in chunk.columns:
+                chunk[STATUS_COLUMN] = ''
+            start += len(chunk)
+            yield chunk
+
+
+def _csv_write_statuses(path, statuses):
+    delimiter, encoding, line_end = _csv_dialect(path)
+    raw_header = _csv_raw_header(path, delimiter, encoding)
+    header = header_names(raw_header)
+    width = len(raw_header)
+    if STATUS_COLUMN in header:
+        status_idx = header.index(STATUS_COLUMN)
+    else:
+        status_idx = width
+        raw_header.append(STATUS_COLUMN)
+
+    def write(tmp_path):
+        # Per baris lewat modul csv (bukan DataFrame) agar baris yang kolomnya lebih/kurang dari header
+        # ditulis ulang tanpa kehilangan isi: kolom kurang diisi '', kolom lebih tetap disimpan setelah status
+        with open(path, 'r', newline='', encoding=encoding) as src, \
+                open(tmp_path, 'w', newline='', encoding=encoding) as out:
+            reader = csv.reader(src, delimiter=delimiter)
+            writer = csv.writer(out, delimiter=delimiter, lineterminator=line_end)
+            next(reader, None)
+            writer.writerow(raw_header)
+            pos = 0
+            for row in reader:
+                if not row:
+                    continue  # Baris kosong dilewati (tidak dihitung), sama seperti saat membaca
+                extra = row[width:]
+                while extra and not extra[-1]:
+                    extra.pop()  # Kolom kosong karena delimiter di akhir baris bukan data
+                row = row[:width] + [''] * (width - len(row))
+                if status_idx == width:
+                    row.append('')
+                row[status_idx] = statuses.get(pos, row[status_idx])
+                writer.writerow(row + extra)
+                pos += 1
+
+    _replace_atomically(path, write)
+
+
+# --- Parquet ---
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError("File .parquet butuh paket pyarrow (pip install pyarrow).")
+
+
+def _arrow_to_strings(column):
+    """Kolom Arrow -> array string numpy (null = ''), vektorisasi; tipe bersarang lewat cell_to_str."""
+    try:
+        column = pc.fill_null(pc.cast(column, pa.string()), '')
+        return column.to_numpy(zero_copy_only=False).astype(object)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return np.array([cell_to_str(value) for value in column.to_pylist()], dtype=object)
+
+
+def _parquet_read_header(path):
+    _require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    return header_names(parquet_file.schema_arrow.names), parquet_file.metadata.num_rows
+
+
+def _parquet_iter_chunks(path, chunk_size):
+    _require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    header = header_names(parquet_file.schema_arrow.names)
+    start = 0
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        data = {name: _arrow_to_strings(column) for name, column in zip(header, batch.columns)}
+        chunk = pd.DataFrame(data, index=pd.RangeIndex(start, start + batch.num_rows), dtype=object)
+        if STATUS_COLUMN not in chunk.columns:
+            chunk[STATUS_COLUMN] = ''
+        start += batch.num_rows
+        yield chunk
+
+
+def _parquet_write_statuses(path, statuses):
+    _require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    names = parquet_file.schema_arrow.names
+    header = header_names(names)
+    status_idx = header.index(STATUS_COLUMN) if STATUS_COLUMN in header else None
+    positions, values = _sorted_statuses(statuses)
+
+    def write(tmp_path):
+        writer = None
+        start = 0
+        try:
+            for batch in parquet_file.iter_batches(batch_size=WRITE_CHUNK_SIZE):
+                columns = list(batch.columns)
+                status = _arrow_to_strings(columns[status_idx]) if status_idx is not None \
+                    else np.full(batch.num_rows, '', dtype=object)
+                pos, new_status = _statuses_between(positions, values, start, start + batch.num_rows)
+                status[pos - start] = new_status
+                if status_idx is None:
+                    columns.append(pa.array(status, pa.string()))
+                else:
+                    columns[status_idx] = pa.array(status, pa.string())
+                table = pa.Table.from_arrays(columns, names=names if status_idx is not None else names + [STATUS_COLUMN])
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+                start += batch.num_rows
+            if writer is None:  # File tanpa baris data: cukup skema + kolom status
+                schema = parquet_file.schema_arrow
+                if status_idx is None:
+                    schema = schema.append(pa.field(STATUS_COLUMN, pa.string()))
+                writer = pq.ParquetWriter(tmp_path, schema)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    _replace_atomically(path, write)
+
+
+# --- JSONL (satu objek JSON per baris) ---
+
+def _jsonl_records(f):
+    """(teks baris, objek) untuk setiap baris tidak kosong."""
+    for line in f:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("Setiap baris JSONL harus berupa objek JSON")
+        yield line, record
+
+
+def _jsonl_raw_header(path):
+    """Kunci objek pertama (urutan asli) menjadi kolom; kunci tambahan di baris lain tetap disimpan saat menulis."""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for _, record in _jsonl_records(f):
+            return list(record.keys())
+    return []
+
+
+def _jsonl_read_header(path):
+    return header_names(_jsonl_raw_header(path)), _count_lines(path)
+
+
+def _jsonl_iter_chunks(path, chunk_size):
+    keys = _jsonl_raw_header(path)
+    if STATUS_COLUMN not in keys:
+        keys.append(STATUS_COLUMN)  # Status hanya ada di objek yang pernah ditulis
+    header = header_names(keys)
+    buffer = []
+    start = 0
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for _, record in _jsonl_records(f):
+            buffer.append([cell_to_str(record.get(key)) for key in keys])
+            if len(buffer) >= chunk_size:
+                yield make_chunk(buffer, header, start)
+                start += len(buffer)
+                buffer = []
+    if buffer:
+        yield make_chunk(buffer, header, start)
+
+
+def _jsonl_write_statuses(path, statuses):
+    def write(tmp_path):
+        with open(path, 'r', encoding='utf-8-sig') as src, open(tmp_path, 'w', encoding='utf-8') as out:
+            pos = 0
+            for line in src:
+                if line.strip():
+                    # Hanya baris yang statusnya berubah yang diserialisasi ulang; sisanya disalin apa adanya
+                    if pos in statuses:
+                        record = json.loads(line)
+                        record[STATUS_COLUMN] = statuses[pos]
+                        line = json.dumps(record, ensure_ascii=False) + '\n'
+                    pos += 1
+                out.write(line)
+
+    _replace_atomically(path, write)
+
+
+# --- Sidecar status ---
+
+def sidecar_path(path):
+    return path + settings.STATUS_SIDECAR_SUFFIX
+
+
+def read_sidecar(path):
+    """Status dari file sidecar sebagai {posisi: status} (kosong jika belum ada)."""
+    sidecar = sidecar_path(path)
+    if not os.path.exists(sidecar):
+        return {}
+    with open(sidecar, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f, delimiter='\t')
+        next(reader, None)
+        return {int(row[0]): row[1] for row in reader if len(row) >= 2}
+
+
+def _write_sidecar(path, statuses):
+    merged = read_sidecar(path)
+    merged.update(statuses)
+
+    def write(tmp_path):
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, delimiter='\t', lineterminator='\n')
+            writer.writerow(['posisi', STATUS_COLUMN])
+            writer.writerows(sorted(merged.items()))
+
+    _replace_atomically(sidecar_path(path), write)
+
+
+def _apply_sidecar(path, chunks):
+    positions, values = _sorted_statuses(read_sidecar(path))
+    for chunk in chunks:
+        start = int(chunk.index[0]) if len(chunk) else 0
+        pos, status = _statuses_between(positions, values, start, start + len(chunk))
+        if len(pos):
+            chunk.iloc[pos - start, chunk.columns.get_loc(STATUS_COLUMN)] = status
+        yield chunk
+
+
+# --- Dispatch per ekstensi ---
+
+_FORMATS = {
+    '.xlsx': (excel_stream.read_header, excel_stream.iter_chunks, excel_stream.write_statuses),
+    '.xls': (excel_stream.read_header, excel_stream.iter_chunks, excel_stream.write_statuses),
+    '.csv': (_csv_read_header, _csv_iter_chunks, _csv_write_statuses),
+    '.parquet': (_parquet_read_header, _parquet_iter_chunks, _parquet_write_statuses),
+    '.jsonl': (_jsonl_read_header, _jsonl_iter_chunks, _jsonl_write_statuses),
+}
+
+
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _FORMATS:
+        raise ValueError(f"Format file tidak didukung: {ext or path} (didukung: {', '.join(_FORMATS)})")
+    return _FORMATS[ext]
+
+
+def read_header(path):
+    """Membaca header saja. Mengembalikan (nama kolom, perkiraan jumlah baris data atau None)."""
+    return _format(path)[0](path)
+
+
+def iter_chunks(path, chunk_size=5000):
+    """
+    Generator DataFrame (semua kolom string, kosong = '') per chunk_size baris, index = posisi
+    baris data di file, kolom status_upload selalu ada. Dengan STATUS_SIDECAR, status dari file
+    sidecar menimpa kolom status_upload di file.
+    """
+    chunks = _format(path)[1](path, chunk_size)
+    if settings.STATUS_SIDECAR:
+        chunks = _apply_sidecar(path, chunks)
+    return chunks
+
+
+def write_statuses(path, statuses):
+    """Menulis status ({posisi baris: status}) ke file dalam format yang sama, atau ke sidecar."""
+    if settings.STATUS_SIDECAR:
+        _write_sidecar(path, statuses)
+    else:
+        _format(path)[2](path, statuses)
+    logging.debug(f"{len(statuses)} status ditulis ke {sidecar_path(path) if settings.STATUS_SIDECAR else path}.")
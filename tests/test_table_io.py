@@ -0,0 +1,34 @@
+"""CSV dengan jumlah kolom per baris tidak sama dengan header (file yang diedit tangan)."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import settings  # noqa: E402
+import table_io  # noqa: E402
+
+
+def _write(path, text):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write(text)
+
+
+def test_csv_row_with_extra_and_missing_field(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'STATUS_SIDECAR', False)
+    path = str(tmp_path / 'input.csv')
+    _write(path, "perusahaan_id,nama,alamat\n1,A,Jl. Satu,\n2,B\n3,C,Jl. Tiga,catatan\n")
+
+    chunk = next(table_io.iter_chunks(path))
+    assert chunk[['perusahaan_id', 'nama', 'alamat']].values.tolist() == [
+        ['1', 'A', 'Jl. Satu'], ['2', 'B', ''], ['3', 'C', 'Jl. Tiga']]
+    assert chunk['status_upload'].tolist() == ['', '', '']
+
+    table_io.write_statuses(path, {0: 'berhasil', 1: 'gagal - Timeout', 2: 'berhasil'})
+    with open(path, newline='', encoding='utf-8') as f:
+        assert f.read() == ("perusahaan_id,nama,alamat,status_upload\n"
+                            "1,A,Jl. Satu,berhasil\n"
+                            "2,B,,gagal - Timeout\n"
+                            "3,C,Jl. Tiga,berhasil,catatan\n")
+
+    chunk = next(table_io.iter_chunks(path))
+    assert chunk['status_upload'].tolist() == ['berhasil', 'gagal - Timeout', 'berhasil']
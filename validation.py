@@ -0,0 +1,160 @@
+"""Aturan validasi data GC (vektor per DataFrame) dan pembentukan payload kirim."""
+import base64
+
+import numpy as np
+import pandas as pd
+
+from metrics import METRICS
+from profiling import span
+from region_index import NOT_FOUND, AMBIGUOUS
+
+VALIDATION_FAILURES = METRICS.counter('matchain_validation_failures_total', 'Pelanggaran aturan validasi per aturan')
+
+REQUIRED_COLUMNS = [
+    'perusahaan_id', 'kdkab', 'latitude', 'longitude', 'hasilgc',
+    'edit_nama', 'edit_alamat', 'nama_usaha', 'alamat_usaha'
+]
+VALID_HASILGC = ['1', '3', '4', '99']
+VALID_FLAG = ['0', '1']
+INVALID_PREFIX = 'Invalid: '
+
+
+def _b64_column(values):
+    """Encode satu kolom string ke Base64 (UTF-8)."""
+    with span('base64'):
+        return values.map(lambda v: base64.b64encode(v.encode('utf-8')).decode('utf-8'))
+
+
+def normalize_columns(df):
+    """Menormalkan kolom wajib sekali untuk seluruh DataFrame (strip & hapus '.0')."""
+    norm = pd.DataFrame(index=df.index)
+    for col in REQUIRED_COLUMNS:
+        norm[col] = df[col].astype(str).str.strip()
+    for col in ('hasilgc', 'edit_nama', 'edit_alamat'):
+        norm[col] = df[col].astype(str).str.replace('.0', '', regex=False).str.strip()
+    return norm
+
+
+def validate_dataframe(df, bbox_map, polygon_index=None, build_payload=True):
+    """
+    Validasi seluruh baris sekaligus dengan operasi kolom (vektor).
+    Mengembalikan (errors, payload): errors adalah array per baris berisi list pesan error
+    (kosong jika valid), payload adalah DataFrame kolom siap kirim (nama/alamat sudah Base64),
+    atau None jika build_payload=False (mode validasi saja).
+    Jika polygon_index diberikan, titik yang lolos bbox dicek lagi terhadap poligon desa.
+    """
+    norm = normalize_columns(df)
+    n = len(norm)
+    checks = []  # Urutan sama dengan validate_row_data lama: (mask, pesan)
+
+    def add(mask, message, rule):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any():
+            VALIDATION_FAILURES.inc(int(mask.sum()), rule=rule)
+            if isinstance(message, str):
+                message = np.full(n, message, dtype=object)
+            checks.append((mask, np.asarray(message, dtype=object)))
+
+    perusahaan_id = norm['perusahaan_id']
+    kdkab = norm['kdkab']
+    hasilgc = norm['hasilgc']
+    edit_nama = norm['edit_nama']
+    edit_alamat = norm['edit_alamat']
+    has_nama = norm['nama_usaha'] != ''
+    has_alamat = norm['alamat_usaha'] != ''
+    has_lat = norm['latitude'] != ''
+    has_long = norm['longitude'] != ''
+
+    add(perusahaan_id == '', "perusahaan_id kosong", 'perusahaan_id_kosong')
+    add(kdkab == '', "kdkab kosong", 'kdkab_kosong')
+    add((kdkab != '') & (kdkab.str.len() != 2), "kdkab harus 2 digit (ditemukan: " + kdkab + ")", 'kdkab_format')
+
+    add(~hasilgc.isin(VALID_HASILGC), "hasilgc invalid (" + hasilgc + f"), harus {VALID_HASILGC}", 'hasilgc_invalid')
+    add(~edit_nama.isin(VALID_FLAG), "edit_nama invalid (" + edit_nama + f"), harus {VALID_FLAG}", 'edit_nama_invalid')
+    add(~edit_alamat.isin(VALID_FLAG), "edit_alamat invalid (" + edit_alamat + f"), harus {VALID_FLAG}", 'edit_alamat_invalid')
+
+    add(has_nama & (edit_nama != '1'), "nama_usaha terisi tapi edit_nama bukan 1", 'edit_nama_tidak_sesuai')
+    add(~has_nama & (edit_nama != '0'), "nama_usaha kosong tapi edit_nama bukan 0", 'edit_nama_tidak_sesuai')
+    add(has_alamat & (edit_alamat != '1'), "alamat_usaha terisi tapi edit_alamat bukan 1", 'edit_alamat_tidak_sesuai')
+    add(~has_alamat & (edit_alamat != '0'), "alamat_usaha kosong tapi edit_alamat bukan 0", 'edit_alamat_tidak_sesuai')
+
+    # --- VALIDASI LOKASI ---
+    add(has_lat != has_long, "Latitude dan Longitude harus diisi keduanya atau dikosongkan keduanya.", 'latlong_tidak_lengkap')
+
+    if bbox_map:
+        check_loc = (has_lat & has_long & (kdkab != '')).to_numpy()
+        kab_code = kdkab.str.zfill(2)
+        # Kolom opsional kdprov membuat kode unik untuk file bounding box multi-provinsi
+        if 'kdprov' in df.columns:
+            kdprov = df['kdprov'].astype(str).str.strip().str.replace('.0', '', regex=False)
+            kab_code = kab_code.where(kdprov == '', kdprov.str.zfill(2) + kab_code)
+        positions = np.full(n, NOT_FOUND, dtype=np.int64)
+        loc_idx = np.flatnonzero(check_loc)
+        positions[loc_idx] = bbox_map.lookup(kab_code.to_numpy()[loc_idx])
+        add(check_loc & (positions == NOT_FOUND), "Kode kab " + kab_code + " tidak ada di bbox map.", 'kab_tidak_dikenal')
+        add(check_loc & (positions == AMBIGUOUS), "Kode kab " + kab_code + " ambigu (ada di beberapa provinsi), isi kolom kdprov.", 'kab_ambigu')
+
+        lat = pd.to_numeric(norm['latitude'], errors='coerce').to_numpy(dtype=float)
+        lon = pd.to_numeric(norm['longitude'], errors='coerce').to_numpy(dtype=float)
+        check_bbox = check_loc & (positions >= 0)
+        bad_format = check_bbox & (np.isnan(lat) | np.isnan(lon))
+        add(bad_format, "Format Lat/Long invalid.", 'latlong_format')
+
+        check_bbox &= ~bad_format
+        if check_bbox.any():
+            idx = np.flatnonzero(check_bbox)
+            lat_ok, long_ok = bbox_map.contains(positions[idx], lon[idx], lat[idx])
+            lat_out = np.zeros(n, dtype=bool)
+            long_out = np.zeros(n, dtype=bool)
+            lat_out[idx] = ~lat_ok
+            long_out[idx] = ~long_ok
+            add(lat_out, "Lat (" + pd.Series(lat, index=norm.index).astype(str) + ") di luar " + kab_code, 'lat_di_luar_kab')
+            add(long_out, "Long (" + pd.Series(lon, index=norm.index).astype(str) + ") di luar " + kab_code, 'long_di_luar_kab')
+
+            # Bbox hanya prefilter kasar; cek poligon desa untuk titik yang lolos bbox
+            if polygon_index is not None:
+                check_poly = check_bbox & ~lat_out & ~long_out
+                idx = np.flatnonzero(check_poly)
+                if len(idx):
+                    full_codes = bbox_map.code_at(positions[idx])
+                    outside = np.zeros(n, dtype=bool)
+                    outside[idx] = ~polygon_index.contains(full_codes, lon[idx], lat[idx])
+                    add(outside, "Koordinat di luar poligon desa kab " + kab_code, 'di_luar_poligon_desa')
+
+    errors = np.empty(n, dtype=object)
+    for i in range(n):
+        errors[i] = []
+    for mask, message in checks:
+        for i in np.flatnonzero(mask):
+            errors[i].append(message[i])
+    if not build_payload:
+        return errors, None
+
+    # --- PAYLOAD (dinormalisasi sekali, loop submit hanya melakukan request) ---
+    payload = pd.DataFrame({
+        'perusahaan_id': perusahaan_id,
+        'latitude': df['latitude'].astype(str),
+        'longitude': df['longitude'].astype(str),
+        'hasilgc': hasilgc,
+        'edit_nama': edit_nama,
+        'edit_alamat': edit_alamat,
+        'nama_usaha': norm['nama_usaha'],
+        'alamat_usaha': norm['alamat_usaha'],
+    }, index=norm.index)
+    encode_nama = edit_nama == '1'
+    encode_alamat = edit_alamat == '1'
+    payload.loc[encode_nama, 'nama_usaha'] = _b64_column(payload.loc[encode_nama, 'nama_usaha'])
+    payload.loc[encode_alamat, 'alamat_usaha'] = _b64_column(payload.loc[encode_alamat, 'alamat_usaha'])
+
+    return errors, payload
+
+
+def validate_row_data(row, bbox_map):
+    """Melakukan validasi logika bisnis pada satu baris data."""
+    errors, _ = validate_dataframe(pd.DataFrame([row]).reset_index(drop=True), bbox_map)
+    return errors[0]
+
+
+def format_errors(errors):
+    """Teks status_upload untuk baris tidak valid."""
+    return INVALID_PREFIX + "; ".join(errors)